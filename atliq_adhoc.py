@@ -0,0 +1,433 @@
+# File: atliq_adhoc.py
+
+# Offline runner for the ten Atliq Hardware ad-hoc business queries.
+# Atliq_adhoc_project.sql is written for the MySQL gdb023 database. This module
+# loads the six gdb023 tables from CSV extracts into an in-memory SQLite database
+# (with indexes on the join keys), translates the few MySQL-only constructs, runs
+# every query with timing, and runs an equivalent vectorized pandas implementation
+# of each query next to it so the two answers and timings can be compared.
+# Queries 7-10 can also be answered from the monthly rollup cube (atliq_rollup).
+# Usage:
+#   python atliq_adhoc.py --data-dir gdb023 [--queries 2 7 10] [--repeat 3]
+#   python atliq_adhoc.py --data-dir gdb023 --cube-dir gdb023/cube
+
+# Import necessary libraries
+import argparse
+import calendar
+import os
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+from atliq_rollup import CUBE_QUERIES, load_cube, refresh_cube
+from top_k import top_k_per_group
+
+
+SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Atliq_adhoc_project.sql")
+
+# Per-table read specification of the gdb023 extracts ('<table>.csv')
+# - "dtype": explicit dtypes (low-cardinality text as category)
+# - "dates": columns parsed to datetime64
+ATLIQ_TABLES = {
+    "dim_customer": {
+        "dtype": {"customer_code": "int64", "customer": "str", "platform": "category",
+                  "channel": "category", "market": "category", "sub_zone": "category",
+                  "region": "category"},
+        "dates": [],
+    },
+    "dim_product": {
+        "dtype": {"product_code": "str", "division": "category", "segment": "category",
+                  "category": "category", "product": "str", "variant": "str"},
+        "dates": [],
+    },
+    "fact_sales_monthly": {
+        "dtype": {"product_code": "str", "customer_code": "int64", "sold_quantity": "int64",
+                  "fiscal_year": "int16"},
+        "dates": ["date"],
+    },
+    "fact_gross_price": {
+        "dtype": {"product_code": "str", "fiscal_year": "int16", "gross_price": "float64"},
+        "dates": [],
+    },
+    "fact_manufacturing_cost": {
+        "dtype": {"product_code": "str", "cost_year": "int16", "manufacturing_cost": "float64"},
+        "dates": [],
+    },
+    "fact_pre_invoice_deductions": {
+        "dtype": {"customer_code": "int64", "fiscal_year": "int16",
+                  "pre_invoice_discount_pct": "float64"},
+        "dates": [],
+    },
+}
+
+# Indexes created in SQLite on the join and filter keys of the queries
+ATLIQ_INDEXES = [
+    ("dim_customer", ["customer_code"]),
+    ("dim_product", ["product_code"]),
+    ("fact_sales_monthly", ["product_code", "fiscal_year"]),
+    ("fact_sales_monthly", ["customer_code"]),
+    ("fact_gross_price", ["product_code", "fiscal_year"]),
+    ("fact_manufacturing_cost", ["product_code"]),
+    ("fact_pre_invoice_deductions", ["customer_code", "fiscal_year"]),
+]
+
+# MySQL constructs without a SQLite equivalent, rewritten before execution:
+# - double-quoted string literals
+# - YEAR() and QUARTER() of a date column
+# - '/' always returns a decimal in MySQL, but truncates integers in SQLite
+#   (MONTHNAME() is registered as a function on the connection instead)
+SQLITE_REWRITES = [
+    (re.compile(r'"([^"]*)"'), r"'\1'"),
+    (re.compile(r"\bYEAR\((\w+)\)", re.IGNORECASE), r"CAST(strftime('%Y', \1) AS INTEGER)"),
+    (re.compile(r"\bQUARTER\((\w+)\)", re.IGNORECASE),
+     r"((CAST(strftime('%m', \1) AS INTEGER) + 2) / 3)"),
+    (re.compile(r"\b([A-Za-z_]\w*)\s*/"), r"CAST(\1 AS REAL) /"),
+]
+
+
+def load_atliq(data_dir, encoding="utf-8"):
+    """
+    Load the six gdb023 tables from '<table>.csv' files.
+
+    Parameters:
+    data_dir (str): Directory holding the extracts.
+    encoding (str): The encoding of the CSV files.
+
+    Returns:
+    dict: Frames keyed by table name.
+    """
+    tables = {}
+    for name, spec in ATLIQ_TABLES.items():
+        tables[name] = pd.read_csv(os.path.join(data_dir, f"{name}.csv"), encoding=encoding,
+                                   dtype=spec["dtype"], parse_dates=spec["dates"] or False)
+    return tables
+
+
+def read_queries(sql_path=SQL_FILE):
+    """
+    Split the ad-hoc SQL file into its numbered queries.
+
+    Parameters:
+    sql_path (str): Path of Atliq_adhoc_project.sql.
+
+    Returns:
+    list: One dict per query with its 'number', 'title' and 'sql' (without the
+        trailing semicolon).
+    """
+    with open(sql_path, encoding="utf-8") as handle:
+        text = handle.read()
+    headers = list(re.finditer(r"^## (\d+)\.\s*(.*?)\s*$", text, re.MULTILINE))
+    queries = []
+    for header, following in zip(headers, headers[1:] + [None]):
+        body = text[header.end():following.start() if following else len(text)]
+        queries.append({"number": int(header.group(1)), "title": header.group(2),
+                        "sql": body.strip().rstrip(";").strip()})
+    return queries
+
+
+def to_sqlite(sql):
+    """
+    Rewrite a MySQL query for SQLite (see SQLITE_REWRITES).
+
+    Parameters:
+    sql (str): The MySQL query.
+
+    Returns:
+    str: The SQLite query.
+    """
+    for pattern, replacement in SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def _monthname(value):
+    return calendar.month_name[int(value[5:7])] if value else None
+
+
+def connect(tables):
+    """
+    Copy the tables into an in-memory SQLite database and index the join keys.
+
+    Parameters:
+    tables (dict): Frames keyed by table name, as returned by load_atliq.
+
+    Returns:
+    sqlite3.Connection: The database, with MONTHNAME() registered.
+    """
+    connection = sqlite3.connect(":memory:")
+    connection.create_function("MONTHNAME", 1, _monthname, deterministic=True)
+    for name, frame in tables.items():
+        frame.to_sql(name, connection, index=False)
+    for table, columns in ATLIQ_INDEXES:
+        if table in tables:
+            connection.execute(f"CREATE INDEX idx_{table}_{'_'.join(columns)} "
+                               f"ON {table} ({', '.join(columns)})")
+    connection.execute("ANALYZE")
+    return connection
+
+
+# Pandas implementations of the queries, keyed by query number. Each returns the
+# same columns as the SQL query.
+
+def _markets_atliq_exclusive_apac(tables):
+    customers = tables["dim_customer"]
+    selected = customers[(customers["customer"] == "Atliq Exclusive")
+                         & (customers["region"] == "APAC")]
+    return selected.drop_duplicates("market")[["customer", "market"]]
+
+
+def _sold_products(tables):
+    """Products sold in each fiscal year, with the product name per fiscal year."""
+    # Only distinct products are counted, so the sales are deduplicated before the join
+    sold = (tables["fact_sales_monthly"][["product_code", "fiscal_year"]].drop_duplicates()
+            .merge(tables["dim_product"], on="product_code"))
+    # COUNT(DISTINCT CASE WHEN fiscal_year = ... THEN product END) ignores the NULLs
+    for year in (2020, 2021):
+        sold[f"product_{year}"] = sold["product"].where(sold["fiscal_year"] == year)
+    return sold
+
+
+def _unique_product_growth(tables):
+    sold = _sold_products(tables)
+    before, after = sold["product_2020"].nunique(), sold["product_2021"].nunique()
+    return pd.DataFrame({"unique_products_2020": [before], "unique_products_2021": [after],
+                         "percentage_change": [round((after / before - 1) * 100, 2)
+                                               if before else None]})
+
+
+def _products_per_segment(tables):
+    counts = tables["dim_product"].groupby("segment", observed=True)["product"].nunique()
+    return (counts.rename("product_count").reset_index()
+            .sort_values("product_count", ascending=False, kind="stable"))
+
+
+def _segment_growth(tables):
+    sold = _sold_products(tables)
+    result = (sold.groupby("segment", observed=True)[["product_2020", "product_2021"]]
+              .nunique().reset_index()
+              .rename(columns={"product_2020": "product_count_2020",
+                               "product_2021": "product_count_2021"}))
+    result["segment"] = result["segment"].astype(str)
+    result["difference"] = result["product_count_2021"] - result["product_count_2020"]
+    return result.sort_values("difference", ascending=False, kind="stable")
+
+
+def _cost_extremes(tables):
+    costs = tables["fact_manufacturing_cost"]
+    extremes = costs[costs["manufacturing_cost"].isin(
+        [costs["manufacturing_cost"].min(), costs["manufacturing_cost"].max()])]
+    result = extremes.merge(tables["dim_product"], on="product_code")
+    return (result[["product_code", "product", "manufacturing_cost"]]
+            .sort_values("manufacturing_cost", ascending=False, kind="stable"))
+
+
+def _top_discount_customers(tables):
+    customers = tables["dim_customer"]
+    deductions = tables["fact_pre_invoice_deductions"]
+    deductions = deductions[deductions["fiscal_year"] == 2021]
+    joined = deductions.merge(customers[customers["market"] == "India"], on="customer_code")
+    result = (joined.groupby(["customer", "customer_code"], observed=True)
+              ["pre_invoice_discount_pct"].mean().round(2)
+              .rename("average_discount_percentage").reset_index())
+    return (result[["customer_code", "customer", "average_discount_percentage"]]
+            .nlargest(5, "average_discount_percentage"))
+
+
+def _gross_sales(tables, sales):
+    """Sales with their gross price of the fiscal year and 'gross_sales_amount'."""
+    sales = sales.merge(tables["fact_gross_price"], on=["product_code", "fiscal_year"])
+    sales["gross_sales_amount"] = sales["gross_price"] * sales["sold_quantity"]
+    return sales
+
+
+def _atliq_exclusive_monthly_sales(tables):
+    customers = tables["dim_customer"]
+    codes = customers.loc[customers["customer"] == "Atliq Exclusive", "customer_code"]
+    sales = tables["fact_sales_monthly"]
+    sales = _gross_sales(tables, sales[sales["customer_code"].isin(codes)])
+    monthly = sales.groupby([sales["date"].dt.month_name().rename("month"),
+                             sales["date"].dt.year.rename("year")])["gross_sales_amount"].sum()
+    return monthly.round(2).reset_index()
+
+
+def _quarterly_quantity_2020(tables):
+    sales = tables["fact_sales_monthly"]
+    sales = sales[sales["date"].dt.year == 2020]
+    result = (sales.groupby([sales["date"].dt.quarter.rename("Quarter"),
+                             sales["date"].dt.year.rename("Year")])["sold_quantity"].sum()
+              .rename("total_sold_quantity").reset_index())
+    return result.sort_values("total_sold_quantity", ascending=False, kind="stable")
+
+
+def _channel_contribution_2021(tables):
+    sales = tables["fact_sales_monthly"]
+    sales = _gross_sales(tables, sales[sales["fiscal_year"] == 2021])
+    sales = sales.merge(tables["dim_customer"][["customer_code", "channel"]], on="customer_code")
+    channels = (sales.groupby("channel", observed=True)["gross_sales_amount"].sum() / 1_000_000
+                ).round(2).rename("gross_sales_mln").reset_index()
+    channels["channel"] = channels["channel"].astype(str)
+    channels["percentage_contribution"] = (channels["gross_sales_mln"]
+                                           / channels["gross_sales_mln"].sum() * 100).round(2)
+    return channels.sort_values("percentage_contribution", ascending=False, kind="stable")
+
+
+def _top_products_per_division(tables):
+    sold = tables["fact_sales_monthly"]
+    sold = sold[sold["fiscal_year"] == 2021]
+    totals = (sold.groupby("product_code")["sold_quantity"].sum()
+              .rename("total_sold_quantity").reset_index()
+              .merge(tables["dim_product"][["product_code", "division", "product"]],
+                     on="product_code"))
+    totals["division"] = totals["division"].astype(str)
+    # DENSE_RANK() OVER (PARTITION BY division ORDER BY total_sold_quantity DESC) <= 3
+    top = top_k_per_group(totals, "division", "total_sold_quantity", 3, method="dense",
+                          rank_column="ranking")
+    return top[["product_code", "division", "product", "total_sold_quantity", "ranking"]]
+
+
+PANDAS_QUERIES = {
+    1: _markets_atliq_exclusive_apac,
+    2: _unique_product_growth,
+    3: _products_per_segment,
+    4: _segment_growth,
+    5: _cost_extremes,
+    6: _top_discount_customers,
+    7: _atliq_exclusive_monthly_sales,
+    8: _quarterly_quantity_2020,
+    9: _channel_contribution_2021,
+    10: _top_products_per_division,
+}
+
+# Query 6 keeps the first 5 rows of a ranking; when the cut falls inside a tie, SQL
+# leaves unspecified which customers are kept, so only the ranked values are compared
+COMPARE_COLUMNS = {6: ["average_discount_percentage"]}
+
+
+def results_match(sql_result, pandas_result, columns=None):
+    """
+    Compare the answers of both engines, ignoring row order and dtypes.
+
+    Values are compared to within 0.01, as two-decimal ROUND() results may differ
+    in the last digit between engines.
+
+    Parameters:
+    sql_result (pd.DataFrame): The SQLite answer.
+    pandas_result (pd.DataFrame): The pandas answer.
+    columns (list): Columns to compare. Default is all of the SQL answer's columns.
+
+    Returns:
+    bool: Whether the answers agree.
+    """
+    columns = list(columns or sql_result.columns)
+    if list(sql_result.columns) != list(pandas_result.columns) or \
+            len(sql_result) != len(pandas_result):
+        return False
+    left, right = sql_result[columns].copy(), pandas_result[columns].copy()
+    for frame in (left, right):
+        for column in columns:
+            if not pd.api.types.is_numeric_dtype(frame[column]):
+                frame[column] = frame[column].astype(str)
+    left = left.sort_values(columns, ignore_index=True)
+    right = right.sort_values(columns, ignore_index=True)
+    try:
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, check_exact=False,
+                                      rtol=0, atol=0.0101)
+    except AssertionError:
+        return False
+    return True
+
+
+def _timed(fn, repeat):
+    """Run fn repeat times; return its last result and the best time in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def run_queries(tables, queries=None, numbers=None, connection=None, repeat=1, cube=None):
+    """
+    Run the ad-hoc queries in SQLite and in pandas, timing and comparing both.
+
+    Parameters:
+    tables (dict): Frames keyed by table name, as returned by load_atliq.
+    queries (list): Queries as returned by read_queries. Default is the project file.
+    numbers (list): Query numbers to run. Default is all of them.
+    connection (sqlite3.Connection): Database built by connect(); built when None.
+    repeat (int): Runs per query and engine; the best time is reported.
+    cube (pd.DataFrame): Rollup cube from atliq_rollup.load_cube; when given,
+        queries 7-10 are also answered from it ('cube_s' and 'cube_match').
+
+    Returns:
+    tuple: (report pd.DataFrame with 'query', 'title', 'rows', 'sqlite_s',
+        'pandas_s', 'speedup' (sqlite_s / pandas_s) and 'match' per query,
+        dict of (SQLite answer, pandas answer) per query number)
+    """
+    queries = queries or read_queries()
+    connection = connection or connect(tables)
+    rows, answers = [], {}
+    for query in queries:
+        number = query["number"]
+        if numbers is not None and number not in numbers:
+            continue
+        sql = to_sqlite(query["sql"])
+        sql_result, sqlite_s = _timed(lambda: pd.read_sql_query(sql, connection), repeat)
+        pandas_result, pandas_s = None, None
+        if number in PANDAS_QUERIES:
+            pandas_result, pandas_s = _timed(lambda: PANDAS_QUERIES[number](tables), repeat)
+            pandas_result = pandas_result.reset_index(drop=True)
+        answers[number] = (sql_result, pandas_result)
+        rows.append({
+            "query": number,
+            "title": query["title"],
+            "rows": len(sql_result),
+            "sqlite_s": sqlite_s,
+            "pandas_s": pandas_s,
+            "speedup": sqlite_s / pandas_s if pandas_s else None,
+            "match": None if pandas_result is None else
+            results_match(sql_result, pandas_result, COMPARE_COLUMNS.get(number)),
+        })
+        if cube is not None:
+            cube_result, cube_s = None, None
+            if number in CUBE_QUERIES:
+                cube_result, cube_s = _timed(lambda: CUBE_QUERIES[number](cube, tables), repeat)
+                cube_result = cube_result.reset_index(drop=True)
+            rows[-1]["cube_s"] = cube_s
+            rows[-1]["cube_match"] = None if cube_result is None else \
+                results_match(sql_result, cube_result)
+    return pd.DataFrame(rows), answers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Atliq ad-hoc queries offline.")
+    parser.add_argument("--data-dir", required=True, help="directory holding '<table>.csv'")
+    parser.add_argument("--sql", default=SQL_FILE, help="the ad-hoc SQL file")
+    parser.add_argument("--queries", type=int, nargs="+", help="query numbers to run")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per query, best time kept")
+    parser.add_argument("--show", action="store_true", help="print every answer")
+    parser.add_argument("--cube-dir", help="refresh the rollup cube here and answer "
+                                           "queries 7-10 from it too")
+    args = parser.parse_args()
+
+    atliq_tables = load_atliq(args.data_dir)
+    start = time.perf_counter()
+    database = connect(atliq_tables)
+    print(f"Loaded into SQLite in {time.perf_counter() - start:.2f}s")
+    rollup = None
+    if args.cube_dir:
+        refresh = refresh_cube(args.cube_dir, atliq_tables)
+        print(f"Cube refreshed: {len(refresh['months'])} month(s), {refresh['rows']:,} sales "
+              f"rows -> {refresh['cube_rows']:,} cube rows in {refresh['seconds']:.2f}s")
+        rollup = load_cube(args.cube_dir)
+    report, results = run_queries(atliq_tables, read_queries(args.sql), args.queries,
+                                  database, args.repeat, rollup)
+    if args.show:
+        for number, (answer, _) in results.items():
+            print(f"\n## {number}. {report.loc[report['query'] == number, 'title'].iloc[0]}")
+            print(answer.to_string(index=False))
+    print(report.to_string(index=False, float_format="{:,.4f}".format))
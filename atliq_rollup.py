@@ -0,0 +1,185 @@
+# File: atliq_rollup.py
+
+# Monthly rollup cube of the Atliq fact_sales_monthly table.
+# Queries 7-10 of Atliq_adhoc_project.sql all rescan the monthly sales and rejoin
+# them with fact_gross_price and dim_customer. The cube materializes that join once:
+# one row per (fiscal_year, month, customer_code, product_code, channel) with the
+# summed sold_quantity and gross_sales_amount (gross_price * sold_quantity), and
+# the queries are answered by rolling the cube up further.
+# The cube is stored as one Parquet file per month. A refresh only builds the
+# months newer than the latest stored one (a month's sales should be complete
+# before its refresh); rebuilding given months replaces just their files, e.g.
+# after late corrections or a gross price change.
+
+# Import necessary libraries
+import os
+import re
+import time
+
+import pandas as pd
+
+from top_k import top_k_per_group
+
+
+CUBE_KEYS = ["fiscal_year", "month", "customer_code", "product_code", "channel"]
+CUBE_MEASURES = ["sold_quantity", "gross_sales_amount", "sales_rows"]
+
+_PARTITION = re.compile(r"^month=(\d{4}-\d{2})\.parquet$")
+
+
+def build_cube(sales, gross_price, customers):
+    """
+    Aggregate monthly sales into cube rows.
+
+    Left joins keep the sales without a gross price (amount 0) or an unknown
+    customer (channel missing), so every sold quantity is in the cube; the inner
+    joins of the SQL drop exactly those amounts and rows.
+
+    Parameters:
+    sales (pd.DataFrame): fact_sales_monthly rows ('date' is the first of the month).
+    gross_price (pd.DataFrame): fact_gross_price.
+    customers (pd.DataFrame): dim_customer.
+
+    Returns:
+    pd.DataFrame: One row per CUBE_KEYS combination with the CUBE_MEASURES.
+    """
+    joined = sales.merge(gross_price[["product_code", "fiscal_year", "gross_price"]],
+                         on=["product_code", "fiscal_year"], how="left")
+    joined = joined.merge(customers[["customer_code", "channel"]], on="customer_code",
+                          how="left")
+    joined["gross_sales_amount"] = joined["gross_price"] * joined["sold_quantity"]
+    joined["channel"] = joined["channel"].astype(str).where(joined["channel"].notna())
+    return (joined.rename(columns={"date": "month"})
+            .groupby(CUBE_KEYS, dropna=False, sort=False)
+            .agg(sold_quantity=("sold_quantity", "sum"),
+                 gross_sales_amount=("gross_sales_amount", "sum"),
+                 sales_rows=("sold_quantity", "size"))
+            .reset_index())
+
+
+def _partition_path(cube_dir, month):
+    return os.path.join(cube_dir, f"month={month:%Y-%m}.parquet")
+
+
+def cube_months(cube_dir):
+    """
+    List the months stored in a cube directory.
+
+    Parameters:
+    cube_dir (str): The cube directory.
+
+    Returns:
+    list: Sorted month-start Timestamps.
+    """
+    if not os.path.isdir(cube_dir):
+        return []
+    matches = (_PARTITION.match(entry) for entry in os.listdir(cube_dir))
+    return sorted(pd.Timestamp(f"{match.group(1)}-01") for match in matches if match)
+
+
+def refresh_cube(cube_dir, tables, months=None):
+    """
+    Build the cube partitions of new (or the given) months.
+
+    Parameters:
+    cube_dir (str): The cube directory (created if needed).
+    tables (dict): The gdb023 frames, as returned by atliq_adhoc.load_atliq.
+    months (list): Months to (re)build. Default is every month of sales newer
+        than the latest stored month.
+
+    Returns:
+    dict: Refresh statistics: 'months' (the months written), 'rows' (sales rows
+        aggregated), 'cube_rows' (cube rows written) and 'seconds'.
+    """
+    start = time.perf_counter()
+    sales = tables["fact_sales_monthly"]
+    if months is None:
+        stored = cube_months(cube_dir)
+        delta = sales if not stored else sales[sales["date"] > stored[-1]]
+    else:
+        months = pd.to_datetime(months).to_period("M").to_timestamp()
+        delta = sales[sales["date"].dt.to_period("M").dt.to_timestamp().isin(months)]
+    cube = build_cube(delta, tables["fact_gross_price"], tables["dim_customer"])
+
+    os.makedirs(cube_dir, exist_ok=True)
+    written = []
+    for month, partition in cube.groupby("month", sort=True):
+        path = _partition_path(cube_dir, month)
+        partition.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+        written.append(month)
+    return {"months": written, "rows": len(delta), "cube_rows": len(cube),
+            "seconds": time.perf_counter() - start}
+
+
+def load_cube(cube_dir):
+    """
+    Read every partition of a cube.
+
+    Parameters:
+    cube_dir (str): The cube directory.
+
+    Returns:
+    pd.DataFrame: The cube, with product_code and channel as categories.
+    """
+    months = cube_months(cube_dir)
+    if not months:
+        raise ValueError(f"No cube partitions in '{cube_dir}'; run refresh_cube first")
+    cube = pd.concat([pd.read_parquet(_partition_path(cube_dir, month)) for month in months],
+                     ignore_index=True)
+    cube["product_code"] = cube["product_code"].astype("category")
+    cube["channel"] = cube["channel"].astype("category")
+    return cube
+
+
+# Queries 7-10 answered from the cube, keyed by query number (same columns as the SQL)
+
+def _atliq_exclusive_monthly_sales(cube, tables):
+    customers = tables["dim_customer"]
+    codes = customers.loc[customers["customer"] == "Atliq Exclusive", "customer_code"]
+    monthly = (cube[cube["customer_code"].isin(codes)]
+               .groupby("month")["gross_sales_amount"].sum().reset_index())
+    return pd.DataFrame({"month": monthly["month"].dt.month_name(),
+                         "year": monthly["month"].dt.year,
+                         "gross_sales_amount": monthly["gross_sales_amount"].round(2)})
+
+
+def _quarterly_quantity_2020(cube, tables):
+    monthly = cube.groupby("month")["sold_quantity"].sum()
+    monthly = monthly[monthly.index.year == 2020]
+    result = (monthly.groupby([monthly.index.quarter.rename("Quarter"),
+                               monthly.index.year.rename("Year")]).sum()
+              .rename("total_sold_quantity").reset_index())
+    return result.sort_values("total_sold_quantity", ascending=False, kind="stable")
+
+
+def _channel_contribution_2021(cube, tables):
+    channels = (cube[cube["fiscal_year"] == 2021]
+                .groupby("channel", observed=True)["gross_sales_amount"].sum() / 1_000_000
+                ).round(2).rename("gross_sales_mln").reset_index()
+    channels["channel"] = channels["channel"].astype(str)
+    channels["percentage_contribution"] = (channels["gross_sales_mln"]
+                                           / channels["gross_sales_mln"].sum() * 100).round(2)
+    return channels.sort_values("percentage_contribution", ascending=False, kind="stable")
+
+
+def _top_products_per_division(cube, tables):
+    totals = (cube[cube["fiscal_year"] == 2021]
+              .groupby("product_code", observed=True)["sold_quantity"].sum()
+              .rename("total_sold_quantity").reset_index())
+    totals["product_code"] = totals["product_code"].astype(str)
+    totals = totals.merge(tables["dim_product"][["product_code", "division", "product"]],
+                          on="product_code")
+    totals["division"] = totals["division"].astype(str)
+    # DENSE_RANK() OVER (PARTITION BY division ORDER BY total_sold_quantity DESC) <= 3
+    top = top_k_per_group(totals, "division", "total_sold_quantity", 3, method="dense",
+                          rank_column="ranking")
+    return top[["product_code", "division", "product", "total_sold_quantity", "ranking"]]
+
+
+CUBE_QUERIES = {
+    7: _atliq_exclusive_monthly_sales,
+    8: _quarterly_quantity_2020,
+    9: _channel_contribution_2021,
+    10: _top_products_per_division,
+}
@@ -0,0 +1,57 @@
+# File: benchmarks/bench_money.py
+
+# Speed benchmark of money.parse_money against the chained regex replace +
+# astype(float) cleaning used for 'Unit Price USD' and movies["Gross"].
+# Run from the repository root:  python -m benchmarks.bench_money --rows 1000000
+
+# Import necessary libraries
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run_benchmarks import timed
+from money import parse_money
+
+
+def legacy_parse(values):
+    """The original cleaning: strip '$' and ',' with regex replace, then astype(float)."""
+    return values.replace({r'\$': '', ',': ''}, regex=True).astype(float)
+
+
+def make_amounts(rows, distinct, seed=0):
+    """Generate '$1,234.56 ' formatted amounts drawn from a pool of distinct values."""
+    rng = np.random.default_rng(seed)
+    pool = np.array([f'${v:,.2f} ' for v in np.round(rng.uniform(1, 5000, distinct), 2)],
+                    dtype=object)
+    return pd.Series(pool[rng.integers(0, distinct, rows)], name='Unit Price USD')
+
+
+def run(rows, seed=0):
+    """
+    Benchmark legacy vs factorized money parsing on low and high cardinality columns.
+
+    Parameters:
+    rows (int): Number of values per column.
+    seed (int): Random seed.
+
+    Returns:
+    list: One dict per case with legacy/parse_money seconds and the speedup.
+    """
+    results = []
+    for distinct in (2517, rows):
+        values = make_amounts(rows, distinct, seed)
+        expected, legacy_seconds = timed(legacy_parse, values)
+        actual, new_seconds = timed(parse_money, values)
+        pd.testing.assert_series_equal(actual, expected)
+        results.append({'rows': rows, 'distinct': distinct, 'legacy_s': legacy_seconds,
+                        'parse_money_s': new_seconds, 'speedup': legacy_seconds / new_seconds})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark money string parsing.')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='number of values')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(pd.DataFrame(run(args.rows, args.seed)).to_string(index=False))
@@ -0,0 +1,116 @@
+# File: benchmarks/bench_rfm.py
+
+# Parity and speed benchmark of the vectorized RFM module (retailer_rfm) against
+# the original per-group lambda / per-row apply() implementation.
+# Run from the repository root:  python -m benchmarks.bench_rfm --rows 1000000
+
+# Import necessary libraries
+import argparse
+
+import pandas as pd
+
+from benchmarks.run_benchmarks import timed
+from benchmarks.synthetic import make_star_schema
+from retailer_rfm import score_customers, score_products
+
+
+def legacy_score(dimension, sales, key, monetary, snapshot, grouping):
+    """The original script's RFM steps: lambda Recency, qcut scores, row-wise apply."""
+    rfm = sales.groupby(key).agg({
+        'Order Date': lambda x: (snapshot - x.max()).days,
+        'Order Number': 'count',
+        monetary: 'sum'
+    }).rename(columns={
+        'Order Date': 'Recency',
+        'Order Number': 'Frequency',
+        monetary: 'Monetary'
+    }).reset_index()
+    dimension = dimension.merge(rfm[[key, 'Recency', 'Frequency', 'Monetary']], on=key, how='left')
+    dimension = dimension.dropna(subset=['Recency', 'Frequency', 'Monetary'])
+    dimension['R_Score'] = pd.qcut(dimension['Recency'], 4, labels=[4, 3, 2, 1]).astype(int)
+    dimension['F_Score'] = pd.qcut(dimension['Frequency'].rank(method='first'), 4,
+                                   labels=[1, 2, 3, 4]).astype(int)
+    dimension['M_Score'] = pd.qcut(dimension['Monetary'].rank(method='first'), 4,
+                                   labels=[1, 2, 3, 4]).astype(int)
+    dimension['RFM_Score'] = dimension[['R_Score', 'F_Score', 'M_Score']].sum(axis=1)
+    return grouping(dimension)
+
+
+def legacy_customers(dim_customer, sales, snapshot):
+    def customer_grouping(row):
+        if row['RFM_Score'] >= 9:
+            return 'Champions'
+        elif row['RFM_Score'] >= 6:
+            return 'Loyal Customers'
+        elif row['RFM_Score'] >= 4:
+            return 'Potential Loyalists'
+        else:
+            return 'At Risk'
+
+    def label(frame):
+        frame['Customer_Category'] = frame.apply(customer_grouping, axis=1)
+        return frame
+
+    return legacy_score(dim_customer, sales, 'CustomerKey', 'Quantity', snapshot, label)
+
+
+def legacy_products(dim_product, sales, snapshot):
+    def rfm_product_segment(row):
+        if row['RFM_Score'] >= 9:
+            return 'Best Sellers'
+        elif row['RFM_Score'] >= 6:
+            return 'Steady Movers'
+        elif row['RFM_Score'] >= 4:
+            return 'Potential Stars'
+        elif row['RFM_Score'] >= 2:
+            return 'Low Performers'
+        else:
+            return 'Underdogs'
+
+    def label(frame):
+        frame['RFM_Segment'] = (frame['R_Score'].astype(str) + frame['F_Score'].astype(str)
+                                + frame['M_Score'].astype(str))
+        frame['Product_Segment'] = frame.apply(rfm_product_segment, axis=1)
+        return frame
+
+    return legacy_score(dim_product, sales, 'ProductKey', 'Total Revenue', snapshot, label)
+
+
+def run(rows, seed=0):
+    """
+    Benchmark legacy vs vectorized RFM on a synthetic star schema and check parity.
+
+    Parameters:
+    rows (int): Number of sales rows.
+    seed (int): Random seed for the synthetic data.
+
+    Returns:
+    list: One dict per case with legacy/vectorized seconds and the speedup.
+    """
+    tables = make_star_schema(rows, seed=seed)
+    sales = tables['fact_sales']
+    products = tables['dim_products']
+    price = products['Unit Price USD'].replace({r'\$': '', ',': ''}, regex=True).astype(float)
+    unit_price = pd.Series(price.to_numpy(), index=products['ProductKey'])
+    sales['Total Revenue'] = sales['Quantity'] * sales['ProductKey'].map(unit_price)
+    snapshot = sales['Order Date'].max() + pd.Timedelta(days=1)
+
+    results = []
+    for name, legacy, vectorized, dimension in [
+        ('customers', legacy_customers, score_customers, tables['dim_customers']),
+        ('products', legacy_products, score_products, products),
+    ]:
+        expected, legacy_seconds = timed(legacy, dimension, sales, snapshot)
+        actual, new_seconds = timed(vectorized, dimension, sales, snapshot)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        results.append({'case': name, 'rows': rows, 'legacy_s': legacy_seconds,
+                        'vectorized_s': new_seconds, 'speedup': legacy_seconds / new_seconds})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark legacy vs vectorized RFM scoring.')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='number of sales rows')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(pd.DataFrame(run(args.rows, args.seed)).to_string(index=False))
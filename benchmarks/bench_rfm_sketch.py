@@ -0,0 +1,74 @@
+# File: benchmarks/bench_rfm_sketch.py
+
+# Error versus speed of sketch-based RFM scoring (retailer_rfm.rfm_sketches and
+# QuartileScorer) against exact qcut scoring (retailer_rfm.rfm_scores), on synthetic
+# RFM metrics: integer Recency, heavily tied integer Frequency and skewed Monetary.
+# The metrics are sketched in chunks, as a stream or partitions would be.
+# Run from the repository root:
+#   python -m benchmarks.bench_rfm_sketch --keys 1000000 10000000 --k 200 800 3200
+
+# Import necessary libraries
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run_benchmarks import timed
+from retailer_rfm import QuartileScorer, rfm_scores, rfm_sketches
+
+
+SCORES = ['R_Score', 'F_Score', 'M_Score']
+
+
+def make_metrics(n_keys, seed=0):
+    """RFM metrics of n_keys customers."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Recency': rng.integers(1, 2_000, n_keys),
+                         'Frequency': rng.poisson(3, n_keys) + 1,
+                         'Monetary': np.round(rng.gamma(2.0, 50.0, n_keys), 2)})
+
+
+def run(n_keys, ks, chunksize, workers, seed=0):
+    """
+    Score one population exactly and with sketches of several capacities.
+
+    Parameters:
+    n_keys (int): Number of customers.
+    ks (list): Sketch capacities.
+    chunksize (int): Rows per sketched chunk.
+    workers (int): Chunks sketched concurrently.
+    seed (int): Random seed.
+
+    Returns:
+    list: One dict per k with the seconds, the rank error bound and the share of
+        rows whose R, F and M scores match the exact ones.
+    """
+    metrics = make_metrics(n_keys, seed)
+    exact, exact_s = timed(lambda: rfm_scores(metrics.copy()))
+    chunks = [metrics.iloc[start:start + chunksize] for start in range(0, n_keys, chunksize)]
+    results = []
+    for k in ks:
+        sketches, sketch_s = timed(lambda: rfm_sketches(chunks, k=k, workers=workers))
+        scored, score_s = timed(lambda: QuartileScorer(sketches).score(metrics.copy()))
+        result = {'keys': n_keys, 'k': k, 'exact_s': exact_s, 'sketch_s': sketch_s,
+                  'score_s': score_s, 'speedup': exact_s / (sketch_s + score_s),
+                  'rank_error_bound': max(s.rank_error for s in sketches.values()) / n_keys}
+        for column in SCORES:
+            result[f'{column[0]}_match'] = float((scored[column] == exact[column]).mean())
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark sketch-based RFM scoring.')
+    parser.add_argument('--keys', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--k', type=int, nargs='+', default=[200, 800, 3200])
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for n_keys in args.keys:
+        results.extend(run(n_keys, args.k, args.chunksize, args.workers, args.seed))
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:,.4f}'.format))
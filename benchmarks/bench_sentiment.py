@@ -0,0 +1,28 @@
+# File: benchmarks/bench_sentiment.py
+
+# Parity and throughput of goodreads_lexicon (vectorized VADER) against scoring every
+# review with SentimentIntensityAnalyzer.polarity_scores, on synthetic review texts.
+# Run from the repository root:
+#   python -m benchmarks.bench_sentiment --reviews 10000 100000
+
+# Import necessary libraries
+import argparse
+
+import pandas as pd
+
+from benchmarks.synthetic import make_review_texts
+from goodreads_lexicon import parity_report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark vectorized VADER scoring.')
+    parser.add_argument('--reviews', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--batch-size', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for n_reviews in args.reviews:
+        texts = make_review_texts(n_reviews, seed=args.seed)
+        results.append(parity_report(texts, batch_size=args.batch_size))
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:,.4f}'.format))
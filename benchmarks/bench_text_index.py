@@ -0,0 +1,81 @@
+# File: benchmarks/bench_text_index.py
+
+# Case-insensitive substring and prefix search with text_index.TrigramIndex against
+# rescanning the column with str.lower().str.contains / str.startswith, on synthetic
+# Goodreads titles and authors. Every query's rows are checked to be identical.
+# Run from the repository root:
+#   python -m benchmarks.bench_text_index --rows 1000000 5000000
+
+# Import necessary libraries
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run_benchmarks import timed
+from benchmarks.synthetic import make_titles, make_works
+from text_index import TrigramIndex
+
+
+QUERIES = ['dark', 'Night', 'harry pot', 'of the', 'Author 12', 'ee', 'zzz']
+PREFIXES = ['the d', 'Author 9']
+
+
+def run(rows, seed=0):
+    """
+    Benchmark the index on a column of titles mixed with authors.
+
+    Parameters:
+    rows (int): Number of rows.
+    seed (int): Random seed.
+
+    Returns:
+    tuple: (dict of build/save/load statistics, list of one dict per query)
+    """
+    titles = pd.Series(make_titles(rows, seed), dtype='object')
+    authors = make_works(rows // 10, seed=seed)['author']
+    # Titles and authors as one searchable column, as a catalogue search box would
+    texts = pd.concat([titles, authors], ignore_index=True)
+    index, build_s = timed(lambda: TrigramIndex(texts))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'titles.npz')
+        _, save_s = timed(lambda: index.save(path))
+        size = os.path.getsize(path)
+        index, load_s = timed(lambda: TrigramIndex.load(path))
+    build = {'rows': len(texts), 'distinct': len(index.strings), 'build_s': build_s,
+             'save_s': save_s, 'load_s': load_s, 'file_mb': size / 2**20}
+
+    results = []
+    for kind, queries in (('contains', QUERIES), ('startswith', PREFIXES)):
+        for query in queries:
+            if kind == 'contains':
+                expected, scan_s = timed(lambda: np.flatnonzero(texts.str.lower().str.contains(
+                    query.lower(), regex=False, na=False).to_numpy(dtype=bool)))
+                actual, index_s = timed(lambda: index.contains(query))
+            else:
+                expected, scan_s = timed(lambda: np.flatnonzero(texts.str.lower().str.startswith(
+                    query.lower(), na=False).to_numpy(dtype=bool)))
+                actual, index_s = timed(lambda: index.startswith(query))
+            assert np.array_equal(actual, expected), (kind, query)
+            results.append({'rows': len(texts), 'query': f'{kind}({query!r})',
+                            'matches': len(actual), 'scan_s': scan_s, 'index_s': index_s,
+                            'speedup': scan_s / index_s})
+    return build, results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the trigram text index.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    builds, results = [], []
+    for n_rows in args.rows:
+        build, queries = run(n_rows, args.seed)
+        builds.append(build)
+        results.extend(queries)
+    print(pd.DataFrame(builds).to_string(index=False, float_format='{:,.3f}'.format))
+    print()
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:,.4f}'.format))
@@ -0,0 +1,75 @@
+# File: benchmarks/bench_top_k.py
+
+# Parity and speed benchmark of top_k.top_k_per_group against sorting the whole
+# table and keeping the first rows per group (sort_values().groupby().head()) and
+# against the ranked filter groupby().rank(method) <= k.
+# Run from the repository root:
+#   python -m benchmarks.bench_top_k --rows 10000000 --groups 1000 100000 --k 3 50
+
+# Import necessary libraries
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run_benchmarks import timed
+from top_k import top_k_per_group
+
+
+def make_frame(rows, groups, seed=0):
+    """Rows spread over the groups, with integer values so ties are common."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'group': rng.integers(0, groups, rows),
+                         'value': rng.integers(0, 10_000, rows)})
+
+
+def run(rows, groups, ks, seed=0):
+    """
+    Benchmark top-k per group on one frame for several k.
+
+    Parameters:
+    rows (int): Number of rows.
+    groups (int): Number of groups.
+    ks (list): Places kept per group.
+    seed (int): Random seed.
+
+    Returns:
+    list: One dict per k with the seconds of each approach and the speedups.
+    """
+    frame = make_frame(rows, groups, seed)
+    results = []
+    for k in ks:
+        # ROW_NUMBER semantics: the sort-then-head baseline
+        expected, sort_head_s = timed(lambda: frame.sort_values(
+            ['group', 'value'], ascending=[True, False], kind='stable').groupby('group').head(k))
+        actual, first_s = timed(lambda: top_k_per_group(frame, 'group', 'value', k,
+                                                        method='first'))
+        pd.testing.assert_frame_equal(actual, expected)
+
+        # DENSE_RANK semantics: the ranked filter baseline
+        ranks, rank_s = timed(lambda: frame.groupby('group')['value'].rank(
+            method='dense', ascending=False))
+        dense, dense_s = timed(lambda: top_k_per_group(frame, 'group', 'value', k,
+                                                       method='dense'))
+        assert dense.index.sort_values().equals(frame.index[ranks <= k])
+
+        results.append({'rows': rows, 'groups': groups, 'k': k,
+                        'sort_head_s': sort_head_s, 'top_k_first_s': first_s,
+                        'first_speedup': sort_head_s / first_s,
+                        'rank_filter_s': rank_s, 'top_k_dense_s': dense_s,
+                        'dense_speedup': rank_s / dense_s})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark top-k rows per group.')
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--groups', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--k', type=int, nargs='+', default=[3, 50])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for n_groups in args.groups:
+        results.extend(run(args.rows, n_groups, args.k, args.seed))
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:,.3f}'.format))
@@ -0,0 +1,55 @@
+# File: benchmarks/bench_works.py
+
+# Parity and speed benchmark of goodreads_works.clean_works against the notebook's
+# per-row apply() / astype(str).str.split() cleaning of the works dataset.
+# Run from the repository root:  python -m benchmarks.bench_works --rows 2000000
+
+# Import necessary libraries
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run_benchmarks import timed
+from benchmarks.synthetic import make_works
+from goodreads_works import WORKS_COLUMNS, clean_works
+
+
+def legacy_clean(works_df):
+    """The notebook's cleaning steps (cells 'Clean works dataset' to 'Filtering')."""
+    works_df = works_df.copy()
+    works_df['primary_genre'] = works_df['genres'].apply(lambda x: x.split(',')[0] if isinstance(x, str) else np.nan)
+    works_df['original_publication_year'] = works_df['original_publication_year'].astype(str).str.split('.').str[0]
+    works_df['author'] = works_df['author'].apply(lambda x: x.split(',')[0] if isinstance(x, str) else np.nan)
+    return works_df[WORKS_COLUMNS]
+
+
+def run(rows, seed=0):
+    """
+    Benchmark legacy vs vectorized works cleaning and check that they agree.
+
+    Parameters:
+    rows (int): Number of works.
+    seed (int): Random seed.
+
+    Returns:
+    list: One dict with legacy/clean_works seconds and the speedup.
+    """
+    works = make_works(rows, seed=seed)
+    expected, legacy_seconds = timed(legacy_clean, works)
+    actual, new_seconds = timed(clean_works, works)
+    for column in ('primary_genre', 'author'):
+        pd.testing.assert_series_equal(actual[column].astype(object), expected[column].astype(object))
+    # The legacy year is a string, 'nan' for missing years
+    legacy_year = pd.to_numeric(expected['original_publication_year'], errors='coerce')
+    pd.testing.assert_series_equal(actual['original_publication_year'], legacy_year.astype('Int64'))
+    return [{'rows': rows, 'legacy_s': legacy_seconds, 'clean_works_s': new_seconds,
+             'speedup': legacy_seconds / new_seconds}]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark Goodreads works cleaning.')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='number of works')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(pd.DataFrame(run(args.rows, args.seed)).to_string(index=False))
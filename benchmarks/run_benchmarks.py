@@ -0,0 +1,227 @@
+# File: benchmarks/run_benchmarks.py
+
+# Stage benchmarks of the retailer and Goodreads pipelines on synthetic data.
+# For each scale the source CSVs are generated with benchmarks.synthetic, then
+# every stage (load, date parse, RFM, store performance, works cleaning,
+# sentiment) is timed with its peak traced memory. Tracing slows down Python-heavy
+# stages such as sentiment; --no-memory measures time only. Results can be written
+# as JSON and compared against an earlier run to spot regressions.
+# Run from the repository root:
+#   python -m benchmarks.run_benchmarks --scales 10000 1000000 --output results.json
+#   python -m benchmarks.run_benchmarks --scales 1000000 --compare results.json
+
+# Import necessary libraries
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_goodreads, write_star_schema
+from date_parsing import parse_dates
+from dimension_index import DimensionIndex
+from goodreads_sentiment import score_reviews
+from goodreads_works import clean_works
+from retailer_io import load_star_schema
+from retailer_rfm import rfm_snapshot, score_customers, score_products
+
+
+STAGES = ['load', 'date_parse', 'rfm', 'store_performance', 'works_cleaning', 'sentiment']
+
+
+def timed(fn, *args):
+    """
+    Call a function and time it.
+
+    Parameters:
+    fn (callable): The function to run.
+    *args: Its arguments.
+
+    Returns:
+    tuple: (result of fn, wall-clock seconds)
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def measure(stage, scale, rows_in, fn, track_memory=True):
+    """
+    Run one stage, recording its wall time and peak traced memory.
+
+    Parameters:
+    stage (str): The stage name.
+    scale (int): The number of sales rows of the run.
+    rows_in (int): Rows processed by the stage.
+    fn (callable): The stage, called without arguments; its result is passed through.
+    track_memory (bool): Trace the peak memory (None in the record otherwise).
+
+    Returns:
+    tuple: (result of fn, dict with the stage's measurements)
+    """
+    if track_memory:
+        tracemalloc.start()
+    try:
+        result, seconds = timed(fn)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20 if track_memory else None
+    finally:
+        if track_memory:
+            tracemalloc.stop()
+    return result, {'scale': scale, 'stage': stage, 'rows': rows_in, 'seconds': seconds,
+                    'rows_per_sec': rows_in / seconds if seconds else None,
+                    'peak_memory_mb': peak}
+
+
+def _store_performance(fact_sales):
+    """The script's store aggregation: total revenue and order lines per store."""
+    return fact_sales.groupby('StoreKey').agg({
+        'Total Revenue': 'sum',
+        'Order Number': 'count'
+    }).rename(columns={
+        'Total Revenue': 'Total Sales',
+        'Order Number': 'Total Orders'
+    }).reset_index().sort_values(by='Total Sales', ascending=False)
+
+
+def _rfm(tables):
+    fact_sales = tables.fact_sales
+    products = DimensionIndex(tables.dim_products, 'ProductKey')
+    fact_sales['Total Revenue'] = (fact_sales['Quantity']
+                                   * products.take('Unit Price USD', fact_sales['ProductKey']))
+    snapshot = rfm_snapshot(fact_sales)
+    return (score_customers(tables.dim_customers, fact_sales, snapshot),
+            score_products(tables.dim_products, fact_sales, snapshot))
+
+
+def run_scale(scale, data_dir, stages=STAGES, n_reviews=10_000, seed=0, track_memory=True):
+    """
+    Generate the data for one scale and benchmark the selected stages.
+
+    Parameters:
+    scale (int): Number of sales rows (works are scale // 10, reviews scale // 2).
+    data_dir (str): Directory for the generated CSV files.
+    stages (list): Stages to run, from STAGES.
+    n_reviews (int): Reviews scored by the (slow) sentiment stage.
+    seed (int): Random seed.
+    track_memory (bool): Trace the peak memory of each stage.
+
+    Returns:
+    list: One dict of measurements per stage.
+    """
+    paths = write_star_schema(data_dir, scale, seed=seed)
+    goodreads = write_goodreads(data_dir, max(scale // 10, 10), max(scale // 2, n_reviews),
+                                seed=seed)
+    results = []
+
+    def stage(name, rows_in, fn):
+        result, record = measure(name, scale, rows_in, fn, track_memory)
+        if name in stages:
+            results.append(record)
+        return result
+
+    # Later stages work on the loaded tables, so the load always runs
+    tables = stage('load', scale, lambda: load_star_schema({'data_dir': data_dir,
+                                                            'use_cache': False}))
+    if 'date_parse' in stages:
+        dates = pd.read_csv(paths['fact_sales'], usecols=['Order Date'], dtype=str)['Order Date']
+        stage('date_parse', len(dates), lambda: parse_dates(dates))
+    if 'rfm' in stages or 'store_performance' in stages:
+        # Adds the 'Total Revenue' column the store aggregation needs
+        stage('rfm', scale, lambda: _rfm(tables))
+    if 'store_performance' in stages:
+        stage('store_performance', scale, lambda: _store_performance(tables.fact_sales))
+    if 'works_cleaning' in stages:
+        works = pd.read_csv(goodreads['works'])
+        stage('works_cleaning', len(works), lambda: clean_works(works))
+    if 'sentiment' in stages:
+        texts = pd.read_csv(goodreads['reviews'], usecols=['review_text'], dtype=str,
+                            nrows=n_reviews)['review_text'].dropna()
+        stage('sentiment', len(texts), lambda: score_reviews(texts, progress=False))
+    return results
+
+
+def environment():
+    """Describe the machine and library versions the results were measured with."""
+    return {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'pandas': pd.__version__,
+            'numpy': np.__version__, 'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+
+
+def run(scales, stages=STAGES, n_reviews=10_000, seed=0, data_dir=None, track_memory=True):
+    """
+    Benchmark every scale.
+
+    Parameters:
+    scales (list): Numbers of sales rows, e.g. [10_000, 1_000_000].
+    stages (list): Stages to run, from STAGES.
+    n_reviews (int): Reviews scored by the sentiment stage.
+    seed (int): Random seed.
+    data_dir (str): Keep the generated data under this directory; a temporary
+        directory (removed afterwards) is used when None.
+    track_memory (bool): Trace the peak memory of each stage.
+
+    Returns:
+    list: One dict per scale and stage.
+    """
+    results = []
+    for scale in scales:
+        directory = os.path.join(data_dir, str(scale)) if data_dir else tempfile.mkdtemp()
+        try:
+            results.extend(run_scale(scale, directory, stages, n_reviews, seed, track_memory))
+        finally:
+            if data_dir is None:
+                shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline):
+    """
+    Compare results with a baseline run.
+
+    Parameters:
+    results (list): Measurements returned by run.
+    baseline (list): Measurements of an earlier run (the 'results' of its JSON file).
+
+    Returns:
+    pd.DataFrame: Seconds and peak memory of both runs per scale and stage, with
+        the current/baseline time ratio (above 1 is slower).
+    """
+    keys = ['scale', 'stage']
+    merged = pd.DataFrame(results).merge(pd.DataFrame(baseline), on=keys, how='left',
+                                         suffixes=('', '_baseline'))
+    merged['time_ratio'] = merged['seconds'] / merged['seconds_baseline']
+    return merged[keys + ['seconds', 'seconds_baseline', 'time_ratio',
+                          'peak_memory_mb', 'peak_memory_mb_baseline']]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark pipeline stages on synthetic data.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='numbers of sales rows (10k to 100M)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--reviews', type=int, default=10_000,
+                        help='reviews scored by the sentiment stage')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help='keep the generated CSV files here')
+    parser.add_argument('--no-memory', action='store_true', help='do not trace peak memory')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of an earlier run to compare against')
+    args = parser.parse_args()
+
+    results = run(args.scales, args.stages, args.reviews, args.seed, args.data_dir,
+                  not args.no_memory)
+    print(pd.DataFrame(results).to_string(index=False))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({'environment': environment(), 'results': results}, handle, indent=2)
+    if args.compare:
+        with open(args.compare) as handle:
+            print(compare(results, json.load(handle)['results']).to_string(index=False))
@@ -0,0 +1,559 @@
+# File: benchmarks/synthetic.py
+
+# Synthetic, schema-faithful data for the Global Electronics Retailer, Goodreads and
+# Atliq Hardware (gdb023) benchmarks. Frames mirror the column names and value formats of the source CSVs
+# so they can be fed to the same code paths as the real extracts, and the write_*
+# helpers produce CSV files in the source format. The sales and reviews files are
+# generated and written chunk by chunk, so scales of 100M rows fit in memory.
+
+# Import necessary libraries
+import os
+
+import numpy as np
+import pandas as pd
+
+from dimension_index import DimensionIndex
+
+
+COUNTRIES = ['United States', 'United Kingdom', 'Germany', 'Canada', 'Australia',
+             'Italy', 'Netherlands', 'France']
+CONTINENTS = {'United States': 'North America', 'Canada': 'North America',
+              'Australia': 'Australia'}
+CURRENCIES = {'United States': 'USD', 'United Kingdom': 'GBP', 'Germany': 'EUR',
+              'Canada': 'CAD', 'Australia': 'AUD', 'Italy': 'EUR', 'Netherlands': 'EUR',
+              'France': 'EUR'}
+CATEGORIES = ['Audio', 'Cameras and camcorders', 'Cell phones', 'Computers',
+              'Games and Toys', 'Home Appliances', 'Music, Movies and Audio Books',
+              'TV and Video']
+BRANDS = ['Contoso', 'Wide World Importers', 'Northwind Traders', 'Adventure Works',
+          'Southridge Video', 'Litware', 'Fabrikam', 'Proseware', 'A. Datum',
+          'The Phone Company', 'Tailspin Toys']
+COLORS = ['Black', 'White', 'Silver', 'Blue', 'Red', 'Grey', 'Green', 'Pink', 'Brown',
+          'Orange', 'Yellow', 'Gold', 'Purple', 'Azure', 'Silver Grey', 'Transparent']
+GENRES = ['fiction', 'fantasy', 'paranormal', 'mystery', 'thriller', 'crime', 'romance',
+          'young-adult', 'children', 'history', 'historical fiction', 'biography',
+          'non-fiction', 'poetry', 'comics', 'graphic']
+# Review vocabulary: neutral filler plus words from the VADER lexicon
+REVIEW_WORDS = ['the', 'book', 'story', 'characters', 'plot', 'ending', 'author', 'read',
+                'this', 'was', 'a', 'and', 'but', 'not', 'very', 'really', 'love', 'loved',
+                'great', 'good', 'amazing', 'fun', 'enjoyed', 'beautiful', 'bad', 'boring',
+                'hate', 'terrible', 'disappointing', 'sad', 'slow', 'confusing', '!', ':)']
+# Title vocabulary for text search benchmarks
+TITLE_WORDS = ['The', 'Dark', 'Night', 'Knight', 'Tower', 'Shadow', 'of', 'the', 'and', 'a',
+               'Girl', 'Boy', 'King', 'Queen', 'Secret', 'Garden', 'House', 'War', 'Peace',
+               'Love', 'Darkness', 'Light', 'Fire', 'Ice', 'Stone', 'Sea', 'River', 'City',
+               'Lost', 'Last', 'First', 'Little', 'Wild', 'Silent', 'Broken', 'Golden',
+               'Harry', 'Potter', 'Chronicles', 'Legend', 'Song', 'Blood', 'Moon', 'Star']
+
+# Format of the date columns in the source CSVs
+SOURCE_DATE_FORMAT = '%m/%d/%Y'
+
+# Atliq Hardware (gdb023) markets by region, and product hierarchy by division
+ATLIQ_MARKETS = {'APAC': ['India', 'Indonesia', 'Japan', 'Philiphines', 'South Korea',
+                          'Australia', 'Newzealand', 'Bangladesh', 'China', 'Pakistan'],
+                 'EU': ['France', 'Germany', 'Italy', 'Norway', 'Poland', 'Portugal',
+                        'Spain', 'Sweden', 'United Kingdom', 'Austria'],
+                 'NA': ['USA', 'Canada'],
+                 'LATAM': ['Brazil', 'Chile', 'Columbia', 'Mexico']}
+ATLIQ_SEGMENTS = {'P & A': ['Peripherals', 'Accessories'],
+                  'PC': ['Notebook', 'Desktop'],
+                  'N & S': ['Storage', 'Networking']}
+ATLIQ_CHANNELS = ['Retailer', 'Direct', 'Distributor']
+
+
+def make_customers(n_customers, seed=0):
+    """
+    Generate a customer dimension.
+
+    Parameters:
+    n_customers (int): Number of customers.
+    seed (int): Random seed.
+
+    Returns:
+    pd.DataFrame: Customers keyed by 'CustomerKey'.
+    """
+    rng = np.random.default_rng(seed)
+    country = rng.choice(COUNTRIES, n_customers)
+    state = rng.integers(0, 40, n_customers)
+    state_code = np.array([f'S{i:02d}' for i in range(40)], dtype=object)[state]
+    state_code[rng.random(n_customers) < 0.001] = np.nan  # as 'NA' (Napoli) in the source
+    return pd.DataFrame({
+        'CustomerKey': np.arange(1, n_customers + 1, dtype='int32') * 3,
+        'Gender': rng.choice(['Male', 'Female'], n_customers),
+        'Name': [f'Customer {i}' for i in range(n_customers)],
+        'City': np.char.add('City ', rng.integers(0, 500, n_customers).astype(str)),
+        'State Code': state_code,
+        'State': np.char.add('State ', state.astype(str)),
+        'Zip Code': np.char.zfill(rng.integers(0, 99999, n_customers).astype(str), 5),
+        'Country': country,
+        'Continent': pd.Series(country).map(CONTINENTS).fillna('Europe').to_numpy(),
+        'Birthday': pd.Timestamp('1935-01-01') + pd.to_timedelta(
+            rng.integers(0, 25000, n_customers), unit='D'),
+    })
+
+
+def make_products(n_products, seed=0):
+    """
+    Generate a product dimension with '$1,234.56 ' formatted prices.
+
+    Parameters:
+    n_products (int): Number of products.
+    seed (int): Random seed.
+
+    Returns:
+    pd.DataFrame: Products keyed by 'ProductKey'.
+    """
+    rng = np.random.default_rng(seed + 1)
+    price = np.round(rng.uniform(1, 3000, n_products), 2)
+    cost = np.round(price * rng.uniform(0.3, 0.7, n_products), 2)
+    category = rng.integers(0, len(CATEGORIES), n_products)
+    subcategory = category * 100 + rng.integers(1, 6, n_products)
+    return pd.DataFrame({
+        'ProductKey': np.arange(1, n_products + 1, dtype='int32'),
+        'Product Name': [f'Product {i}' for i in range(n_products)],
+        'Brand': rng.choice(BRANDS, n_products),
+        'Color': rng.choice(COLORS, n_products),
+        'Unit Cost USD': [f'${v:,.2f} ' for v in cost],
+        'Unit Price USD': [f'${v:,.2f} ' for v in price],
+        'SubcategoryKey': subcategory.astype('int16'),
+        'Subcategory': np.char.add('Subcategory ', subcategory.astype(str)),
+        'CategoryKey': category.astype('int16'),
+        'Category': np.array(CATEGORIES)[category],
+    })
+
+
+def make_stores(n_stores=67, seed=0):
+    """
+    Generate a store dimension; StoreKey 0 is the online store.
+
+    Parameters:
+    n_stores (int): Number of stores, including the online store.
+    seed (int): Random seed.
+
+    Returns:
+    pd.DataFrame: Stores keyed by 'StoreKey'.
+    """
+    rng = np.random.default_rng(seed + 4)
+    country = rng.choice(COUNTRIES, n_stores).astype(object)
+    country[0] = 'Online'
+    square_meters = rng.integers(245, 2105, n_stores).astype('float64')
+    square_meters[0] = np.nan
+    return pd.DataFrame({
+        'StoreKey': np.arange(n_stores, dtype='int16'),
+        'Country': country,
+        'State': [f'Store State {i}' if i else 'Online' for i in range(n_stores)],
+        'Square Meters': square_meters,
+        'Open Date': pd.Timestamp('2005-01-01') + pd.to_timedelta(
+            rng.integers(0, 4000, n_stores), unit='D'),
+    })
+
+
+def make_exchange_rates(start='2015-01-01', days=2200, seed=0):
+    """
+    Generate daily exchange rates (units of currency per US dollar).
+
+    Parameters:
+    start (str): First quoted date.
+    days (int): Number of quoted days.
+    seed (int): Random seed.
+
+    Returns:
+    pd.DataFrame: 'Date', 'Currency' and 'Exchange', one row per day and currency.
+    """
+    rng = np.random.default_rng(seed + 5)
+    base = {'USD': 1.0, 'CAD': 1.3, 'AUD': 1.4, 'EUR': 0.9, 'GBP': 0.78}
+    dates = pd.date_range(start, periods=days, freq='D')
+    frames = []
+    for currency, rate in base.items():
+        walk = 1.0 if currency == 'USD' else np.exp(np.cumsum(rng.normal(0, 0.003, days)))
+        frames.append(pd.DataFrame({'Date': dates, 'Currency': currency,
+                                    'Exchange': np.round(rate * walk, 4)}))
+    return pd.concat(frames, ignore_index=True).sort_values(['Date', 'Currency'],
+                                                            ignore_index=True)
+
+
+def make_sales(n_sales, customers, products, seed=0, start='2016-01-01', days=1800,
+               stores=None, first_order=366000):
+    """
+    Generate sales facts referencing the given customers, products and stores.
+
+    Parameters:
+    n_sales (int): Number of order lines.
+    customers (pd.DataFrame): Customer dimension to draw CustomerKey from.
+    products (pd.DataFrame): Product dimension to draw ProductKey from.
+    seed (int): Random seed.
+    start (str): First order date.
+    days (int): Number of days spanned by the orders.
+    stores (pd.DataFrame): Store dimension; its Country sets the Currency Code.
+        Default is make_stores().
+    first_order (int): Order Number of the first order (two lines per order).
+
+    Returns:
+    pd.DataFrame: Sales facts with datetime 'Order Date' and 'Delivery Date' (online
+        orders only).
+    """
+    rng = np.random.default_rng(seed + 2)
+    stores = make_stores(seed=seed) if stores is None else stores
+    order_date = pd.Timestamp(start) + pd.to_timedelta(
+        np.sort(rng.integers(0, days, n_sales)), unit='D')
+    store_key = rng.choice(stores['StoreKey'].to_numpy(), n_sales)
+    store_currency = stores['Country'].map(CURRENCIES).to_numpy(dtype=object)
+    currency = store_currency[DimensionIndex(stores, 'StoreKey').positions(store_key)]
+    online = pd.isna(currency)
+    currency[online] = rng.choice(sorted(set(CURRENCIES.values())), online.sum())
+    delivery = pd.Series(order_date + pd.to_timedelta(rng.integers(1, 15, n_sales), unit='D'))
+    return pd.DataFrame({
+        'Order Number': np.arange(n_sales, dtype='int32') // 2 + first_order,
+        'Line Item': (np.arange(n_sales) % 2 + 1).astype('int16'),
+        'Order Date': order_date,
+        'Delivery Date': delivery.where(store_key == 0),
+        'CustomerKey': rng.choice(customers['CustomerKey'].to_numpy(), n_sales),
+        'StoreKey': store_key.astype('int16'),
+        'ProductKey': rng.choice(products['ProductKey'].to_numpy(), n_sales),
+        'Quantity': rng.integers(1, 11, n_sales).astype('int16'),
+        'Currency Code': currency,
+    })
+
+
+def make_star_schema(n_sales, n_customers=None, n_products=None, seed=0):
+    """
+    Generate the five tables of a consistent synthetic star schema.
+
+    Parameters:
+    n_sales (int): Number of order lines.
+    n_customers (int): Number of customers. Default is n_sales // 4.
+    n_products (int): Number of products. Default is 2,517 as in the source data.
+    seed (int): Random seed.
+
+    Returns:
+    dict: Frames keyed 'dim_customers', 'dim_products', 'dim_stores',
+        'dim_exchange_rates' and 'fact_sales'.
+    """
+    n_customers = n_customers or max(n_sales // 4, 10)
+    n_products = n_products or 2517
+    customers = make_customers(n_customers, seed)
+    products = make_products(n_products, seed)
+    stores = make_stores(seed=seed)
+    return {
+        'dim_customers': customers,
+        'dim_products': products,
+        'dim_stores': stores,
+        'dim_exchange_rates': make_exchange_rates(seed=seed),
+        'fact_sales': make_sales(n_sales, customers, products, seed, stores=stores),
+    }
+
+
+def make_works(n_works, n_authors=None, seed=0):
+    """
+    Generate a Goodreads works dataset.
+
+    Parameters:
+    n_works (int): Number of works.
+    n_authors (int): Number of distinct authors. Default is n_works // 10.
+    seed (int): Random seed.
+
+    Returns:
+    pd.DataFrame: Works with comma-separated 'genres' and 'author' lists and float
+        'original_publication_year' (NaN for some works), as in goodreads_works.csv.
+    """
+    rng = np.random.default_rng(seed + 3)
+    n_authors = n_authors or max(n_works // 10, 10)
+    authors = np.array([f'Author {i}, Translator {i % 97}' if i % 5 == 0 else f'Author {i}'
+                        for i in range(n_authors)], dtype=object)
+    genre_lists = np.array([', '.join(rng.choice(GENRES, rng.integers(1, 6), replace=False))
+                            for _ in range(min(n_works, 50_000))], dtype=object)
+    genres = genre_lists[rng.integers(0, len(genre_lists), n_works)]
+    genres[rng.random(n_works) < 0.05] = np.nan
+    year = rng.integers(1800, 2018, n_works).astype('float64')
+    year[rng.random(n_works) < 0.03] = np.nan
+    ratings = rng.integers(0, 5000, (n_works, 5))
+    return pd.DataFrame({
+        'work_id': np.arange(n_works) * 7 + 1000,
+        'original_title': [f'Title {i}' for i in range(n_works)],
+        'author': authors[rng.integers(0, n_authors, n_works)],
+        'original_publication_year': year,
+        'num_pages': np.where(rng.random(n_works) < 0.5, np.nan,
+                              rng.integers(20, 1200, n_works)),
+        'genres': genres,
+        'image_url': 'https://s.gr-assets.com/assets/nophoto/book/111x148.png',
+        'text_reviews_count': rng.integers(0, 15000, n_works),
+        '5_star_ratings': ratings[:, 4],
+        '4_star_ratings': ratings[:, 3],
+        '3_star_ratings': ratings[:, 2],
+        '2_star_ratings': ratings[:, 1],
+        '1_star_ratings': ratings[:, 0],
+        'ratings_count': ratings.sum(axis=1),
+        'avg_rating': np.round(ratings @ np.arange(1, 6) / np.maximum(ratings.sum(axis=1), 1), 1),
+    })
+
+
+def make_review_texts(n_texts, seed=0, min_words=5, max_words=120):
+    """
+    Generate distinct-ish review texts from REVIEW_WORDS.
+
+    Parameters:
+    n_texts (int): Number of texts.
+    seed (int): Random seed.
+    min_words (int): Shortest review, in words.
+    max_words (int): Longest review, in words.
+
+    Returns:
+    np.ndarray: The texts (object array).
+    """
+    rng = np.random.default_rng(seed + 6)
+    words = np.array(REVIEW_WORDS, dtype=object)
+    lengths = rng.integers(min_words, max_words + 1, n_texts)
+    tokens = words[rng.integers(0, len(words), lengths.sum())]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return np.array([' '.join(tokens[bounds[i]:bounds[i + 1]]) for i in range(n_texts)],
+                    dtype=object)
+
+
+def make_titles(n_titles, seed=0, max_words=6):
+    """
+    Generate book titles from TITLE_WORDS, numbered when they repeat a lot.
+
+    Parameters:
+    n_titles (int): Number of titles.
+    seed (int): Random seed.
+    max_words (int): Longest title, in words.
+
+    Returns:
+    np.ndarray: The titles (object array).
+    """
+    rng = np.random.default_rng(seed + 7)
+    words = np.array(TITLE_WORDS, dtype=object)
+    lengths = rng.integers(1, max_words + 1, n_titles)
+    tokens = words[rng.integers(0, len(words), lengths.sum())]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    volumes = rng.integers(0, 50, n_titles)
+    return np.array([' '.join(tokens[bounds[i]:bounds[i + 1]])
+                     + (f' #{volumes[i]}' if volumes[i] < 10 else '')
+                     for i in range(n_titles)], dtype=object)
+
+
+def make_reviews(n_reviews, works, seed=0, distinct_texts=None, first_review=0):
+    """
+    Generate a Goodreads reviews dataset for the given works.
+
+    Parameters:
+    n_reviews (int): Number of reviews.
+    works (pd.DataFrame): Works to draw work_id from.
+    seed (int): Random seed.
+    distinct_texts (int): Size of the pool review texts are drawn from. Default is
+        min(n_reviews, 100,000); repeated texts exercise the sentiment cache.
+    first_review (int): Number of the first review (review ids are its hex digest).
+
+    Returns:
+    pd.DataFrame: Reviews with the columns of goodreads_reviews.csv; about 5% have no
+        text and 'started_at' / 'read_at' are mostly missing.
+    """
+    rng = np.random.default_rng(seed + 7)
+    texts = make_review_texts(distinct_texts or min(n_reviews, 100_000), seed)
+    review_text = texts[rng.integers(0, len(texts), n_reviews)]
+    review_text[rng.random(n_reviews) < 0.05] = np.nan
+    added = pd.Timestamp('2007-01-01') + pd.to_timedelta(rng.integers(0, 4000, n_reviews), unit='D')
+    started = pd.Series(added.strftime('%Y-%m-%d')).where(rng.random(n_reviews) < 0.2)
+    ids = np.arange(first_review, first_review + n_reviews)
+    return pd.DataFrame({
+        'review_id': [f'{i:032x}' for i in ids],
+        'user_id': [f'{i:032x}' for i in rng.integers(0, max(n_reviews // 20, 1), n_reviews)],
+        'work_id': rng.choice(works['work_id'].to_numpy(), n_reviews),
+        'started_at': started,
+        'read_at': started.where(rng.random(n_reviews) < 0.8),
+        'date_added': added.strftime('%Y-%m-%d %H:%M:%S.000'),
+        'rating': rng.integers(0, 6, n_reviews).astype('float64'),
+        'review_text': review_text,
+        'n_votes': rng.poisson(0.5, n_reviews),
+        'n_comments': rng.poisson(0.2, n_reviews),
+    })
+
+
+def make_atliq(n_sales, n_customers=209, n_products=397, seed=0):
+    """
+    Generate the six gdb023 tables queried by Atliq_adhoc_project.sql.
+
+    Sales are monthly rows over fiscal years 2020 and 2021 (a fiscal year runs
+    from September to August); about a fifth of the products are only sold in 2021.
+
+    Parameters:
+    n_sales (int): Number of fact_sales_monthly rows.
+    n_customers (int): Number of customers ('Atliq Exclusive' is the first one).
+    n_products (int): Number of product variants.
+    seed (int): Random seed.
+
+    Returns:
+    dict: Frames keyed 'dim_customer', 'dim_product', 'fact_sales_monthly',
+        'fact_gross_price', 'fact_manufacturing_cost' and 'fact_pre_invoice_deductions'.
+    """
+    rng = np.random.default_rng(seed + 7)
+    markets = [(region, market) for region, names in ATLIQ_MARKETS.items() for market in names]
+    market = rng.integers(0, len(markets), n_customers)
+    names = np.array([f'Customer {i % 75}' for i in range(n_customers)], dtype=object)
+    names[0] = 'Atliq Exclusive'
+    # Atliq Exclusive trades in several APAC markets
+    market[:n_customers // 20] = rng.integers(0, len(ATLIQ_MARKETS['APAC']), n_customers // 20)
+    names[:n_customers // 20] = 'Atliq Exclusive'
+    customers = pd.DataFrame({
+        'customer_code': 70002017 + np.arange(n_customers, dtype='int64') * 1000,
+        'customer': names,
+        'platform': rng.choice(['Brick & Mortar', 'E-Commerce'], n_customers),
+        'channel': rng.choice(ATLIQ_CHANNELS, n_customers, p=[0.6, 0.25, 0.15]),
+        'market': [markets[m][1] for m in market],
+        'sub_zone': [f'{markets[m][0]} zone' for m in market],
+        'region': [markets[m][0] for m in market],
+    })
+
+    hierarchy = [(division, segment) for division, segments in ATLIQ_SEGMENTS.items()
+                 for segment in segments]
+    segment = rng.integers(0, len(hierarchy), n_products)
+    product = rng.integers(0, max(n_products // 4, 1), n_products)
+    products = pd.DataFrame({
+        'product_code': [f'A{i:04d}{j:06d}' for i, j in zip(segment, range(n_products))],
+        'division': [hierarchy[s][0] for s in segment],
+        'segment': [hierarchy[s][1] for s in segment],
+        'category': [f'{hierarchy[s][1]} category {p % 3}' for s, p in zip(segment, product)],
+        'product': [f'AQ {hierarchy[s][1]} {p}' for s, p in zip(segment, product)],
+        'variant': rng.choice(['Standard', 'Plus', 'Premium'], n_products),
+    })
+
+    months = pd.date_range('2019-09-01', '2021-08-01', freq='MS')
+    month = rng.integers(0, len(months), n_sales)
+    fiscal_year = np.where(month < 12, 2020, 2021)
+    sold = rng.integers(0, n_products, n_sales)
+    # Products introduced in 2021 never sell in fiscal 2020
+    new_product = sold >= n_products * 4 // 5
+    month[new_product] = rng.integers(12, len(months), new_product.sum())
+    fiscal_year[new_product] = 2021
+    sales = pd.DataFrame({
+        'date': months[month],
+        'product_code': products['product_code'].to_numpy()[sold],
+        'customer_code': customers['customer_code'].to_numpy()[
+            rng.integers(0, n_customers, n_sales)],
+        'sold_quantity': rng.integers(1, 300, n_sales),
+        'fiscal_year': fiscal_year,
+    })
+
+    years = np.repeat([2020, 2021], n_products)
+    base_price = rng.uniform(2, 500, n_products)
+    gross_price = pd.DataFrame({
+        'product_code': np.tile(products['product_code'].to_numpy(), 2),
+        'fiscal_year': years,
+        'gross_price': np.round(np.tile(base_price, 2) * np.where(years == 2021, 1.05, 1.0), 4),
+    })
+    manufacturing_cost = gross_price.rename(columns={'fiscal_year': 'cost_year',
+                                                     'gross_price': 'manufacturing_cost'})
+    manufacturing_cost['manufacturing_cost'] = np.round(
+        manufacturing_cost['manufacturing_cost'] * rng.uniform(0.3, 0.6, len(years)), 4)
+    customer_years = np.repeat([2020, 2021], n_customers)
+    deductions = pd.DataFrame({
+        'customer_code': np.tile(customers['customer_code'].to_numpy(), 2),
+        'fiscal_year': customer_years,
+        'pre_invoice_discount_pct': np.round(rng.uniform(0.05, 0.35, len(customer_years)), 4),
+    })
+    return {
+        'dim_customer': customers,
+        'dim_product': products,
+        'fact_sales_monthly': sales,
+        'fact_gross_price': gross_price,
+        'fact_manufacturing_cost': manufacturing_cost,
+        'fact_pre_invoice_deductions': deductions,
+    }
+
+
+def _chunk_sizes(total, chunksize):
+    return [min(chunksize, total - start) for start in range(0, total, chunksize)]
+
+
+def write_star_schema(directory, n_sales, n_customers=None, n_products=None, seed=0,
+                      chunksize=5_000_000):
+    """
+    Write the five star-schema tables as '<table>.csv' files in the source format.
+
+    fact_sales is generated and appended chunk by chunk, each chunk covering the
+    next slice of the order date range, so memory is bounded by the chunk size.
+
+    Parameters:
+    directory (str): Destination directory (created if needed).
+    n_sales (int): Number of order lines.
+    n_customers (int): Number of customers. Default is n_sales // 4, at most 2M.
+    n_products (int): Number of products. Default is 2,517.
+    seed (int): Random seed.
+    chunksize (int): Sales rows generated per chunk.
+
+    Returns:
+    dict: The path of each table's CSV file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    n_customers = n_customers or min(max(n_sales // 4, 10), 2_000_000)
+    tables = {
+        'dim_customers': make_customers(n_customers, seed),
+        'dim_products': make_products(n_products or 2517, seed),
+        'dim_stores': make_stores(seed=seed),
+        'dim_exchange_rates': make_exchange_rates(seed=seed),
+    }
+    paths = {name: os.path.join(directory, f'{name}.csv') for name in list(tables) + ['fact_sales']}
+    for name, frame in tables.items():
+        frame.to_csv(paths[name], index=False, date_format=SOURCE_DATE_FORMAT)
+
+    sizes = _chunk_sizes(n_sales, chunksize)
+    days, start = 1800, pd.Timestamp('2016-01-01')
+    with open(paths['fact_sales'], 'w', newline='') as handle:
+        written = 0
+        for i, size in enumerate(sizes):
+            first_day, last_day = days * i // len(sizes), days * (i + 1) // len(sizes)
+            chunk = make_sales(size, tables['dim_customers'], tables['dim_products'],
+                               seed + i, start + pd.Timedelta(days=first_day),
+                               max(last_day - first_day, 1), tables['dim_stores'],
+                               first_order=366000 + written // 2)
+            chunk.to_csv(handle, header=i == 0, index=False, date_format=SOURCE_DATE_FORMAT)
+            written += size
+    return paths
+
+
+def write_goodreads(directory, n_works, n_reviews, seed=0, chunksize=1_000_000):
+    """
+    Write goodreads_works.csv and goodreads_reviews.csv; reviews are written in chunks.
+
+    Parameters:
+    directory (str): Destination directory (created if needed).
+    n_works (int): Number of works.
+    n_reviews (int): Number of reviews.
+    seed (int): Random seed.
+    chunksize (int): Reviews generated per chunk.
+
+    Returns:
+    dict: Paths keyed 'works' and 'reviews'.
+    """
+    os.makedirs(directory, exist_ok=True)
+    works = make_works(n_works, seed=seed)
+    paths = {'works': os.path.join(directory, 'goodreads_works.csv'),
+             'reviews': os.path.join(directory, 'goodreads_reviews.csv')}
+    works.to_csv(paths['works'], index=False)
+    with open(paths['reviews'], 'w', newline='', encoding='utf-8') as handle:
+        written = 0
+        for i, size in enumerate(_chunk_sizes(n_reviews, chunksize)):
+            chunk = make_reviews(size, works, seed + i, first_review=written)
+            chunk.to_csv(handle, header=i == 0, index=False)
+            written += size
+    return paths
+
+
+def write_atliq(directory, n_sales, seed=0):
+    """
+    Write the six gdb023 tables as '<table>.csv' files (dates as YYYY-MM-DD).
+
+    Parameters:
+    directory (str): Destination directory (created if needed).
+    n_sales (int): Number of fact_sales_monthly rows.
+    seed (int): Random seed.
+
+    Returns:
+    dict: The path of each table's CSV file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, frame in make_atliq(n_sales, seed=seed).items():
+        paths[name] = os.path.join(directory, f'{name}.csv')
+        frame.to_csv(paths[name], index=False)
+    return paths
@@ -0,0 +1,148 @@
+# File: date_parsing.py
+
+# Fast parsing of date columns such as 'Order Date' and 'Delivery Date'.
+# pd.to_datetime(..., format='mixed') falls back to dateutil for every element.
+# Here each distinct string is parsed only once (order dates repeat heavily), the
+# formats present are detected from a sample and parsed with an explicit format,
+# and only the stragglers go through the 'mixed' path. Parsed strings are cached,
+# so a DateParser reused across the chunks of a file only parses new strings.
+
+# Import necessary libraries
+import numpy as np
+import pandas as pd
+
+
+# Candidate formats, in order of preference. Month-first comes before day-first to
+# match the default of format='mixed'.
+CANDIDATE_FORMATS = [
+    "%m/%d/%Y",
+    "%Y-%m-%d",
+    "%m/%d/%y",
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%d-%b-%y",
+    "%d-%b-%Y",
+    "%B %d, %Y",
+    "%d/%m/%Y",
+]
+
+
+def detect_formats(values, sample_size=1000, seed=0):
+    """
+    Detect which candidate formats occur in a sample of date strings.
+
+    Parameters:
+    values (array-like): Distinct date strings.
+    sample_size (int): Number of strings to sample.
+    seed (int): Random seed for the sample.
+
+    Returns:
+    list: The formats needed to parse the sample, most common first.
+    """
+    sample = pd.Series(values, dtype="object").dropna()
+    if len(sample) > sample_size:
+        sample = sample.sample(sample_size, random_state=seed)
+    formats = []
+    while len(sample):
+        counts = {}
+        for fmt in CANDIDATE_FORMATS:
+            if fmt not in formats:
+                parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+                counts[fmt] = parsed.notna().sum()
+        best = max(counts, key=counts.get, default=None)
+        if best is None or counts[best] == 0:
+            break
+        formats.append(best)
+        sample = sample[pd.to_datetime(sample, format=best, errors="coerce").isna()]
+    return formats
+
+
+class DateParser:
+    """
+    Parse date strings by format group, caching every distinct string seen.
+
+    Parameters:
+    formats (list): Explicit formats to try; detected from the first column parsed
+        when None.
+    """
+
+    def __init__(self, formats=None):
+        self.formats = formats
+        self._cache = pd.Series(dtype="datetime64[ns]")
+        # Rows parsed per path: each format, 'mixed', 'cached' and 'missing'
+        self.stats = {}
+
+    def _count(self, path, rows):
+        if rows:
+            self.stats[path] = self.stats.get(path, 0) + int(rows)
+
+    def _parse_new(self, strings, counts):
+        """Parse distinct strings not seen before; counts are their row counts."""
+        if self.formats is None:
+            self.formats = detect_formats(strings)
+        parsed = pd.Series(pd.NaT, index=strings, dtype="datetime64[ns]")
+        remaining = np.ones(len(strings), dtype=bool)
+        for fmt in self.formats:
+            if not remaining.any():
+                break
+            attempt = pd.to_datetime(strings[remaining], format=fmt, errors="coerce")
+            ok = np.asarray(attempt.notna())
+            positions = np.flatnonzero(remaining)[ok]
+            parsed.iloc[positions] = np.asarray(attempt)[ok]
+            remaining[positions] = False
+            self._count(fmt, counts[positions].sum())
+        if remaining.any():
+            # Stragglers: anything the detected formats could not parse
+            stragglers = pd.to_datetime(strings[remaining], format="mixed")
+            parsed.iloc[np.flatnonzero(remaining)] = np.asarray(stragglers)
+            self._count("mixed", counts[remaining].sum())
+        return parsed
+
+    def __call__(self, values):
+        """
+        Parse a column of dates.
+
+        Parameters:
+        values (pd.Series): Date strings; datetime columns are returned unchanged.
+
+        Returns:
+        pd.Series: datetime64 values with the index of the input.
+        """
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            return values
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Index(uniques, dtype="object")
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self._count("missing", (codes < 0).sum())
+
+        known = self._cache.index.get_indexer(uniques)
+        new = known < 0
+        self._count("cached", counts[~new].sum())
+        if new.any():
+            parsed = self._parse_new(uniques[new], counts[new])
+            self._cache = pd.concat([self._cache, parsed]) if len(self._cache) else parsed
+            known = self._cache.index.get_indexer(uniques)
+
+        lookup = self._cache.to_numpy()[known]
+        result = np.full(len(codes), np.datetime64("NaT"), dtype=lookup.dtype)
+        result[codes >= 0] = lookup[codes[codes >= 0]]
+        return pd.Series(result, index=values.index, name=values.name)
+
+
+def parse_dates(values, formats=None, stats=None):
+    """
+    Parse a column of date strings (see DateParser).
+
+    Parameters:
+    values (pd.Series): Date strings.
+    formats (list): Explicit formats to try; detected from a sample when None.
+    stats (dict): Optional dict filled with the number of rows per parsing path.
+
+    Returns:
+    pd.Series: The parsed datetime64 values.
+    """
+    parser = DateParser(formats)
+    parsed = parser(values)
+    if stats is not None:
+        stats.update(parser.stats)
+    return parsed
@@ -0,0 +1,109 @@
+# File: dimension_index.py
+
+# Positional lookup index for star-schema dimensions.
+# A dimension is indexed once by its integer surrogate key (ProductKey, CustomerKey,
+# StoreKey); fact rows are then enriched by gathering dimension columns at the
+# looked-up positions, instead of hashing both sides in DataFrame.merge and copying
+# the whole fact table.
+
+# Import necessary libraries
+import numpy as np
+import pandas as pd
+
+
+# Use a dense key -> position array while it stays within this many slots per row;
+# sparser keys fall back to a hash-based pd.Index lookup.
+DENSE_SLOTS_PER_ROW = 4
+
+
+class DimensionIndex:
+    """
+    Lookup index from a dimension's unique key to its row positions.
+
+    Parameters:
+    dimension (pd.DataFrame): The dimension (or any frame with one row per key).
+    key (str): The key column, e.g. 'ProductKey'.
+    """
+
+    def __init__(self, dimension, key):
+        keys = dimension[key]
+        if keys.duplicated().any():
+            raise ValueError(f"Key column '{key}' is not unique")
+        self.dimension = dimension
+        self.key = key
+        self._dense = None
+        self._hashed = None
+
+        values = keys.to_numpy()
+        integer_keys = np.issubdtype(values.dtype, np.integer) and len(values) > 0
+        if integer_keys and values.min() >= 0 and \
+                values.max() < DENSE_SLOTS_PER_ROW * len(values) + 1024:
+            self._dense = np.full(int(values.max()) + 1, -1, dtype=np.int64)
+            self._dense[values] = np.arange(len(values))
+        else:
+            self._hashed = pd.Index(values)
+
+    def __len__(self):
+        return len(self.dimension)
+
+    def positions(self, keys):
+        """
+        Return the dimension row position of each key, or -1 for unknown keys.
+
+        Parameters:
+        keys (array-like): Keys to look up, e.g. a fact table's 'ProductKey' column.
+
+        Returns:
+        np.ndarray: int64 positions aligned with keys.
+        """
+        keys = np.asarray(keys)
+        if self._dense is None or not np.issubdtype(keys.dtype, np.integer):
+            # Sparse dimension keys, or float keys (e.g. after a left join introduced
+            # NaN), go through the hash path
+            if self._hashed is None:
+                self._hashed = pd.Index(self.dimension[self.key].to_numpy())
+            return self._hashed.get_indexer(keys)
+        positions = np.full(len(keys), -1, dtype=np.int64)
+        valid = (keys >= 0) & (keys < len(self._dense))
+        positions[valid] = self._dense[keys[valid]]
+        return positions
+
+    def take(self, column, keys, positions=None):
+        """
+        Gather a dimension column for each key; unknown keys give missing values.
+
+        Parameters:
+        column (str): The dimension column to gather.
+        keys (pd.Series or array-like): Keys to look up. A Series' index is kept.
+        positions (np.ndarray): Positions from a previous positions() call, to
+            gather several columns with a single lookup.
+
+        Returns:
+        pd.Series: The gathered values, named after the column.
+        """
+        if positions is None:
+            positions = self.positions(keys)
+        values = pd.api.extensions.take(self.dimension[column].array, positions,
+                                        allow_fill=bool((positions < 0).any()))
+        index = keys.index if isinstance(keys, pd.Series) else None
+        return pd.Series(values, index=index, name=column)
+
+    def enrich(self, frame, columns, on=None):
+        """
+        Return a copy of frame with dimension columns attached, like a left merge.
+
+        Parameters:
+        frame (pd.DataFrame): The frame to enrich, e.g. fact_sales.
+        columns (list): Dimension columns to attach; existing columns are replaced.
+        on (str): The key column in frame. Default is the index key.
+
+        Returns:
+        pd.DataFrame: The enriched frame, in its original row order. Existing
+            columns are shared with frame, not copied.
+        """
+        keys = frame[on or self.key]
+        positions = self.positions(keys)
+        enriched = frame.copy(deep=False)
+        for column in columns:
+            enriched[column] = self.take(column, keys, positions)
+        return enriched
@@ -0,0 +1,165 @@
+# File: exchange_rates.py
+
+# Multi-currency revenue for the Global Electronics Retailer project.
+# dim_exchange_rates holds, per date and currency, how many units of the currency
+# one US dollar buys. The table is turned once into a dense (currency x day) rate
+# grid with a sorted as-of join, so converting tens of millions of sales is a pair
+# of array gathers instead of a merge that sorts the fact table. The grid is cached
+# on disk and rebuilt only when the exchange-rate table changes.
+
+# Import necessary libraries
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# start: first day of the grid; currencies: pd.Index of codes (grid rows);
+# rates: float64 array of shape (currencies, days); fingerprint: source table hash
+RateIndex = namedtuple("RateIndex", ["start", "currencies", "rates", "fingerprint"])
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _fingerprint(dim_exchange_rates):
+    hashed = pd.util.hash_pandas_object(dim_exchange_rates[["Date", "Currency", "Exchange"]],
+                                        index=False)
+    return int(hashed.sum()) & (2**63 - 1)
+
+
+def build_rate_index(dim_exchange_rates):
+    """
+    Build the dense daily rate grid from the exchange-rate table.
+
+    Every day from the first to the last quoted date gets the latest rate quoted on
+    or before it (an as-of join of the calendar against the sorted rate table).
+
+    Parameters:
+    dim_exchange_rates (pd.DataFrame): 'Date' (datetime), 'Currency' and 'Exchange'.
+
+    Returns:
+    RateIndex: The rate grid.
+    """
+    quotes = dim_exchange_rates[["Date", "Currency", "Exchange"]].dropna()
+    quotes = quotes.assign(Currency=quotes["Currency"].astype(str),
+                           Date=quotes["Date"].dt.normalize()).sort_values("Date")
+    start, end = quotes["Date"].min(), quotes["Date"].max()
+    currencies = pd.Index(sorted(quotes["Currency"].unique()))
+
+    calendar = pd.DataFrame({"Date": pd.date_range(start, end, freq="D")})
+    calendar = calendar.merge(pd.DataFrame({"Currency": currencies}), how="cross")
+    grid = pd.merge_asof(calendar.sort_values("Date"), quotes, on="Date", by="Currency",
+                         direction="backward")
+    rates = (grid.pivot(index="Currency", columns="Date", values="Exchange")
+             .reindex(currencies).to_numpy(dtype="float64"))
+    return RateIndex(start.to_datetime64(), currencies, rates, _fingerprint(dim_exchange_rates))
+
+
+def save_rate_index(index, path):
+    """
+    Save a rate grid to a .npz file.
+
+    Parameters:
+    index (RateIndex): The rate grid.
+    path (str): The destination file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, start=np.array([index.start]), rates=index.rates,
+             currencies=np.array(index.currencies, dtype=str),
+             fingerprint=np.array([index.fingerprint], dtype=np.int64))
+    os.replace(tmp_path, path)
+
+
+def load_rate_index(path):
+    """
+    Load a rate grid saved by save_rate_index.
+
+    Parameters:
+    path (str): The .npz file.
+
+    Returns:
+    RateIndex: The rate grid.
+    """
+    with np.load(path) as saved:
+        return RateIndex(saved["start"][0], pd.Index(saved["currencies"].tolist()),
+                         saved["rates"], int(saved["fingerprint"][0]))
+
+
+def cached_rate_index(dim_exchange_rates, path):
+    """
+    Return the rate grid for the exchange-rate table, reusing the cached grid at
+    path when it was built from the same table.
+
+    Parameters:
+    dim_exchange_rates (pd.DataFrame): The exchange-rate table.
+    path (str): The cache file (.npz).
+
+    Returns:
+    RateIndex: The rate grid.
+    """
+    if os.path.exists(path):
+        index = load_rate_index(path)
+        if index.fingerprint == _fingerprint(dim_exchange_rates):
+            return index
+    index = build_rate_index(dim_exchange_rates)
+    save_rate_index(index, path)
+    return index
+
+
+def lookup_rates(index, currency, dates):
+    """
+    Look up the as-of exchange rate for each (currency, date) pair.
+
+    Dates after the last quote use the last rate; dates before the first quote and
+    unknown currencies give NaN.
+
+    Parameters:
+    index (RateIndex): The rate grid.
+    currency (pd.Series): Currency codes (object, string or categorical).
+    dates (pd.Series): Datetime values.
+
+    Returns:
+    np.ndarray: float64 rates aligned with the inputs.
+    """
+    currency = currency.astype("category") if not isinstance(
+        currency.dtype, pd.CategoricalDtype) else currency
+    # Map the (few) categories to grid rows once, then gather by category code
+    category_rows = index.currencies.get_indexer(currency.cat.categories.astype(str))
+    codes = currency.cat.codes.to_numpy()
+    rows = np.where(codes >= 0, category_rows[codes], -1)
+
+    values = dates.to_numpy(dtype="datetime64[ns]")
+    start = np.datetime64(index.start, "ns").astype(np.int64)
+    days = (values.astype(np.int64) - start) // _NS_PER_DAY
+    n_days = index.rates.shape[1]
+    valid = (rows >= 0) & (days >= 0) & ~np.isnat(values)
+    rates = np.full(len(rows), np.nan)
+    rates[valid] = index.rates[rows[valid], np.minimum(days[valid], n_days - 1)]
+    return rates
+
+
+def add_currency_revenue(sales, index, reporting_currency="USD", revenue="Total Revenue"):
+    """
+    Add local- and reporting-currency revenue to sales priced in USD.
+
+    Parameters:
+    sales (pd.DataFrame): Sales with 'Order Date', 'Currency Code' and a USD revenue column.
+    index (RateIndex): The rate grid.
+    reporting_currency (str): Currency of the 'Reporting Revenue' column. Default is 'USD'.
+    revenue (str): The USD revenue column. Default is 'Total Revenue'.
+
+    Returns:
+    pd.DataFrame: sales with 'Exchange Rate', 'Local Revenue' (in the sale's
+        Currency Code) and 'Reporting Revenue' columns added in place.
+    """
+    sales["Exchange Rate"] = lookup_rates(index, sales["Currency Code"], sales["Order Date"])
+    sales["Local Revenue"] = sales[revenue] * sales["Exchange Rate"]
+    if reporting_currency == "USD":
+        sales["Reporting Revenue"] = sales[revenue]
+    else:
+        reporting = pd.Series(reporting_currency, index=sales.index, dtype="category")
+        sales["Reporting Revenue"] = sales[revenue] * lookup_rates(index, reporting,
+                                                                   sales["Order Date"])
+    return sales
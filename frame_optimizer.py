@@ -0,0 +1,156 @@
+# File: frame_optimizer.py
+
+# Automatic memory reduction for DataFrames.
+# The pandas tutorial shrinks a frame by hand (bool flags, integer salaries,
+# category teams); optimize_frame() applies the same conversions column by column
+# from a quick profile of each column, and only when they are lossless:
+# - integers are downcast to the smallest integer type holding their range
+# - floats become float32 only if every value survives the round trip, and
+#   integers if they are whole numbers without missing values
+# - text columns with few distinct values (relative to their length) become category
+# - object columns holding only booleans become bool (or nullable boolean)
+
+# Import necessary libraries
+import numpy as np
+import pandas as pd
+
+
+# Text columns with at most this share of distinct values become categorical
+CATEGORY_MAX_RATIO = 0.5
+
+
+def profile_column(series):
+    """
+    Profile a column for optimization.
+
+    Parameters:
+    series (pd.Series): The column.
+
+    Returns:
+    dict: 'dtype', 'rows' and 'nulls'; numeric columns add their 'min' and 'max',
+        other columns their number of 'distinct' values and 'cardinality'
+        (distinct / rows).
+    """
+    profile = {"dtype": str(series.dtype), "rows": len(series), "nulls": int(series.isna().sum())}
+    dtype = series.dtype
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        profile["min"], profile["max"] = series.min(), series.max()
+    else:
+        profile["distinct"] = int(series.nunique(dropna=True))
+        profile["cardinality"] = profile["distinct"] / len(series) if len(series) else 0.0
+    return profile
+
+
+def _smallest_integer(low, high, unsigned=False):
+    for dtype in (["uint8", "uint16", "uint32"] if unsigned else ["int8", "int16", "int32"]):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return "uint64" if unsigned else "int64"
+
+
+def optimize_column(series, profile=None, max_ratio=CATEGORY_MAX_RATIO):
+    """
+    Return the column converted to its most compact lossless dtype.
+
+    Parameters:
+    series (pd.Series): The column.
+    profile (dict): The column's profile_column(); computed when None.
+    max_ratio (float): Largest distinct/rows ratio for a text column to become
+        categorical.
+
+    Returns:
+    pd.Series: The converted column (the input itself when nothing applies).
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype) or \
+            pd.api.types.is_datetime64_any_dtype(dtype) or \
+            isinstance(dtype, pd.PeriodDtype) or pd.api.types.is_timedelta64_dtype(dtype):
+        return series
+    profile = profile or profile_column(series)
+    if profile["nulls"] == profile["rows"]:
+        return series
+    nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+
+    if pd.api.types.is_integer_dtype(dtype):
+        target = _smallest_integer(profile["min"], profile["max"],
+                                   pd.api.types.is_unsigned_integer_dtype(dtype))
+        return series.astype(target.capitalize().replace("Uint", "UInt") if nullable else target)
+
+    if pd.api.types.is_float_dtype(dtype):
+        values = series.dropna().to_numpy(dtype="float64")
+        if not profile["nulls"] and np.array_equal(values, np.trunc(values)) and \
+                -2**63 <= profile["min"] and profile["max"] < 2**63:
+            return series.astype(_smallest_integer(profile["min"], profile["max"]))
+        if series.dtype == "float64" and np.array_equal(values.astype("float32"), values):
+            return series.astype("float32")
+        return series
+
+    # Text (object or string) columns
+    values = series.dropna()
+    if pd.api.types.is_object_dtype(dtype) and values.map(type).eq(bool).all():
+        return series.astype("boolean" if profile["nulls"] else "bool")
+    if profile["cardinality"] <= max_ratio:
+        return series.astype("category")
+    return series
+
+
+def optimize_frame(df, exclude=None, max_ratio=CATEGORY_MAX_RATIO):
+    """
+    Shrink a DataFrame by converting every column to a compact lossless dtype.
+
+    Parameters:
+    df (pd.DataFrame): The frame to optimize.
+    exclude (list): Columns to leave untouched, e.g. ones with declared dtypes.
+    max_ratio (float): Largest distinct/rows ratio for a text column to become
+        categorical.
+
+    Returns:
+    tuple: (optimized pd.DataFrame, report pd.DataFrame with each column's nulls,
+        cardinality (text columns), and dtype and memory in bytes before and after)
+    """
+    exclude = set(exclude or ())
+    optimized = df.copy(deep=False)
+    rows = []
+    for column in df.columns:
+        before = df[column]
+        if column in exclude:
+            after, profile = before, {}
+        else:
+            profile = profile_column(before)
+            after = optimize_column(before, profile, max_ratio)
+        if after is not before:
+            optimized[column] = after
+        rows.append({
+            "column": column,
+            "nulls": profile.get("nulls"),
+            "cardinality": profile.get("cardinality"),
+            "dtype_before": str(before.dtype),
+            "dtype_after": str(after.dtype),
+            "memory_before": before.memory_usage(index=False, deep=True),
+            "memory_after": after.memory_usage(index=False, deep=True),
+        })
+    report = pd.DataFrame(rows, columns=["column", "nulls", "cardinality", "dtype_before",
+                                         "dtype_after", "memory_before", "memory_after"])
+    return optimized, report.set_index("column")
+
+
+def format_memory_report(report):
+    """
+    Format an optimize_frame report as a one-line summary.
+
+    Parameters:
+    report (pd.DataFrame): The report returned by optimize_frame.
+
+    Returns:
+    str: Total memory before and after, and the converted columns.
+    """
+    before, after = report["memory_before"].sum(), report["memory_after"].sum()
+    changed = report[report["dtype_before"] != report["dtype_after"]]
+    line = f"{before / 2**20:.1f} MB -> {after / 2**20:.1f} MB"
+    if before:
+        line += f" ({1 - after / before:.0%} smaller)"
+    if len(changed):
+        line += "; " + ", ".join(f"{column} {row.dtype_before}->{row.dtype_after}"
+                                 for column, row in changed.iterrows())
+    return line
@@ -1,378 +1,672 @@
 # File: global_electronics_retailer.py
 
 # This script is basically meant to preprocess data on the Global Electronics Retailer project for Power BI visualization.
+# The steps run through run_pipeline(config), which can be imported or started from the
+# command line:
+#   python global_electronics_retailer.py --data-dir Data --output-dir Out --plots none
+# matplotlib and seaborn are only imported when plots are shown or saved to files, so
+# headless scheduled runs (--plots none) start faster and never open GUI windows.
 
 # Import necessary libraries
+import argparse
+import os
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from date_parsing import parse_dates
+from dimension_index import DimensionIndex
+from exchange_rates import cached_rate_index, add_currency_revenue
+from retailer_export import export_path, export_table, format_export_stats
+from retailer_io import load_cached, load_table, iter_table, load_star_schema, format_load_stats
+from retailer_rfm import (rfm_snapshot, rfm_metrics, rfm_scores, rfm_segment,
+                          stream_rfm, refresh_rfm_states, rfm_watermark,
+                          metrics_from_state, store_performance_from_state,
+                          RFM_METRICS,
+                          CUSTOMER_SEGMENTS, CUSTOMER_DEFAULT_SEGMENT,
+                          PRODUCT_SEGMENTS, PRODUCT_DEFAULT_SEGMENT)
+from stage_profiler import stage, reset_profile, report_profile, profiling_enabled
 
 
 # Function to load data from a CSV file
 # This function reads a CSV file and returns a pandas DataFrame.
+# When a star-schema table name is given, the file is read with the typed spec from
+# retailer_io.TABLE_SPECS (optionally in chunks), served from the Parquet cache on
+# later runs, and the load statistics are printed.
 # It also handles exceptions that may occur during the loading process.
 
-def load_data(file_path, encoding="utf-8"):
+def load_data(file_path, encoding="utf-8", table=None, chunksize=None, columns=None,
+              use_cache=True):
     """
     Load data from a CSV file into a pandas DataFrame.
 
     Parameters:
     file_path (str): The path to the CSV file.
     encoding (str): The encoding of the CSV file. Default is 'utf-8'.
+    table (str): Optional star-schema table name used to pick dtypes and date columns.
+    chunksize (int): Optional number of rows per chunk for typed loads.
+    columns (list): Optional subset of columns to load for typed loads.
+    use_cache (bool): Serve typed loads from the Parquet cache. Default is True.
 
     Returns:
     pd.DataFrame: The loaded data as a DataFrame.
     """
     try:
-        data = pd.read_csv(file_path, encoding=encoding)
+        if table is None:
+            return pd.read_csv(file_path, encoding=encoding)
+        if use_cache:
+            data, stats = load_cached(table, file_path, encoding=encoding, columns=columns,
+                                      chunksize=chunksize, track_memory=profiling_enabled())
+        else:
+            data, stats = load_table(table, file_path, encoding=encoding, chunksize=chunksize,
+                                     usecols=columns, track_memory=profiling_enabled())
+        print(format_load_stats(stats))
         return data
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
-# Load the customer dimension data
-file_path = "/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/dim_customers.csv"
 
-dim_customer = load_data(file_path, encoding="ISO-8859-1")
+# Rows per chunk when streaming the sales fact table
+FACT_SALES_CHUNKSIZE = 1_000_000
+
+# Sales fact columns used by this script (the cache only reads these back)
+# ('Line Item' identifies the rows already folded into the incremental RFM state)
+FACT_SALES_COLUMNS = ['Order Number', 'Line Item', 'Order Date', 'Delivery Date',
+                      'CustomerKey', 'StoreKey', 'ProductKey', 'Quantity', 'Currency Code']
+
+# Directory holding the running customer/product/store RFM states for incremental
+# refreshes; only the sales from the stored watermark day on are kept while reading
+# fact_sales. None recomputes RFM from the full sales history on every run.
+RFM_STATE_DIR = None
+
+# Out-of-core mode: stream fact_sales in chunks and keep only per-customer/product/store
+# partial aggregates instead of materializing the whole table
+STREAM_FACT_SALES = False
+
+# Directory holding the five star-schema CSV extracts
+DATA_DIR = "/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data"
+
+# Currency of the 'Reporting Revenue' column
+REPORTING_CURRENCY = 'USD'
+
+# Settings of run_pipeline; any subset can be overridden by the config passed in.
+# - data_dir: directory holding the star-schema CSV extracts
+# - output_dir: where the Power BI extracts are written (default: data_dir)
+# - export_format: 'csv', 'csv.gz' or 'parquet' (see retailer_export)
+# - export_workers: threads compressing the csv.gz extract chunks (plain CSV is
+#   formatted serially, see retailer_export)
+# - export_date_format: how dates (Birthday, Open Date) are written in the CSV
+#   extracts; they are parsed at load time, and this keeps the mm/dd/yyyy text of
+#   the source files instead of ISO dates
+# - plots: 'show' (interactive windows), 'files' (PNG files in plot_dir) or 'none'
+# - plot_dir: directory for plots='files' (default: output_dir/plots)
+# - rate_index_cache: where the daily exchange rate grid built from dim_exchange_rates is
+#   cached between runs (default: data_dir/.parquet_cache/exchange_rate_index.npz)
+DEFAULT_CONFIG = {
+    'data_dir': DATA_DIR,
+    'output_dir': None,
+    'export_format': 'csv',
+    'export_workers': None,
+    'export_date_format': '%m/%d/%Y',
+    'encoding': 'ISO-8859-1',
+    'use_cache': True,
+    'fact_sales_chunksize': FACT_SALES_CHUNKSIZE,
+    'fact_sales_columns': FACT_SALES_COLUMNS,
+    'rfm_state_dir': RFM_STATE_DIR,
+    'stream_fact_sales': STREAM_FACT_SALES,
+    'reporting_currency': REPORTING_CURRENCY,
+    'rate_index_cache': None,
+    'plots': 'show',
+    'plot_dir': None,
+}
+
+# Steps are timed with stage_profiler when the RETAILER_PROFILE environment variable
+# is set (e.g. RETAILER_PROFILE=1, or RETAILER_PROFILE=trace.json to keep the trace);
+# the summary is printed at the end of the run
+
+
+def _pyplot(mode):
+    """Import matplotlib and seaborn on first use; 'files' renders without a display."""
+    import matplotlib
+    if mode == 'files':
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+
+def plot_bars(config, name, data, x, y, title, xlabel, ylabel, count=False):
+    """
+    Draw a viridis bar chart (or a count plot of x) as configured by config['plots'].
 
-# Check if the data was loaded successfully
-if dim_customer is not None:
-    print("Customer dimension data loaded successfully.")
-else:
-    print("Failed to load customer dimension data.")
+    Parameters:
+    config (dict): The pipeline config ('plots' and 'plot_dir').
+    name (str): File name of the plot, without extension, for plots='files'.
+    data (pd.DataFrame): The data to plot.
+    x (str): The column on the x axis.
+    y (str): The column on the y axis; ignored for count plots.
+    title (str): The plot title.
+    xlabel (str): The x axis label.
+    ylabel (str): The y axis label.
+    count (bool): Draw sns.countplot of x instead of sns.barplot.
+    """
+    mode = config['plots']
+    if mode in (None, 'none'):
+        return
+    plt, sns = _pyplot(mode)
+    plt.figure(figsize=(12, 6))
+    if count:
+        sns.countplot(data=data, x=x, palette='viridis', hue=x, legend=False)
+    else:
+        sns.barplot(x=x, y=y, data=data, palette='viridis', hue=y, legend=False)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.xticks(rotation=45)
+    if mode == 'files':
+        os.makedirs(config['plot_dir'], exist_ok=True)
+        plt.savefig(os.path.join(config['plot_dir'], f'{name}.png'), bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
 
-# Load the product dimension data
-file_path = "/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/dim_products.csv"
 
-dim_product = load_data(file_path, encoding="ISO-8859-1")
+def load_tables(config):
+    """
+    Load the customer, product, store, exchange rate and sales tables concurrently.
 
-# Check if the data was loaded successfully
-if dim_product is not None:
-    print("Product dimension data loaded successfully.")
-else:
-    print("Failed to load product dimension data.")
+    Parameters:
+    config (dict): The pipeline config.
 
+    Returns:
+    retailer_io.StarSchema: The tables; fact_sales is None in streaming and
+        incremental mode.
+    """
+    with stage('load') as current:
+        star_schema = load_star_schema({
+            "data_dir": config['data_dir'],
+            "encoding": config['encoding'],
+            "use_cache": config['use_cache'],
+            "columns": {"fact_sales": config['fact_sales_columns']},
+            "chunksize": {"fact_sales": config['fact_sales_chunksize']},
+            # Peak memory is only traced (at a cost) when profiling is on
+            "track_memory": profiling_enabled(),
+            "tables": ["dim_customers", "dim_products", "dim_stores", "dim_exchange_rates"]
+                      + ([] if uses_sales_states(config) else ["fact_sales"]),
+        })
+        current.output(star_schema.stats["total"]["rows"])
+
+    # Report how long each table took; the total is bounded by the slowest table
+    for table_stats in star_schema.stats.values():
+        print(format_load_stats(table_stats))
+    return star_schema
+
+
+def customer_demographics(dim_customer, config):
+    """
+    Count customers by country and by gender, and plot both counts.
 
-# Load the store dimension data
-file_path = "/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/dim_stores.csv"
+    Parameters:
+    dim_customer (pd.DataFrame): The customer dimension.
+    config (dict): The pipeline config.
 
-dim_stores = load_data(file_path, encoding="ISO-8859-1")
+    Returns:
+    tuple: (customers per country, customers per gender), largest first.
+    """
+    # Total number of customers by country, and gender
+    customer_country = dim_customer.groupby('Country').size().reset_index(name='total_customers')
+    customer_country = customer_country.sort_values(by='total_customers', ascending=False)
+    customer_country.reset_index(drop=True, inplace=True)
+    plot_bars(config, 'customers_by_country', customer_country, 'total_customers', 'Country',
+              'Total Number of Customers by Country', 'Total Customers', 'Country')
+
+    customer_gender = dim_customer.groupby('Gender').size().reset_index(name='total_customers')
+    customer_gender = customer_gender.sort_values(by='total_customers', ascending=False)
+    customer_gender.reset_index(drop=True, inplace=True)
+    plot_bars(config, 'customers_by_gender', customer_gender, 'total_customers', 'Gender',
+              'Total Number of Customers by Gender', 'Total Customers', 'Gender')
+    return customer_country, customer_gender
+
+
+def fill_state_codes(dim_customer):
+    """
+    Fill missing 'State Code' values with 'NA'.
 
-# Check if the data was loaded successfully
-if dim_stores is not None:
-    print("Store dimension data loaded successfully.")
-else:
-    print("Failed to load store dimension data.")
+    Parameters:
+    dim_customer (pd.DataFrame): The customer dimension; modified in place.
 
-# Load exchange rates dimension data
-file_path = "/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/dim_exchange_rates.csv"
+    Returns:
+    pd.DataFrame: The customers that had no 'State Code'.
+    """
+    missing_state_code = dim_customer[dim_customer['State Code'].isnull()]
+    # ('State Code' is loaded as a category, so 'NA' has to be registered as a category first)
+    if 'NA' not in dim_customer['State Code'].cat.categories:
+        dim_customer['State Code'] = dim_customer['State Code'].cat.add_categories('NA')
+    dim_customer['State Code'] = dim_customer['State Code'].fillna('NA')
+    return missing_state_code
 
-dim_exchange_rates = load_data(file_path, encoding="ISO-8859-1")
 
-# Check if the data was loaded successfully
-if dim_exchange_rates is not None:
-    print("Exchange rates dimension data loaded successfully.")
-else:
-    print("Failed to load exchange rates dimension data.")
+def convert_sales_dates(fact_sales):
+    """
+    Convert the sales date columns to datetime and add 'Order Year' and 'Order Month'.
 
-# Load the sales fact data
-file_path = "/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/fact_sales.csv"
+    Parameters:
+    fact_sales (pd.DataFrame): The sales facts; modified in place.
+    """
+    with stage('date_conversion', rows_in=fact_sales) as current:
+        # Convert 'Order Date' and 'Delivery Date' to datetime format
+        # (already done by the typed loader; parse_dates returns datetime columns unchanged)
+        fact_sales['Order Date'] = parse_dates(fact_sales['Order Date'])
+        fact_sales['Delivery Date'] = parse_dates(fact_sales['Delivery Date'])
 
-fact_sales = load_data(file_path, encoding="ISO-8859-1")
+        # Extract year and month from 'Order Date' for sales trends analysis
+        fact_sales['Order Year'] = fact_sales['Order Date'].dt.year
+        fact_sales['Order Month'] = fact_sales['Order Date'].dt.month
+        current.output(fact_sales)
 
-# Check if the data was loaded successfully
-if fact_sales is not None:
-    print("Sales fact data loaded successfully.")
-else:
-    print("Failed to load sales fact data.")
 
+def rfm_by_key(name, key, monetary, fact_sales, sales_states, snapshot):
+    """
+    Aggregate Recency, Frequency and Monetary per customer or product.
 
-# Understanding customer demographics
+    Parameters:
+    name (str): The stage name, e.g. 'customer_rfm'.
+    key (str): 'CustomerKey' or 'ProductKey'.
+    monetary (str): The summed column used as Monetary.
+    fact_sales (pd.DataFrame): The sales facts (None in streaming and incremental mode).
+    sales_states (dict): Streamed or refreshed states per key (None otherwise).
+    snapshot (pd.Timestamp): Reference date for Recency.
 
-dim_customer.head()
+    Returns:
+    pd.DataFrame: The RFM metrics per key.
+    """
+    with stage(f'{name}_metrics', rows_in=fact_sales) as current:
+        if sales_states is not None:
+            metrics = metrics_from_state(sales_states[key], monetary, snapshot)
+        else:
+            metrics = rfm_metrics(fact_sales, key, monetary, snapshot)
+        current.output(metrics)
+    return metrics
 
-# Total number of customers by country, and gender
-customer_country = dim_customer.groupby('Country').size().reset_index(name='total_customers')
 
-customer_country = customer_country.sort_values(by='total_customers', ascending=False)
+def segment_customers(dim_customer, customer_rfm):
+    """
+    Attach RFM metrics, quantile scores and the customer segment to the customers.
 
-customer_country.reset_index(drop=True, inplace=True)
+    Parameters:
+    dim_customer (pd.DataFrame): The customer dimension.
+    customer_rfm (pd.DataFrame): RFM metrics per CustomerKey.
 
-customer_country
+    Returns:
+    pd.DataFrame: Customers with sales, with their RFM columns and Customer_Category.
+    """
+    with stage('customer_rfm_scoring', rows_in=dim_customer) as current:
+        # Merge with customer dimension to get customer demographics
+        dim_customer = DimensionIndex(customer_rfm, 'CustomerKey').enrich(dim_customer, RFM_METRICS)
 
-# plotting the total number of customers by country
-plt.figure(figsize=(12, 6))
-sns.barplot(x='total_customers', y='Country', data=customer_country, palette='viridis',
-            hue='Country', legend=False)
-plt.title('Total Number of Customers by Country')
-plt.xlabel('Total Customers')
-plt.ylabel('Country')
-plt.xticks(rotation=45)
-plt.show()
+        # Drop rows with NaN values in 'Recency', 'Frequency', or 'Monetary'
+        dim_customer = dim_customer.dropna(subset=['Recency', 'Frequency', 'Monetary'])
 
-# Total number of customers by gender
-customer_gender = dim_customer.groupby('Gender').size().reset_index(name='total_customers')
+        # Quantile-based scoring for RFM (4 = best for Recency; Frequency/Monetary ranked 1 to 4)
+        # and the combined RFM_Score
+        dim_customer = rfm_scores(dim_customer)
 
-customer_gender = customer_gender.sort_values(by='total_customers', ascending=False)
+        # Segmentation based on RFM scores (Champions >= 9, Loyal Customers >= 6,
+        # Potential Loyalists >= 4, otherwise At Risk)
+        dim_customer['Customer_Category'] = rfm_segment(dim_customer['RFM_Score'],
+                                                        CUSTOMER_SEGMENTS, CUSTOMER_DEFAULT_SEGMENT)
+        current.output(dim_customer)
+    return dim_customer
 
-customer_gender.reset_index(drop=True, inplace=True)
 
-customer_gender
+def add_product_revenue(fact_sales, product_index, dim_exchange_rates, config):
+    """
+    Add unit price, USD revenue and local/reporting currency revenue to the sales.
 
-# plotting the total number of customers by gender
-plt.figure(figsize=(12, 6))
-sns.barplot(x='total_customers', y='Gender', data=customer_gender, palette='viridis',
-            hue='Gender', legend=False)
-plt.title('Total Number of Customers by Gender')
-plt.xlabel('Total Customers')
-plt.ylabel('Gender')
-plt.xticks(rotation=45)
-plt.show()
+    Parameters:
+    fact_sales (pd.DataFrame): The sales facts.
+    product_index (DimensionIndex): The product dimension indexed by ProductKey.
+    dim_exchange_rates (pd.DataFrame): The exchange-rate table.
+    config (dict): The pipeline config.
 
-# Handling missing values in field 'State Code'. 
-# First show the data segment with missing values in 'State Code'
+    Returns:
+    tuple: (sales with the revenue columns, revenue per sales currency)
+    """
+    with stage('product_revenue', rows_in=fact_sales) as current:
+        # Look up Unit Price USD from dim_product for each sale using ProductKey
+        # (replaces any Unit Price USD column already present in the extract)
+        fact_sales['Unit Price USD'] = product_index.take('Unit Price USD', fact_sales['ProductKey'])
 
-missing_state_code = dim_customer[dim_customer['State Code'].isnull()]
+        # Calculate total revenue for each order
+        fact_sales['Total Revenue'] = fact_sales['Quantity'] * fact_sales['Unit Price USD']
 
-missing_state_code
+        # Convert the USD revenue to each sale's local currency and to the reporting currency
+        # using the exchange rate in effect on the order date (as-of lookup)
+        rate_index = cached_rate_index(dim_exchange_rates, config['rate_index_cache'])
+        fact_sales = add_currency_revenue(fact_sales, rate_index, config['reporting_currency'])
 
-# Fill missing values in 'State Code' with 'NA'
-dim_customer['State Code'].fillna('NA', inplace=True)
+        # Revenue per sales currency, in USD and in local currency
+        revenue_by_currency = fact_sales.groupby('Currency Code', observed=True)[
+            ['Total Revenue', 'Local Revenue']].sum().reset_index()
+        current.output(fact_sales)
+    return fact_sales, revenue_by_currency
 
-# Coverting date date to datetime format
-# Check the data types of the columns in the sales fact data
-fact_sales.dtypes
-# Convert 'Order Date' and 'Delivery Date' to datetime format
-fact_sales['Order Date'] = pd.to_datetime(fact_sales['Order Date'], format='mixed')
-fact_sales['Delivery Date'] = pd.to_datetime(fact_sales['Delivery Date'], format='mixed')
 
-# Extract year and month from 'Order Date' for sales trends analysis
-fact_sales['Order Year'] = fact_sales['Order Date'].dt.year
-fact_sales['Order Month'] = fact_sales['Order Date'].dt.month
+def segment_products(dim_product, rfm_product):
+    """
+    Attach RFM metrics, scores, RFM_Segment and Product_Segment to the products.
 
-# Customer RFM Segmentation
-# Calculate Recency, Frequency, and Monetary values for each customer
+    Parameters:
+    dim_product (pd.DataFrame): The product dimension.
+    rfm_product (pd.DataFrame): RFM metrics per ProductKey.
 
-# Aggregate RFM metrics per customer
-snapshot = fact_sales['Order Date'].max() + pd.Timedelta(days=1)
+    Returns:
+    pd.DataFrame: Products with sales, with their RFM columns and segment.
+    """
+    with stage('product_rfm_scoring', rows_in=dim_product) as current:
+        # Merge rfm_product with product dimension to get product details
+        dim_product = DimensionIndex(rfm_product, 'ProductKey').enrich(dim_product, RFM_METRICS)
 
-customer_rfm = fact_sales.groupby('CustomerKey').agg({
-    'Order Date': lambda x: (snapshot - x.max()).days,  # Recency
-    'Order Number': 'count',  # Frequency
-    'Quantity': 'sum'  # Monetary
-}).rename(columns={
-    'Order Date': 'Recency',
-    'Order Number': 'Frequency',
-    'Quantity': 'Monetary'
-}).reset_index()
+        # Remove rows with NaN values in 'Recency', 'Frequency', or 'Monetary'
+        dim_product = dim_product.dropna(subset=['Recency', 'Frequency', 'Monetary'])
 
-# Display the RFM DataFrame
-customer_rfm.head()
+        # Quantile-based scoring for RFM (4 = best for Recency; Frequency/Monetary ranked 1 to 4)
+        dim_product = rfm_scores(dim_product)
 
-# Merge with customer dimension to get customer demographics
-dim_customer = dim_customer.merge(customer_rfm[['CustomerKey', 'Recency', 'Frequency', 'Monetary']], on='CustomerKey', how='left')
+        # Three-digit segment code, e.g. '443' (scores are single digits)
+        dim_product['RFM_Segment'] = (dim_product['R_Score'] * 100 + dim_product['F_Score'] * 10
+                                      + dim_product['M_Score']).astype(str)
 
-dim_customer.head()
+        # Segmentation based on RFM scores for product (Best Sellers >= 9, Steady Movers >= 6,
+        # Potential Stars >= 4, Low Performers >= 2, otherwise Underdogs)
+        dim_product['Product_Segment'] = rfm_segment(dim_product['RFM_Score'],
+                                                     PRODUCT_SEGMENTS, PRODUCT_DEFAULT_SEGMENT)
+        current.output(dim_product)
+    return dim_product
 
-# Drop rows with NaN values in 'Recency', 'Frequency', or 'Monetary'
-dim_customer = dim_customer.dropna(subset=['Recency', 'Frequency', 'Monetary'])
 
-# Quantile-based scoring for RFM (1 = best, 4 = worst; reversed for Frequency/Monetary)
-dim_customer['R_Score'] = pd.qcut(dim_customer['Recency'], 4, labels=[4, 3, 2, 1]).astype(int)
-# Frequency and Monetary scores are reversed since lower values are better for Recency
-dim_customer['F_Score'] = pd.qcut(dim_customer['Frequency'].rank(method='first'), 4, labels=[1, 2, 3, 4]).astype(int)
-dim_customer['M_Score'] = pd.qcut(dim_customer['Monetary'].rank(method='first'), 4, labels=[1, 2, 3, 4]).astype(int)
+def rfm_summary(frame, segment, key, count_name):
+    """
+    Count the members of each segment and average their Recency, Frequency and Monetary.
 
-# Combine scores into segment labels
-dim_customer['RFM_Score'] = dim_customer[['R_Score', 'F_Score', 'M_Score']].sum(axis=1)
+    Parameters:
+    frame (pd.DataFrame): Scored customers or products.
+    segment (str): The segment column.
+    key (str): The key column that is counted.
+    count_name (str): The name of the count column.
 
-dim_customer.head()
+    Returns:
+    pd.DataFrame: One row per segment.
+    """
+    return frame.groupby(segment).agg({
+        key: 'count',
+        'Recency': 'mean',
+        'Frequency': 'mean',
+        'Monetary': 'mean'
+    }).rename(columns={key: count_name}).reset_index()
 
-# Segmentation based on RFM scores
-def customer_grouping(row):
-    if row['RFM_Score'] >= 9:
-        return 'Champions'
-    elif row['RFM_Score'] >= 6:
-        return 'Loyal Customers'
-    elif row['RFM_Score'] >= 4:
-        return 'Potential Loyalists'
-    else:
-        return 'At Risk'
-
-dim_customer['Customer_Category'] = dim_customer.apply(customer_grouping, axis=1)
-
-# Display the RFM DataFrame with segments
-dim_customer.head()
-
-# Plotting RFM Segments
-plt.figure(figsize=(12, 6))
-sns.countplot(data=dim_customer, x='Customer_Category', palette='viridis', hue='Customer_Category', legend=False)
-plt.title('Customer Segments based on RFM Analysis')
-plt.xlabel('Customer Segment')
-plt.ylabel('Number of Customers')
-plt.xticks(rotation=45)
-plt.show()
-
-dim_customer.to_csv('/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/dim_customer.csv', index=False)
-
-# RFM Analysis Summary
-rfm_summary = dim_customer.groupby('Customer_Category').agg({
-    'CustomerKey': 'count',
-    'Recency': 'mean',
-    'Frequency': 'mean',
-    'Monetary': 'mean'
-}).rename(columns={'CustomerKey': 'Total Customers'}).reset_index()
-
-rfm_summary
-
-# RFM analysis for products
-# Merge Unit Price USD from dim_product into fact_sales using ProductKey
-# Strip the dollar sign and comma from 'Unit Price USD' in dim_product and convert to float
-dim_product['Unit Price USD'] = dim_product['Unit Price USD'].replace({'\$': '', ',': ''}, 
-                                                                      regex=True).astype(float)
-
-dim_product['Unit Cost USD'] = dim_product['Unit Cost USD'].replace({'\$': '', ',': ''},
-                                                                      regex=True).astype(float)
-# Display the first few rows of dim_product to verify the changes
-dim_product.dtypes
-
-fact_sales = fact_sales.merge(dim_product[['ProductKey', 'Unit Price USD']], 
-                              on='ProductKey', how='left')
-
-# remove columns unit price usdx and total revenue from fact_sales
-fact_sales.drop(columns=['Unit Price USD_x', 'Total Revenue'], inplace=True, errors='ignore')
-
-fact_sales.rename(columns={'Unit Price USD_y': 'Unit Price USD'}, inplace=True)
-fact_sales.head()
-
-fact_sales.dtypes
-
-# Calculate total revenue for each order
-fact_sales['Total Revenue'] = fact_sales['Quantity'] * fact_sales['Unit Price USD']
-# Aggregate RFM metrics per product
-rfm_product = fact_sales.groupby('ProductKey').agg({
-    'Order Date': lambda x: (snapshot - x.max()).days,  # Recency
-    'Order Number': 'count',  # Frequency
-    'Total Revenue': 'sum'  # Monetary
-}).rename(columns={
-    'Order Date': 'Recency',
-    'Order Number': 'Frequency',
-    'Total Revenue': 'Monetary'
-}).reset_index()
-
-rfm_product.head()
-
-# Merge rfm_product with product dimension to get product details
-columns_to_merge = ['ProductKey', 'Recency', 'Frequency', 'Monetary']
-dim_product = dim_product.merge(rfm_product[columns_to_merge], on='ProductKey', how='left')
-
-dim_product.head()
-
-# Remove rows with NaN values in 'Recency', 'Frequency', or 'Monetary'
-dim_product = dim_product.dropna(subset=['Recency', 'Frequency', 'Monetary'])
-
-# Quantile-based scoring for RFM (1 = best, 4 = worst; reversed for Frequency/Monetary)
-dim_product['R_Score'] = pd.qcut(dim_product['Recency'], 4, labels=[4, 3, 2, 1]).astype(int)
-# Frequency and Monetary scores are reversed since lower values are better for Recency
-dim_product['F_Score'] = pd.qcut(
-    dim_product['Frequency'].rank(
-        method='first'), 4, labels=[1, 2, 3, 4]
-    ).astype(int)
-dim_product['M_Score'] = pd.qcut(
-    dim_product['Monetary'].rank(
-        method='first'), 4, labels=[1, 2, 3, 4]
-    ).astype(int)
-
-dim_product['RFM_Score'] = dim_product[['R_Score', 'F_Score', 'M_Score']].sum(axis=1)
-
-dim_product.head()
-
-dim_product['RFM_Segment'] = dim_product['R_Score'].astype(str) + dim_product['F_Score'].astype(str) + dim_product['M_Score'].astype(str)
-
-# Segmentation based on RFM scores for product
-def rfm_product_segment(row):
-    if row['RFM_Score'] >= 9:
-        return 'Best Sellers'
-    elif row['RFM_Score'] >= 6:
-        return 'Steady Movers'
-    elif row['RFM_Score'] >= 4:
-        return 'Potential Stars'
-    elif row['RFM_Score'] >= 2:
-        return 'Low Performers'
+
+def store_performance(fact_sales, sales_states):
+    """
+    Calculate total sales and order lines per store.
+
+    Parameters:
+    fact_sales (pd.DataFrame): The sales facts with 'Total Revenue' (None in streaming
+        and incremental mode).
+    sales_states (dict): Streamed or refreshed states per key (None otherwise).
+
+    Returns:
+    pd.DataFrame: 'StoreKey', 'Total Sales' and 'Total Orders', best store first.
+    """
+    with stage('store_performance', rows_in=fact_sales) as current:
+        if sales_states is not None:
+            performance = store_performance_from_state(sales_states['StoreKey'])
+        else:
+            performance = fact_sales.groupby('StoreKey').agg({
+                'Total Revenue': 'sum',
+                'Order Number': 'count'
+            }).rename(columns={
+                'Total Revenue': 'Total Sales',
+                'Order Number': 'Total Orders'
+            }).reset_index().sort_values(by='Total Sales', ascending=False)
+        current.output(performance)
+    return performance
+
+
+def uses_sales_states(config):
+    """Return whether the pipeline works from RFM states instead of the whole fact_sales."""
+    return config['stream_fact_sales'] or config['rfm_state_dir'] is not None
+
+
+def refresh_sales_states(config, product_index):
+    """
+    Fold the new sales into the persisted RFM states (incremental mode).
+
+    fact_sales is read chunk by chunk and only the rows from the earliest stored
+    watermark day on are kept, so the full sales history is never materialized.
+
+    Parameters:
+    config (dict): The pipeline config ('rfm_state_dir' and the fact_sales settings).
+    product_index (DimensionIndex): The product dimension indexed by ProductKey.
+
+    Returns:
+    dict: The refreshed running state per CustomerKey, ProductKey and StoreKey.
+    """
+    with stage('refresh_fact_sales') as current:
+        since = rfm_watermark(config['rfm_state_dir'])
+        load_stats = {}
+        sales_chunks = iter_table('fact_sales',
+                                  os.path.join(config['data_dir'], 'fact_sales.csv'),
+                                  encoding=config['encoding'],
+                                  chunksize=config['fact_sales_chunksize'],
+                                  usecols=config['fact_sales_columns'], stats=load_stats,
+                                  track_memory=profiling_enabled(),
+                                  where=None if since is None
+                                  else lambda chunk: chunk['Order Date'] >= since)
+        sales_states, new_rows = refresh_rfm_states(config['rfm_state_dir'], sales_chunks,
+                                                    product_index)
+        print(format_load_stats(load_stats))
+        print(f"RFM states refreshed with {new_rows['CustomerKey']:,} new sales rows.")
+        current.output(new_rows['CustomerKey'])
+    return sales_states
+
+
+def export_extract(stage_name, frame, config, name):
+    """Write one Power BI extract to the output directory in the configured format."""
+    with stage(f'export_{stage_name}', rows_in=frame):
+        stats = export_table(frame, export_path(config['output_dir'], name,
+                                                config['export_format']),
+                             fmt=config['export_format'], max_workers=config['export_workers'],
+                             date_format=config['export_date_format'])
+    print(format_export_stats(stats))
+    return stats
+
+
+def resolve_config(config=None):
+    """
+    Merge a config with DEFAULT_CONFIG and fill in the derived paths.
+
+    Parameters:
+    config (dict): Settings overriding DEFAULT_CONFIG.
+
+    Returns:
+    dict: The complete config.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    config['output_dir'] = config['output_dir'] or config['data_dir']
+    config['plot_dir'] = config['plot_dir'] or os.path.join(config['output_dir'], 'plots')
+    config['rate_index_cache'] = config['rate_index_cache'] or os.path.join(
+        config['data_dir'], '.parquet_cache', 'exchange_rate_index.npz')
+    return config
+
+
+def run_pipeline(config=None):
+    """
+    Run the whole preprocessing: load, customer and product RFM segmentation, store
+    performance, and the Power BI extracts dim_customer, product_rfm_analysis and
+    dim_stores (written in config['export_format']).
+
+    Parameters:
+    config (dict): Settings overriding DEFAULT_CONFIG.
+
+    Returns:
+    dict: The result frames by name (dim_customer, dim_product, dim_stores, the
+        summaries, ...).
+    """
+    config = resolve_config(config)
+    os.makedirs(config['output_dir'], exist_ok=True)
+    streaming = config['stream_fact_sales']
+    from_states = uses_sales_states(config)
+    reset_profile()
+
+    star_schema = load_tables(config)
+    dim_customer = star_schema.dim_customers
+    dim_product = star_schema.dim_products
+    dim_stores = star_schema.dim_stores
+    fact_sales = star_schema.fact_sales
+    # 'Unit Price USD' and 'Unit Cost USD' arrive as '$1,234.56 ' strings; the loader parses
+    # them to float with money.parse_money (the "money" columns in retailer_io.TABLE_SPECS)
+
+    # Index the product dimension once by ProductKey; fact rows are enriched by gathering
+    # product columns at the looked-up positions instead of merging
+    product_index = DimensionIndex(dim_product, 'ProductKey')
+
+    # In out-of-core mode the sales are aggregated chunk by chunk right away; only the
+    # running states per CustomerKey, ProductKey and StoreKey are kept in memory
+    sales_states = None
+    if streaming:
+        with stage('stream_fact_sales') as current:
+            sales_chunks = iter_table('fact_sales',
+                                      os.path.join(config['data_dir'], 'fact_sales.csv'),
+                                      encoding=config['encoding'],
+                                      chunksize=config['fact_sales_chunksize'],
+                                      usecols=config['fact_sales_columns'])
+            sales_states = stream_rfm(sales_chunks, product_index)
+            current.output(sales_states['CustomerKey']['Frequency'].sum())
+    elif from_states:
+        # Incremental mode: only the sales not folded into the stored states are read
+        sales_states = refresh_sales_states(config, product_index)
+
+    # Understanding customer demographics
+    customer_country, customer_gender = customer_demographics(dim_customer, config)
+
+    # Handling missing values in field 'State Code'
+    missing_state_code = fill_state_codes(dim_customer)
+
+    if not from_states:
+        convert_sales_dates(fact_sales)
+
+    # Customer RFM Segmentation
+    # Recency = days since the last order, Frequency = order lines, Monetary = quantity
+    if from_states:
+        snapshot = sales_states['CustomerKey']['last_order'].max() + pd.Timedelta(days=1)
     else:
-        return 'Underdogs'
-
-dim_product['Product_Segment'] = dim_product.apply(rfm_product_segment, axis=1)
-
-# Display the product RFM DataFrame with segments
-dim_product.head()
-
-# Plotting Product RFM Segments
-plt.figure(figsize=(12, 6))
-sns.countplot(data=dim_product, x='Product_Segment', palette='viridis',
-            hue='Product_Segment', legend=False)
-plt.title('Product Segments based on RFM Analysis')
-plt.xlabel('Product Segment')
-plt.ylabel('Number of Products')
-plt.xticks(rotation=45)
-plt.show()
-
-# Product RFM Analysis Summary
-product_rfm_summary = dim_product.groupby('Product_Segment').agg({
-    'ProductKey': 'count',
-    'Recency': 'mean',
-    'Frequency': 'mean',
-    'Monetary': 'mean'
-}).rename(columns={'ProductKey': 'Total Products'}).reset_index().sort_values(by='Total Products', ascending=False)
-
-product_rfm_summary
-
-# Save the product RFM analysis to a CSV file
-dim_product.to_csv('/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/product_rfm_analysis.csv', 
-                   index=False)
-
-# Store Performance Analysis
-# Calculate total sales and average order value (AOV) for each store
-store_performance = fact_sales.groupby('StoreKey').agg({
-    'Total Revenue': 'sum',
-    'Order Number': 'count'
-}).rename(columns={
-    'Total Revenue': 'Total Sales',
-    'Order Number': 'Total Orders'
-}).reset_index().sort_values(by='Total Sales', ascending=False)
-
-# Display the store performance DataFrame
-store_performance
-
-# store_performance[store_performance['StoreKey']== 7]
-
-# Merge with store dimension to get store details
-dim_stores = dim_stores.merge(store_performance[['StoreKey', 'Total Sales', 'Total Orders']], 
-                                            on='StoreKey', how='left')
-dim_stores.head()
-# Calculate Average Order Value (AOV)
-dim_stores['AOV'] = dim_stores['Total Sales'] / dim_stores['Total Orders']
-
-dim_stores.dropna(subset=['Total Sales', 'Total Orders', 'AOV'], inplace=True)
-
-# Plotting Store Performance
-plt.figure(figsize=(12, 6))
-sns.barplot(x='Total Sales', y='StoreKey', data=store_performance,
-            palette='viridis', hue='StoreKey', legend=False)
-plt.title('Store Performance: Total Sales by Store')
-plt.xlabel('Total Sales')
-plt.ylabel('Store Key')
-plt.xticks(rotation=45)
-plt.show()
-
-# Store Performance Summary
-store_performance_summary = dim_stores[['StoreKey', 'Total Sales', 'State',
-                                        'Total Orders', 'AOV']].sort_values(
-                                            by='Total Sales', ascending=False)
-                                        
-store_performance_summary
-
-# Save the dim_stores DataFrame to a CSV file
-dim_stores.to_csv('/Users/HP/Documents/Data_Analytics/CodeBasics/Projects_Portfolio/Global+Electronics+Retailer/Data/dim_stores.csv',
-                   index=False)
\ No newline at end of file
+        snapshot = rfm_snapshot(fact_sales)
+    customer_rfm = rfm_by_key('customer_rfm', 'CustomerKey', 'Quantity', fact_sales,
+                              sales_states, snapshot)
+    dim_customer = segment_customers(dim_customer, customer_rfm)
+    plot_bars(config, 'customer_segments', dim_customer, 'Customer_Category', None,
+              'Customer Segments based on RFM Analysis', 'Customer Segment',
+              'Number of Customers', count=True)
+    export_extract('dim_customer', dim_customer, config, 'dim_customer')
+    customer_summary = rfm_summary(dim_customer, 'Customer_Category', 'CustomerKey',
+                                   'Total Customers')
+
+    # RFM analysis for products
+    revenue_by_currency = None
+    if not from_states:
+        fact_sales, revenue_by_currency = add_product_revenue(
+            fact_sales, product_index, star_schema.dim_exchange_rates, config)
+    rfm_product = rfm_by_key('product_rfm', 'ProductKey', 'Total Revenue', fact_sales,
+                             sales_states, snapshot)
+    dim_product = segment_products(dim_product, rfm_product)
+    plot_bars(config, 'product_segments', dim_product, 'Product_Segment', None,
+              'Product Segments based on RFM Analysis', 'Product Segment',
+              'Number of Products', count=True)
+    product_summary = rfm_summary(dim_product, 'Product_Segment', 'ProductKey',
+                                  'Total Products').sort_values(by='Total Products',
+                                                                ascending=False)
+    export_extract('product_rfm', dim_product, config, 'product_rfm_analysis')
+
+    # Store Performance Analysis
+    # Calculate total sales and average order value (AOV) for each store
+    performance = store_performance(fact_sales, sales_states)
+    # Merge with store dimension to get store details
+    dim_stores = DimensionIndex(performance, 'StoreKey').enrich(
+        dim_stores, ['Total Sales', 'Total Orders'])
+    # Calculate Average Order Value (AOV)
+    dim_stores['AOV'] = dim_stores['Total Sales'] / dim_stores['Total Orders']
+    dim_stores.dropna(subset=['Total Sales', 'Total Orders', 'AOV'], inplace=True)
+    plot_bars(config, 'store_performance', performance, 'Total Sales', 'StoreKey',
+              'Store Performance: Total Sales by Store', 'Total Sales', 'Store Key')
+    store_summary = dim_stores[['StoreKey', 'Total Sales', 'State',
+                                'Total Orders', 'AOV']].sort_values(by='Total Sales',
+                                                                    ascending=False)
+    export_extract('dim_stores', dim_stores, config, 'dim_stores')
+
+    # Per-stage timings (only when RETAILER_PROFILE is set)
+    report_profile()
+    return {
+        'dim_customer': dim_customer,
+        'dim_product': dim_product,
+        'dim_stores': dim_stores,
+        'customer_country': customer_country,
+        'customer_gender': customer_gender,
+        'missing_state_code': missing_state_code,
+        'rfm_summary': customer_summary,
+        'revenue_by_currency': revenue_by_currency,
+        'product_rfm_summary': product_summary,
+        'store_performance': performance,
+        'store_performance_summary': store_summary,
+    }
+
+
+def main(argv=None):
+    """
+    Command line entry point; see --help.
+
+    Parameters:
+    argv (list): Command line arguments. Default is sys.argv[1:].
+
+    Returns:
+    dict: The result frames of run_pipeline.
+    """
+    parser = argparse.ArgumentParser(
+        description='Preprocess the Global Electronics Retailer data for Power BI.')
+    parser.add_argument('--data-dir', default=DEFAULT_CONFIG['data_dir'],
+                        help='directory holding the star-schema CSV extracts')
+    parser.add_argument('--output-dir', help='directory for the Power BI extracts '
+                                             '(default: the data directory)')
+    parser.add_argument('--export-format', choices=['csv', 'csv.gz', 'parquet'],
+                        default=DEFAULT_CONFIG['export_format'],
+                        help='file format of the Power BI extracts')
+    parser.add_argument('--plots', choices=['show', 'files', 'none'],
+                        default=DEFAULT_CONFIG['plots'],
+                        help="show plots, save them as PNG files, or skip them ('none')")
+    parser.add_argument('--headless', action='store_true', help="same as --plots none")
+    parser.add_argument('--plot-dir', help='directory for --plots files '
+                                           '(default: <output dir>/plots)')
+    parser.add_argument('--stream', action='store_true', default=STREAM_FACT_SALES,
+                        help='aggregate fact_sales chunk by chunk (out-of-core)')
+    parser.add_argument('--rfm-state-dir', default=RFM_STATE_DIR,
+                        help='refresh RFM incrementally from the state in this directory')
+    parser.add_argument('--reporting-currency', default=REPORTING_CURRENCY)
+    parser.add_argument('--no-cache', action='store_true',
+                        help='parse the CSVs without the Parquet cache')
+    args = parser.parse_args(argv)
+    return run_pipeline({
+        'data_dir': args.data_dir,
+        'output_dir': args.output_dir,
+        'export_format': args.export_format,
+        'plots': 'none' if args.headless else args.plots,
+        'plot_dir': args.plot_dir,
+        'stream_fact_sales': args.stream,
+        'rfm_state_dir': args.rfm_state_dir,
+        'reporting_currency': args.reporting_currency,
+        'use_cache': not args.no_cache,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+# File: goodreads_lexicon.py
+
+# Vectorized VADER scoring for the Goodreads Book Reviews project.
+# polarity_scores() tokenizes one review at a time and walks its words in Python.
+# LexiconScorer scores a whole batch of reviews at once instead:
+# - every review is split once and all tokens are factorized together; each distinct
+#   token is cleaned (VADER's leading/trailing punctuation rule) and mapped to a
+#   vocabulary index, which is kept between batches
+# - per-word lexicon valences and heuristic flags (booster, negation, ALL CAPS, 'least',
+#   'never', 'but', ...) are precomputed once per vocabulary entry, and the rules of
+#   sentiment_valence() are applied to whole token arrays, using the words 1-3
+#   positions back as shifted arrays
+# - special-case idioms ('the bomb', 'cut the mustard', ...) are matched as word
+#   index sequences, and compound scores are summed per review with np.bincount
+# The rules are those of nltk's SentimentIntensityAnalyzer, including its quirks
+# (a repeated word takes the valence of its first occurrence), so the scores are
+# the same as VADER's; parity_report() checks this on a sample of reviews.
+
+# Import necessary libraries
+import time
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from goodreads_sentiment import _get_analyzer, score_batch, sentiment_labels
+
+
+# Reviews tokenized and scored together
+LEXICON_BATCH_SIZE = 20_000
+
+# Word flags precomputed per vocabulary entry
+_FLAGS = ['booster', 'negated', 'upper', 'least', 'at_very', 'never', 'so_this',
+          'kind', 'of', 'but', 'idiom']
+
+
+class LexiconScorer:
+    """
+    Batch VADER compound scorer over a growing vocabulary index.
+
+    Parameters:
+    analyzer (SentimentIntensityAnalyzer): The analyzer whose lexicon and constants
+        are used. Default is the process's shared analyzer.
+    """
+
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer or _get_analyzer()
+        self.constants = self.analyzer.constants
+        self.lexicon = self.analyzer.lexicon
+        # Words of the idioms and multi-word boosters, which need the exact check
+        self._idiom_words = {word for phrase in list(self.constants.SPECIAL_CASE_IDIOMS)
+                             + list(self.constants.BOOSTER_DICT) if ' ' in phrase
+                             for word in phrase.split()}
+        # Raw token -> word index, and the cleaned words with their properties
+        self._tokens = {}
+        self._index = {}
+        self._words = []
+        self._rows = []
+        self._arrays = None
+
+    def _clean(self, token):
+        """VADER's token cleaning: strip one punctuation mark before or after a word."""
+        strip = self.constants.REGEX_REMOVE_PUNCTUATION
+        for punctuation in self.constants.PUNC_LIST:
+            if token.endswith(punctuation):
+                word = token[:-len(punctuation)]
+                if len(word) > 1 and not strip.search(word):
+                    return word
+        for punctuation in self.constants.PUNC_LIST:
+            if token.startswith(punctuation):
+                word = token[len(punctuation):]
+                if len(word) > 1 and not strip.search(word):
+                    return word
+        return token
+
+    def _word_row(self, word):
+        lower = word.lower()
+        constants = self.constants
+        return (self.lexicon.get(lower, np.nan), constants.BOOSTER_DICT.get(lower, 0.0),
+                lower in constants.BOOSTER_DICT,
+                lower in constants.NEGATE or "n't" in lower, word.isupper(),
+                lower == 'least', lower in ('at', 'very'), word == 'never',
+                word in ('so', 'this'), lower == 'kind', lower == 'of', lower == 'but',
+                word in self._idiom_words)
+
+    def _word_ids(self, tokens):
+        """Map distinct raw tokens to word indexes (-1 for dropped single characters)."""
+        ids = np.empty(len(tokens), dtype=np.int64)
+        for position, token in enumerate(tokens):
+            word_id = self._tokens.get(token)
+            if word_id is None:
+                if len(token) <= 1:
+                    word_id = -1
+                else:
+                    word = self._clean(token)
+                    word_id = self._index.get(word)
+                    if word_id is None:
+                        word_id = self._index[word] = len(self._words)
+                        self._words.append(word)
+                        self._rows.append(self._word_row(word))
+                        self._arrays = None
+                self._tokens[token] = word_id
+            ids[position] = word_id
+        return ids
+
+    def _word_arrays(self):
+        """Property arrays by word index, with a last all-false row for 'no word'."""
+        if self._arrays is None:
+            rows = self._rows + [(np.nan, 0.0) + (False,) * len(_FLAGS)]
+            columns = list(zip(*rows))
+            arrays = {'valence': np.array(columns[0], dtype='float64'),
+                      'scalar': np.array(columns[1], dtype='float64')}
+            for name, column in zip(_FLAGS, columns[2:]):
+                arrays[name] = np.array(column, dtype=bool)
+            arrays['in_lexicon'] = ~np.isnan(arrays['valence'])
+            self._arrays = arrays
+        return self._arrays
+
+    def _phrases(self, phrases, length):
+        """Word indexes of the phrases of the given length whose words are all known."""
+        found = []
+        for phrase, value in phrases.items():
+            ids = [self._index.get(word) for word in phrase.split(' ')]
+            if len(ids) == length and None not in ids:
+                found.append((ids, value))
+        return found
+
+    def _idioms(self, valence, window):
+        """
+        _idioms_check on arrays: window holds the word indexes 3 before to 2 after
+        each scored word ('no word' beyond the review).
+        """
+        idioms = self.constants.SPECIAL_CASE_IDIOMS
+        pairs, triples = self._phrases(idioms, 2), self._phrases(idioms, 3)
+
+        def match(phrases, offsets):
+            value = np.full(len(valence), np.nan)
+            for ids, phrase_value in phrases:
+                hit = np.logical_and.reduce([window[offset + 3] == word_id
+                                             for offset, word_id in zip(offsets, ids)])
+                value[hit & np.isnan(value)] = phrase_value
+            return value
+
+        # The first matching sequence before (or ending at) the word sets the valence
+        sequences = [(pairs, (-1, 0)), (triples, (-2, -1, 0)), (pairs, (-2, -1)),
+                     (triples, (-3, -2, -1)), (pairs, (-3, -2))]
+        value = np.full(len(valence), np.nan)
+        for phrases, offsets in sequences:
+            value = np.where(np.isnan(value), match(phrases, offsets), value)
+        # then sequences starting at the word override it
+        for phrases, offsets in ((pairs, (0, 1)), (triples, (0, 1, 2))):
+            following = match(phrases, offsets)
+            value = np.where(np.isnan(following), value, following)
+        valence = np.where(np.isnan(value), valence, value)
+
+        # Booster bi-grams such as 'kind of' or 'sort of' dampen the valence
+        bigrams = self._phrases(self.constants.BOOSTER_DICT, 2)
+        dampened = ~np.isnan(match(bigrams, (-3, -2))) | ~np.isnan(match(bigrams, (-2, -1)))
+        return np.where(dampened, valence + self.constants.B_DECR, valence)
+
+    def _batch(self, texts):
+        constants = self.constants
+        # pd.factorize compares object strings only up to a NUL character; a NUL scores
+        # like any other non-word character, so it is swapped for \x01 before splitting
+        split = [text.replace('\x00', '\x01').split() for text in texts]
+        counts = np.fromiter(map(len, split), dtype=np.int64, count=len(split))
+        codes, uniques = pd.factorize(np.array(list(chain.from_iterable(split)), dtype=object))
+        word = self._word_ids(uniques)[codes]
+        doc = np.repeat(np.arange(len(texts)), counts)
+        kept = word >= 0
+        word, doc = word[kept], doc[kept]
+        w = self._word_arrays()
+        none = len(w['valence']) - 1
+
+        lengths = np.bincount(doc, minlength=len(texts))
+        starts = np.cumsum(lengths) - lengths
+        pos = np.arange(len(word)) - starts[doc]
+
+        # Some, but not all, words in ALL CAPS
+        upper_count = np.bincount(doc, weights=w['upper'][word], minlength=len(texts))
+        cap_diff = (upper_count > 0) & (upper_count < lengths)
+
+        # Only lexicon words that are not boosters get a sentiment; the rules below
+        # work on those rows, looking up their neighbours in the full token array
+        rows = np.flatnonzero(w['in_lexicon'][word] & ~w['booster'][word])
+        row_doc, row_pos, row_word = doc[rows], pos[rows], word[rows]
+
+        def near(offset):
+            """Word `offset` positions away in the same review ('no word' if none)."""
+            inside = (row_pos + offset >= 0) & (row_pos + offset < lengths[row_doc])
+            return np.where(inside, word[np.where(inside, rows + offset, 0)], none)
+
+        window = [near(offset) for offset in (-3, -2, -1)] + [row_word, near(1), near(2)]
+        previous = window[2::-1]
+        scored = ~(w['kind'][row_word] & w['of'][window[4]])
+        cap_diff = cap_diff[row_doc]
+
+        valence = w['valence'][row_word]
+        caps = np.where(valence > 0, constants.C_INCR, -constants.C_INCR)
+        valence = np.where(w['upper'][row_word] & cap_diff, valence + caps, valence)
+
+        for start_i, before in enumerate(previous):
+            applies = (row_pos > start_i) & ~w['in_lexicon'][before]
+            # Booster or dampener before the word (scalar_inc_dec)
+            scalar = np.where(valence < 0, -w['scalar'][before], w['scalar'][before])
+            caps = np.where(valence > 0, constants.C_INCR, -constants.C_INCR)
+            scalar = np.where(w['booster'][before] & w['upper'][before] & cap_diff,
+                              scalar + caps, scalar)
+            scalar = scalar * (1.0, 0.95, 0.9)[start_i]
+            valence = np.where(applies, valence + scalar, valence)
+
+            # Negations (_never_check)
+            negation = np.where(w['negated'][before], constants.N_SCALAR, 1.0)
+            if start_i == 1:
+                negation = np.where(w['never'][previous[1]] & w['so_this'][previous[0]], 1.5,
+                                    negation)
+            elif start_i == 2:
+                negation = np.where((w['never'][previous[2]] & w['so_this'][previous[1]])
+                                    | w['so_this'][previous[0]], 1.25, negation)
+            valence = np.where(applies, valence * negation, valence)
+
+            if start_i == 2:
+                idiom = applies & np.logical_or.reduce([w['idiom'][ids] for ids in window])
+                if idiom.any():
+                    valence[idiom] = self._idioms(valence[idiom],
+                                                  [ids[idiom] for ids in window])
+
+        # 'least' before the word (_least_check)
+        least = w['least'][previous[0]] & ~w['in_lexicon'][previous[0]]
+        least &= (row_pos == 1) | ((row_pos > 1) & ~w['at_very'][previous[1]])
+        valence = np.where(least, valence * constants.N_SCALAR, valence)
+        sentiment = np.where(scored, valence, 0.0)
+
+        # A repeated word takes the sentiment of its first occurrence in the review
+        occurrence, _ = pd.factorize(row_doc * (none + 1) + row_word)
+        seen = np.maximum.accumulate(occurrence)
+        first = np.flatnonzero(occurrence > np.concatenate([[-1], seen[:-1]]))
+        sentiment = sentiment[first[occurrence]]
+
+        # Words before the first 'but' count half, words after it one and a half (_but_check)
+        but_pos = np.full(len(texts), -1)
+        buts = np.flatnonzero(w['but'][word])
+        but_docs, first_but = np.unique(doc[buts], return_index=True)
+        but_pos[but_docs] = pos[buts[first_but]]
+        bi = but_pos[row_doc]
+        sentiment = np.where(bi < 0, sentiment,
+                             np.where(row_pos < bi, sentiment * 0.5,
+                                      np.where(row_pos > bi, sentiment * 1.5, sentiment)))
+
+        # Punctuation emphasis and normalization (score_valence); the words without a
+        # sentiment add 0 to the sum and are left out
+        total = np.bincount(row_doc, weights=sentiment, minlength=len(texts))
+        exclamations = np.minimum([text.count('!') for text in texts], 4) * 0.292
+        questions = np.array([text.count('?') for text in texts])
+        questions = np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0))
+        emphasis = exclamations + questions
+        total = np.where(total > 0, total + emphasis, np.where(total < 0, total - emphasis, total))
+        compound = np.where(lengths > 0, total / np.sqrt(total * total + 15), 0.0)
+        return [round(score, 4) for score in compound.tolist()]
+
+    def scores(self, texts, batch_size=LEXICON_BATCH_SIZE):
+        """
+        Compute VADER compound scores for many reviews.
+
+        Parameters:
+        texts (pd.Series or list): Review texts; non-strings are converted with str().
+        batch_size (int): Reviews tokenized and scored together.
+
+        Returns:
+        np.ndarray: float64 compound scores in the order of texts.
+        """
+        texts = [str(text) for text in texts]
+        scores = []
+        for start in range(0, len(texts), batch_size):
+            scores.extend(self._batch(texts[start:start + batch_size]))
+        return np.asarray(scores, dtype='float64')
+
+
+# Scorer of the current process, created lazily
+_scorer = None
+
+
+def lexicon_scores(texts, batch_size=LEXICON_BATCH_SIZE):
+    """
+    Compute VADER compound scores with the shared LexiconScorer.
+
+    Parameters:
+    texts (pd.Series or list): Review texts.
+    batch_size (int): Reviews tokenized and scored together.
+
+    Returns:
+    np.ndarray: float64 compound scores in the order of texts.
+    """
+    global _scorer
+    if _scorer is None:
+        _scorer = LexiconScorer()
+    return _scorer.scores(texts, batch_size=batch_size)
+
+
+def parity_report(texts, batch_size=LEXICON_BATCH_SIZE):
+    """
+    Score texts with VADER and with the lexicon scorer, and compare the results.
+
+    Parameters:
+    texts (pd.Series or list): Review texts.
+    batch_size (int): Reviews tokenized and scored together by the lexicon scorer.
+
+    Returns:
+    dict: 'rows', 'category_agreement' (share of equal sentiment categories),
+        'score_agreement' (share of equal compound scores), 'max_abs_diff',
+        'vader_s' and 'lexicon_s' (seconds), 'vader_rows_per_sec',
+        'lexicon_rows_per_sec' and 'speedup'.
+    """
+    texts = list(texts)
+    start = time.perf_counter()
+    expected = np.asarray(score_batch(texts), dtype='float64')
+    vader_s = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = lexicon_scores(texts, batch_size=batch_size)
+    lexicon_s = time.perf_counter() - start
+    rows = len(texts)
+    return {
+        'rows': rows,
+        'category_agreement': float(np.mean(sentiment_labels(actual)
+                                            == sentiment_labels(expected))) if rows else 1.0,
+        'score_agreement': float(np.mean(actual == expected)) if rows else 1.0,
+        'max_abs_diff': float(np.abs(actual - expected).max()) if rows else 0.0,
+        'vader_s': vader_s,
+        'lexicon_s': lexicon_s,
+        'vader_rows_per_sec': rows / vader_s if vader_s else None,
+        'lexicon_rows_per_sec': rows / lexicon_s if lexicon_s else None,
+        'speedup': vader_s / lexicon_s if lexicon_s else None,
+    }
@@ -0,0 +1,172 @@
+# File: goodreads_reviews.py
+
+# Streaming clean/score/export pipeline for the Goodreads reviews dump.
+# The notebook reads the whole goodreads_reviews.csv and keeps several copies of
+# the review text while cleaning and scoring it. Here the file is read in chunks
+# with explicit dtypes and every chunk flows through a chain of generators
+# (read -> project columns -> drop empty reviews -> score -> label -> append to the
+# output file), so memory stays bounded by the chunk size and output is written
+# while the input is still being read.
+
+# Import necessary libraries
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from goodreads_sentiment import SentimentCache, score_reviews, sentiment_labels
+
+
+# Columns kept from the reviews dump (reviews_clean in the notebook)
+REVIEW_COLUMNS = ['review_id', 'work_id', 'started_at', 'read_at', 'review_text', 'rating']
+
+# Explicit dtypes: 'started_at' holds mixed values that make read_csv guess per chunk
+# (the DtypeWarning on column 3)
+REVIEW_DTYPES = {
+    'review_id': str,
+    'work_id': 'Int64',
+    'started_at': str,
+    'read_at': str,
+    'review_text': str,
+    'rating': 'float64',
+}
+
+
+def read_reviews(file_path, chunksize=100_000, columns=REVIEW_COLUMNS):
+    """
+    Read the reviews dump in chunks, keeping only the given columns.
+
+    Parameters:
+    file_path (str): Path to goodreads_reviews.csv.
+    chunksize (int): Rows per chunk.
+    columns (list): Columns to keep, in output order.
+
+    Yields:
+    pd.DataFrame: One chunk of reviews.
+    """
+    dtypes = {column: REVIEW_DTYPES[column] for column in columns if column in REVIEW_DTYPES}
+    # The reader is closed even when the consumer stops early or raises
+    with pd.read_csv(file_path, usecols=columns, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk[columns]
+
+
+def drop_empty_reviews(chunks, text_column='review_text'):
+    """
+    Drop reviews without text from each chunk.
+
+    Parameters:
+    chunks (iterable): Review chunks.
+    text_column (str): The review text column.
+
+    Yields:
+    pd.DataFrame: The chunk without empty reviews.
+    """
+    for chunk in chunks:
+        yield chunk[chunk[text_column].notna()]
+
+
+def score_chunks(chunks, cache=None, text_column='review_text', **kwargs):
+    """
+    Add 'sentiment_score' and 'sentiment_category' to each chunk.
+
+    Parameters:
+    chunks (iterable): Review chunks.
+    cache (SentimentCache): Optional score cache consulted before scoring.
+    text_column (str): The review text column.
+    **kwargs: Passed to score_reviews (workers, batch_size, progress, executor, ...).
+
+    Yields:
+    pd.DataFrame: The scored chunk.
+    """
+    for chunk in chunks:
+        if cache is not None:
+            scores = cache.scores(chunk[text_column], **kwargs)
+        else:
+            scores = score_reviews(chunk[text_column], **kwargs)
+        yield chunk.assign(sentiment_score=scores, sentiment_category=sentiment_labels(scores))
+
+
+def write_csv(chunks, output_path):
+    """
+    Append chunks to a CSV file as they arrive; the file is replaced atomically
+    once the last chunk has been written.
+
+    Parameters:
+    chunks (iterable): DataFrame chunks with the same columns.
+    output_path (str): The destination CSV file.
+
+    Returns:
+    int: The number of rows written.
+    """
+    tmp_path = f"{output_path}.tmp"
+    rows = 0
+    try:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as handle:
+            for chunk in chunks:
+                chunk.to_csv(handle, header=rows == 0, index=False)
+                rows += len(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_path)
+    return rows
+
+
+def _counted(chunks, stats, key):
+    for chunk in chunks:
+        stats[key] += len(chunk)
+        yield chunk
+
+
+def run_reviews_pipeline(file_path, output_path, chunksize=100_000, cache_path=None,
+                         progress=True, **kwargs):
+    """
+    Clean, score and export the reviews dump in bounded memory.
+
+    Parameters:
+    file_path (str): Path to goodreads_reviews.csv.
+    output_path (str): Path of the cleaned, scored CSV (reviews_clean.csv).
+    chunksize (int): Rows read per chunk.
+    cache_path (str): Optional sentiment cache file (see SentimentCache).
+    progress (bool): Print a line per chunk with rows and throughput.
+    **kwargs: Passed to score_reviews (workers, batch_size, ...). With more than one
+        worker a single process pool is started here and shared by all chunks.
+
+    Returns:
+    dict: 'rows_in', 'rows_out', 'seconds', 'rows_per_sec' and, with a cache,
+        its hit/miss statistics under 'cache'.
+    """
+    stats = {'rows_in': 0, 'rows_out': 0}
+    cache = SentimentCache(cache_path) if cache_path else None
+    start = time.perf_counter()
+
+    def report(chunks):
+        for chunk in chunks:
+            if progress:
+                elapsed = time.perf_counter() - start
+                print(f"Read {stats['rows_in']:,} reviews, wrote {stats['rows_out']:,} "
+                      f"({stats['rows_in'] / elapsed:,.0f} rows/sec)")
+            yield chunk
+
+    chunks = _counted(read_reviews(file_path, chunksize), stats, 'rows_in')
+    chunks = drop_empty_reviews(chunks)
+    workers = kwargs.pop('workers', None) or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    chunks = score_chunks(chunks, cache, progress=False, workers=workers,
+                          executor=executor, **kwargs)
+    chunks = report(_counted(chunks, stats, 'rows_out'))
+    try:
+        write_csv(chunks, output_path)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.save()
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_sec'] = stats['rows_in'] / stats['seconds'] if stats['seconds'] else 0.0
+    if cache is not None:
+        stats['cache'] = dict(cache.stats, cached=len(cache.keys))
+    return stats
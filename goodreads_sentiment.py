@@ -0,0 +1,293 @@
+# File: goodreads_sentiment.py
+
+# Sentiment scoring for the Goodreads Book Reviews project.
+# Reviews are scored with NLTK's VADER compound score, exactly as the notebook's
+# get_sentiment_score() does, but in batches spread over a pool of worker
+# processes, each holding its own SentimentIntensityAnalyzer.
+# Scores can be kept in a content-addressed cache (review text hash -> score,
+# tied to the analyzer version), so a refresh only scores new or edited reviews.
+
+# Import necessary libraries
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Compound score cut-offs for the sentiment categories
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Analyzer of the current process, created lazily (one per worker process)
+_analyzer = None
+
+
+def _get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def score_batch(texts):
+    """
+    Score a batch of texts with VADER in the current process.
+
+    Parameters:
+    texts (list): Review texts; non-strings are converted with str().
+
+    Returns:
+    list: The compound score of each text.
+    """
+    analyzer = _get_analyzer()
+    return [analyzer.polarity_scores(str(text))['compound'] for text in texts]
+
+
+def _report(done, total, start):
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    remaining = (total - done) / rate if rate > 0 else float('nan')
+    print(f"Scored {done:,}/{total:,} reviews ({rate:,.0f} reviews/sec, "
+          f"{elapsed:.0f}s elapsed, ~{remaining:.0f}s left)")
+
+
+def score_reviews(texts, workers=None, batch_size=5000, progress=True, report_every=10.0,
+                  executor=None):
+    """
+    Compute VADER compound scores for many reviews on a process pool.
+
+    Parameters:
+    texts (pd.Series or list): Review texts.
+    workers (int): Number of worker processes. Default is os.cpu_count();
+        1 scores in the current process.
+    batch_size (int): Reviews per batch sent to a worker.
+    progress (bool): Print progress and throughput while scoring.
+    report_every (float): Minimum seconds between progress lines.
+    executor (ProcessPoolExecutor): Optional pool owned by the caller, reused across
+        calls (e.g. one per pipeline instead of one per chunk); it is not shut down
+        here and workers is ignored.
+
+    Returns:
+    np.ndarray: float64 compound scores in the order of texts.
+    """
+    texts = list(texts)
+    total = len(texts)
+    batches = [texts[i:i + batch_size] for i in range(0, total, batch_size)]
+    workers = workers or os.cpu_count() or 1
+
+    scores = []
+    start = last_report = time.perf_counter()
+    owned = None
+    if executor is not None:
+        results = executor.map(score_batch, batches)
+    elif workers == 1 or len(batches) <= 1:
+        results = map(score_batch, batches)
+    else:
+        owned = ProcessPoolExecutor(max_workers=workers)
+        results = owned.map(score_batch, batches)
+    try:
+        for batch_scores in results:
+            scores.extend(batch_scores)
+            now = time.perf_counter()
+            if progress and now - last_report >= report_every:
+                _report(len(scores), total, start)
+                last_report = now
+    finally:
+        if owned is not None:
+            owned.shutdown(cancel_futures=True)
+    if progress:
+        _report(len(scores), total, start)
+    return np.asarray(scores, dtype='float64')
+
+
+def sentiment_labels(scores):
+    """
+    Map compound scores to 'Positive', 'Negative' or 'Neutral'.
+
+    Parameters:
+    scores (array-like): Compound scores.
+
+    Returns:
+    np.ndarray: The sentiment category of each score.
+    """
+    scores = np.asarray(scores)
+    return np.select([scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+                     ['Positive', 'Negative'], default='Neutral')
+
+
+def add_sentiment(reviews, text_column='review_text', engine='vader', **kwargs):
+    """
+    Return a copy of reviews with 'sentiment_score' and 'sentiment_category' columns.
+
+    Parameters:
+    reviews (pd.DataFrame): Reviews with a text column.
+    text_column (str): The column holding the review text. Default is 'review_text'.
+    engine (str): 'vader' scores each review with the analyzer on a process pool;
+        'lexicon' scores the whole column with goodreads_lexicon (same scores).
+    **kwargs: Passed to score_reviews (workers, batch_size, progress, ...), or to
+        goodreads_lexicon.lexicon_scores (batch_size).
+
+    Returns:
+    pd.DataFrame: The scored reviews.
+    """
+    if engine == 'lexicon':
+        from goodreads_lexicon import lexicon_scores
+        scores = lexicon_scores(reviews[text_column], **kwargs)
+    elif engine == 'vader':
+        scores = score_reviews(reviews[text_column], **kwargs)
+    else:
+        raise ValueError(f"Unknown sentiment engine '{engine}'. Expected 'vader' or 'lexicon'")
+    return reviews.assign(sentiment_score=scores,
+                          sentiment_category=sentiment_labels(scores))
+
+
+def analyzer_version():
+    """
+    Identify the analyzer: a hash of the NLTK version and the VADER lexicon.
+
+    Returns:
+    str: A short hex digest; cached scores from another version are discarded.
+    """
+    import nltk
+    digest = hashlib.sha1(nltk.__version__.encode())
+    digest.update(_get_analyzer().lexicon_file.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def text_keys(texts):
+    """
+    Hash review texts into uint64 cache keys.
+
+    Texts are hashed as str(text), the string VADER scores, so missing values
+    share a key with the text 'nan'.
+
+    Parameters:
+    texts (pd.Series or list): Review texts.
+
+    Returns:
+    np.ndarray: uint64 keys aligned with texts.
+    """
+    texts = pd.Series(texts, dtype='object').astype(str)
+    return pd.util.hash_pandas_object(texts, index=False).to_numpy()
+
+
+def load_sentiment_cache(path, version):
+    """
+    Load a score cache saved by save_sentiment_cache.
+
+    Parameters:
+    path (str): The cache file (.npz).
+    version (str): The current analyzer_version().
+
+    Returns:
+    tuple: (keys, scores) sorted by key; empty if the file is missing or was
+        written by another analyzer version.
+    """
+    if os.path.exists(path):
+        with np.load(path) as saved:
+            if str(saved['version']) == version:
+                return saved['keys'], saved['scores']
+    return np.empty(0, dtype=np.uint64), np.empty(0, dtype='float64')
+
+
+def save_sentiment_cache(path, version, keys, scores):
+    """
+    Save a score cache atomically.
+
+    Parameters:
+    path (str): The cache file (.npz).
+    version (str): The analyzer_version() the scores were computed with.
+    keys (np.ndarray): uint64 text keys, sorted.
+    scores (np.ndarray): The compound score of each key.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, keys=keys, scores=scores, version=np.array(version))
+    os.replace(tmp_path, path)
+
+
+class SentimentCache:
+    """
+    Content-addressed VADER score cache, kept in memory between calls.
+
+    Parameters:
+    path (str): The cache file (.npz), read on creation and written by save().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = analyzer_version()
+        self.keys, self.values = load_sentiment_cache(path, self.version)
+        # Rows found and not found, and distinct texts scored, over all calls
+        self.stats = {'hits': 0, 'misses': 0, 'scored': 0}
+        self._dirty = False
+
+    def scores(self, texts, **kwargs):
+        """
+        Compute compound scores, scoring only texts missing from the cache.
+
+        Parameters:
+        texts (pd.Series or list): Review texts.
+        **kwargs: Passed to score_reviews (workers, batch_size, progress, executor, ...).
+
+        Returns:
+        np.ndarray: float64 compound scores in the order of texts.
+        """
+        texts = pd.Series(texts, dtype='object').reset_index(drop=True)
+        keys = text_keys(texts)
+        if len(self.keys):
+            positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+            hit = self.keys[positions] == keys
+        else:
+            positions, hit = np.zeros(len(keys), dtype=np.int64), np.zeros(len(keys), dtype=bool)
+        scores = np.full(len(keys), np.nan)
+        scores[hit] = self.values[positions[hit]]
+
+        # Score each distinct missing text once
+        new_keys, first, inverse = np.unique(keys[~hit], return_index=True, return_inverse=True)
+        if len(new_keys):
+            missing = np.flatnonzero(~hit)
+            new_scores = score_reviews(texts.iloc[missing[first]], **kwargs)
+            scores[missing] = new_scores[inverse]
+            all_keys = np.concatenate([self.keys, new_keys])
+            order = np.argsort(all_keys, kind='stable')
+            self.keys = all_keys[order]
+            self.values = np.concatenate([self.values, new_scores])[order]
+            self._dirty = True
+
+        self.stats['hits'] += int(hit.sum())
+        self.stats['misses'] += int((~hit).sum())
+        self.stats['scored'] += len(new_keys)
+        return scores
+
+    def save(self):
+        """Write the cache file if new scores were added."""
+        if self._dirty:
+            save_sentiment_cache(self.path, self.version, self.keys, self.values)
+            self._dirty = False
+
+
+def cached_scores(texts, path, stats=None, **kwargs):
+    """
+    Compute VADER compound scores, scoring only texts missing from the cache.
+
+    Parameters:
+    texts (pd.Series or list): Review texts.
+    path (str): The cache file (.npz); created or extended with the new scores.
+    stats (dict): Optional dict filled with 'hits' and 'misses' (rows), 'scored'
+        (distinct texts scored) and 'cached' (entries in the cache).
+    **kwargs: Passed to score_reviews (workers, batch_size, progress, executor, ...).
+
+    Returns:
+    np.ndarray: float64 compound scores in the order of texts.
+    """
+    cache = SentimentCache(path)
+    scores = cache.scores(texts, **kwargs)
+    cache.save()
+    if stats is not None:
+        stats.update(cache.stats, cached=len(cache.keys))
+    return scores
@@ -0,0 +1,80 @@
+# File: money.py
+
+# Fast parsing of formatted money strings such as "$2,796.30 ", "USD 1,234.56"
+# or "(12.50)" into floats. Shared by the retailer loaders and the pandas tutorial.
+# Money columns repeat heavily (one price per product, a few gross values per
+# studio), so each distinct string is cleaned once and the parsed values are
+# scattered back with the factorized codes.
+
+# Import necessary libraries
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# A 3-letter ISO currency code before or after the amount, e.g. "USD 1,234.56"
+_ISO_CODE = r"^\s*[A-Z]{3}\s*|\s*[A-Z]{3}\s*$"
+_ISO_CODE_RE = re.compile(_ISO_CODE)
+
+# Currency symbols, thousands separators and whitespace
+_NOISE = r"[$€£¥,\s]"
+_NOISE_RE = re.compile(_NOISE)
+
+# What must be left once the code and the noise are removed: a plain decimal
+# number, optionally signed or in parentheses. Anything else (stray letters,
+# scientific notation such as "1.5E3", unbalanced parentheses) is rejected as NaN
+# rather than parsed into a different number.
+_AMOUNT = r"[-+]?(?:\d+\.?\d*|\.\d+)|\([-+]?(?:\d+\.?\d*|\.\d+)\)"
+_AMOUNT_RE = re.compile(_AMOUNT)
+
+
+def parse_money_value(text):
+    """
+    Parse a single money string into a float; usable as a read_csv converter.
+
+    Parameters:
+    text (str): The formatted amount, e.g. '$2,796.30 ', 'USD 1,234.56' or '(12.50)'.
+
+    Returns:
+    float: The amount, negative for parenthesized values, NaN if unparseable
+        (including scientific notation and stray letters).
+    """
+    if not isinstance(text, str):
+        return np.nan if text is None else float(text)
+    cleaned = _NOISE_RE.sub("", _ISO_CODE_RE.sub("", text))
+    if not _AMOUNT_RE.fullmatch(cleaned):
+        return np.nan
+    value = float(cleaned.strip("()"))
+    return -value if cleaned.startswith("(") else value
+
+
+def parse_money(values):
+    """
+    Parse a column of money strings into float64.
+
+    Parameters:
+    values (pd.Series or array-like): Formatted amounts; numbers pass through and
+        missing or unparseable entries become NaN.
+
+    Returns:
+    pd.Series: The parsed amounts (keeping the index of a Series input).
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.astype("float64")
+
+    codes, uniques = pd.factorize(series)
+    cleaned = (pd.Series(uniques, dtype="object").astype(str)
+               .str.replace(_ISO_CODE, "", regex=True)
+               .str.replace(_NOISE, "", regex=True))
+    valid = cleaned.str.fullmatch(_AMOUNT).to_numpy(dtype=bool)
+    parsed = pd.to_numeric(cleaned.str.strip("()").where(valid),
+                           errors="coerce").to_numpy(dtype="float64")
+    negative = cleaned.str.startswith("(").to_numpy(dtype=bool)
+    parsed = np.where(negative, -parsed, parsed)
+
+    result = np.full(len(codes), np.nan)
+    found = codes >= 0
+    result[found] = parsed[codes[found]]
+    return pd.Series(result, index=series.index, name=series.name)
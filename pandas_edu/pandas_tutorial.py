@@ -4,6 +4,10 @@
 # Importing the pandas library
 import pandas as pd
 import numpy as np
+import sys
+
+# The shared helpers (money.py, text_index.py, top_k.py, ...) live in the repository root
+sys.path.append("..")
 
 # Import data from a CSV file
 movies = pd.read_csv("movies.csv")
@@ -80,6 +84,14 @@ has_dark_in_title
 # - we can filter the DataFrame by a specific string value in the index using regex and a specific pattern
 has_dark_in_title = movies[movies.index.str.contains(r"dark", case=False, regex=True)]
 has_dark_in_title
+# - every str.contains call rescans all the strings; when the same column is searched
+#   many times, a trigram index (text_index.py in the repository root) is built once
+#   and answers case-insensitive substring and prefix queries with row positions
+from text_index import TrigramIndex
+
+title_index = TrigramIndex(movies.index)
+has_dark_in_title = movies.iloc[title_index.contains("dark")]
+starts_with_the = movies.iloc[title_index.startswith("the ")]
 
 # Grouping data
 # - we can group the data by a specific column and get the aggregate values
@@ -93,6 +105,15 @@ movies.head()
 # Now the change is permanent and further numerical operations can be performed on the data.
 movies["Gross"].mean()
 
+# - on large columns the chained str.replace calls get slow; the shared money parser
+#   (money.py in the repository root) cleans each distinct string only once and also
+#   handles currency codes and trailing spaces such as "$2,796.30 "
+from money import parse_money, parse_money_value
+
+parse_money(pd.read_csv("movies.csv")["Gross"]).head()
+# - it can also be used as a converter so the column is numeric right after loading
+pd.read_csv("movies.csv", index_col="Title", converters={"Gross": parse_money_value}).dtypes
+
 studios = movies.groupby("Studio")
 
 studios["Gross"].count().sort_values(ascending=False)
@@ -165,6 +186,14 @@ nba.var(numeric_only=True, skipna=True)
 nba.sort_values(by = "Name", ascending=False).head()
 # Sorting the DataFrame by multiple columns
 nba.sort_values(by = ["Team", "Name"], ascending=[True, False]).head()
+# Top N values per group: sorting by Team and Salary and keeping the first rows of each
+# team sorts the whole table just to keep a few rows per team
+nba.sort_values(by = ["Team", "Salary"], ascending=[True, False]).groupby("Team").head(2)
+# - top_k_per_group (top_k.py in the repository root) selects them without a full sort;
+#   method="dense" keeps tied salaries together like SQL's DENSE_RANK
+from top_k import top_k_per_group
+
+top_k_per_group(nba, by="Team", column="Salary", k=2, method="dense", rank_column="Rank")
 # Since the DataFrame looks better when sorted by Team and Salary, we can sort it by these two columns and 
 # store it back in the same variable
 nba = nba.sort_values(by = ["Team", "Salary"], ascending=[True, False])
@@ -302,6 +331,13 @@ employees.head()
 # we can do the same for Team column
 employees["Team"] = employees["Team"].astype("category")
 employees.info()  # Check memory usage after optimization
+# - optimize_frame (frame_optimizer.py in the repository root) profiles every column and
+#   applies the lossless conversions automatically, returning a before/after report
+from frame_optimizer import optimize_frame, format_memory_report
+
+optimized, report = optimize_frame(pd.read_csv("employees.csv", parse_dates=["Start Date"]))
+report
+format_memory_report(report)
 
 
 # Extracting a DataFrame rows by one or more conditions
@@ -0,0 +1,179 @@
+# File: quantile_sketch.py
+
+# Mergeable quantile sketch (KLL) for streaming and parallel quantiles.
+# A QuantileSketch keeps a few thousand of the values it has seen, in levels: a
+# value at level h stands for 2**h values. When a level outgrows its capacity it is
+# compacted: every other value of the sorted level moves up one level (with double
+# the weight), starting at a random offset. Sketches fed with different chunks or
+# partitions merge level by level into the sketch of all of them, so quantiles can
+# be estimated without ever holding or sorting the whole population.
+# Each compaction at level h moves the estimated rank of any value by at most 2**h;
+# the sketch adds these up into rank_error, a hard bound on the rank error of its
+# answers. As long as nothing has been compacted (n <= k) the answers are exact.
+
+# Import necessary libraries
+import numpy as np
+
+
+# Default capacity of the top level; the rank error is typically around n / k
+SKETCH_K = 200
+
+# Capacity ratio between a level and the one above it
+_LEVEL_RATIO = 2 / 3
+
+
+def _merge_sorted(left, right):
+    """Merge two sorted arrays (the stable sort is linear on two sorted runs)."""
+    if not len(left):
+        return right
+    if not len(right):
+        return left
+    return np.sort(np.concatenate([left, right]), kind="stable")
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch of a stream of numbers.
+
+    Parameters:
+    k (int): Capacity of the top level. Memory is about 3 * k values and the rank
+        error about n / k.
+    seed (int): Seed of the compaction offsets, for reproducible sketches.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=0):
+        if k < 2:
+            raise ValueError(f"Sketch capacity k must be at least 2, got {k}")
+        self.k = k
+        self.n = 0
+        # Bound on the absolute rank error of rank() and of the quantile positions
+        self.rank_error = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self._sorted = None
+
+    def _capacity(self, level):
+        depth = len(self._levels) - 1 - level
+        return max(2, int(np.ceil(self.k * _LEVEL_RATIO ** depth)))
+
+    def _compact(self, level):
+        values = self._levels[level]
+        even = len(values) - len(values) % 2
+        promoted = values[self._rng.integers(2):even:2]
+        # An odd value out (the largest) stays behind, so the level stays sorted
+        self._levels[level] = values[even:]
+        if level + 1 == len(self._levels):
+            self._levels.append(np.empty(0))
+        self._levels[level + 1] = _merge_sorted(self._levels[level + 1], promoted)
+        self.rank_error += 2 ** level
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            if len(self._levels[level]) > self._capacity(level):
+                self._compact(level)
+            level += 1
+        self._sorted = None
+
+    def update(self, values):
+        """
+        Add values to the sketch; missing values are ignored.
+
+        Parameters:
+        values (array-like): Numbers (a chunk, a partition or a single value).
+
+        Returns:
+        QuantileSketch: self, for chaining.
+        """
+        values = np.asarray(values, dtype="float64").ravel()
+        values = np.sort(values[~np.isnan(values)])
+        self.n += len(values)
+        self._levels[0] = _merge_sorted(self._levels[0], values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Fold another sketch (of other values) into this one.
+
+        Parameters:
+        other (QuantileSketch): The sketch to merge; it is left unchanged.
+
+        Returns:
+        QuantileSketch: self, for chaining.
+        """
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, values in enumerate(other._levels):
+            self._levels[level] = _merge_sorted(self._levels[level], values)
+        self.n += other.n
+        self.rank_error += other.rank_error
+        self.k = min(self.k, other.k)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        """The retained values sorted, with the total weight up to and including each."""
+        if self._sorted is None:
+            values = np.concatenate(self._levels)
+            weights = np.concatenate([np.full(len(level), 2 ** h, dtype="int64")
+                                      for h, level in enumerate(self._levels)])
+            order = np.argsort(values, kind="stable")
+            self._sorted = values[order], np.cumsum(weights[order])
+        return self._sorted
+
+    def rank(self, values):
+        """
+        Estimate how many sketched values are smaller than each of the given values.
+
+        Parameters:
+        values (array-like): Query values.
+
+        Returns:
+        np.ndarray: int64 estimated counts, off by at most rank_error.
+        """
+        retained, cumulative = self._weighted()
+        below = np.concatenate([[0], cumulative])
+        return below[np.searchsorted(retained, np.asarray(values, dtype="float64"), side="left")]
+
+    def value_at(self, positions):
+        """
+        Estimate the order statistics at 0-based positions of the sorted values.
+
+        Parameters:
+        positions (array-like): Integer positions in [0, n).
+
+        Returns:
+        np.ndarray: The estimated values at those positions.
+        """
+        if not self.n:
+            raise ValueError("Cannot take order statistics of an empty sketch")
+        retained, cumulative = self._weighted()
+        positions = np.clip(np.asarray(positions, dtype="int64"), 0, self.n - 1)
+        return retained[np.searchsorted(cumulative, positions, side="right")]
+
+    def quantile(self, q):
+        """
+        Estimate quantiles with linear interpolation, as pd.Series.quantile.
+
+        Parameters:
+        q (float or array-like): Quantiles in [0, 1].
+
+        Returns:
+        np.ndarray: The estimated quantiles.
+        """
+        position = np.asarray(q, dtype="float64") * (self.n - 1)
+        below = np.floor(position)
+        low, high = self.value_at(below), self.value_at(np.ceil(position))
+        t = position - below
+        # numpy's interpolation formula, so exact sketches give pandas' quantiles
+        diff = high - low
+        return np.where(t >= 0.5, high - diff * (1 - t), low + diff * t)
+
+    def __len__(self):
+        return self.n
+
+    def __repr__(self):
+        retained = sum(len(level) for level in self._levels)
+        return (f"QuantileSketch(k={self.k}, n={self.n:,}, retained={retained:,}, "
+                f"levels={len(self._levels)}, rank_error<={self.rank_error:,})")
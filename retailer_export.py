@@ -0,0 +1,178 @@
+# File: retailer_export.py
+
+# Writing the Power BI extracts (dim_customer, product_rfm_analysis, dim_stores).
+# export_table() writes a frame as
+# - "csv": the same text as DataFrame.to_csv, formatted in row chunks (serially by
+#   default: to_csv holds the GIL, so only a process pool formats chunks in parallel)
+# - "csv.gz": gzip-compressed CSV; every chunk is formatted and compressed by a
+#   thread pool and written as its own gzip member (a multi-member .gz file is read
+#   back as one stream by gzip, pandas and Power BI)
+# At most two chunks per worker are in flight, so formatted blocks never pile up
+# in memory while the writer drains them in row order.
+# - "parquet": columnar file; segment columns are stored dictionary-encoded, so
+#   Power BI loads them without re-parsing text
+# The file is written under a temporary name and renamed into place, so a refresh
+# never picks up a half-written extract. Each export returns its statistics
+# (rows, bytes, seconds, bytes/sec).
+
+# Import necessary libraries
+import gzip
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from retailer_io import parquet_available
+
+
+EXPORT_FORMATS = {"csv": ".csv", "csv.gz": ".csv.gz", "parquet": ".parquet"}
+
+# Low-cardinality text columns of the extracts written as dictionaries in Parquet
+DICTIONARY_COLUMNS = ["Customer_Category", "Product_Segment", "RFM_Segment"]
+
+# Rows formatted (and compressed) per task
+EXPORT_CHUNKSIZE = 100_000
+
+
+def export_path(directory, name, fmt="csv"):
+    """
+    Return the file path of an extract in the given format.
+
+    Parameters:
+    directory (str): The output directory.
+    name (str): The extract name, e.g. 'dim_customer'.
+    fmt (str): A key of EXPORT_FORMATS.
+
+    Returns:
+    str: e.g. '<directory>/dim_customer.csv.gz'.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Expected one of {sorted(EXPORT_FORMATS)}")
+    return os.path.join(directory, f"{name}{EXPORT_FORMATS[fmt]}")
+
+
+def _csv_chunk(chunk, header, compresslevel, date_format=None):
+    """Format one chunk as CSV bytes, gzip-compressed when compresslevel is set."""
+    data = chunk.to_csv(index=False, header=header, date_format=date_format).encode("utf-8")
+    if compresslevel is not None:
+        # zlib releases the GIL, so compression overlaps across a thread pool
+        data = gzip.compress(data, compresslevel=compresslevel, mtime=0)
+    return data
+
+
+def _write_csv(data, handle, chunksize, compresslevel, executor, max_workers, date_format):
+    starts = range(0, max(len(data), 1), chunksize)
+    chunks = ((data.iloc[start:start + chunksize], start == 0) for start in starts)
+    if len(starts) == 1 or executor == "serial":
+        for chunk, header in chunks:
+            handle.write(_csv_chunk(chunk, header, compresslevel, date_format))
+        return len(starts)
+    max_workers = max_workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool(max_workers=max_workers) as workers:
+        # A bounded window of chunks in flight, written back in row order
+        pending = deque()
+        for chunk, header in chunks:
+            if len(pending) >= 2 * max_workers:
+                handle.write(pending.popleft().result())
+            pending.append(workers.submit(_csv_chunk, chunk, header, compresslevel,
+                                          date_format))
+        while pending:
+            handle.write(pending.popleft().result())
+    return len(starts)
+
+
+def _dictionary_encoded(data, columns):
+    """Convert the given text columns to category, which Parquet stores as dictionaries."""
+    columns = [c for c in columns if c in data.columns
+               and not isinstance(data[c].dtype, pd.CategoricalDtype)]
+    if not columns:
+        return data
+    data = data.copy(deep=False)
+    for column in columns:
+        data[column] = data[column].astype("category")
+    return data
+
+
+def export_table(data, path, fmt=None, chunksize=EXPORT_CHUNKSIZE, max_workers=None,
+                 executor=None, compresslevel=6, dictionary_columns=DICTIONARY_COLUMNS,
+                 date_format=None):
+    """
+    Write a frame atomically as CSV, gzip-compressed CSV or Parquet.
+
+    Parameters:
+    data (pd.DataFrame): The frame to write (without its index).
+    path (str): The destination file.
+    fmt (str): A key of EXPORT_FORMATS. Default is inferred from the path's extension.
+    chunksize (int): Rows per CSV task, or per Parquet row group.
+    max_workers (int): Pool size for the CSV formats. Default is os.cpu_count().
+    executor (str): 'thread', 'process' or 'serial'. Default is 'thread' for 'csv.gz'
+        (zlib releases the GIL) and 'serial' for plain 'csv'.
+    compresslevel (int): gzip level (1 fastest to 9 smallest) for 'csv.gz'.
+    dictionary_columns (list): Text columns stored dictionary-encoded in Parquet.
+    date_format (str): strftime format of the datetime columns in the CSV formats,
+        e.g. '%m/%d/%Y'. Default is ISO 8601; Parquet keeps them as dates.
+
+    Returns:
+    dict: Export statistics: 'table', 'path', 'format', 'rows', 'chunks', 'bytes',
+        'seconds' and 'bytes_per_sec'.
+    """
+    if fmt is None:
+        fmt = next((f for f, ext in EXPORT_FORMATS.items() if path.endswith(ext)), "csv")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Expected one of {sorted(EXPORT_FORMATS)}")
+    if fmt == "parquet" and not parquet_available():
+        raise ImportError("Parquet export needs pyarrow or fastparquet to be installed")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    start = time.perf_counter()
+    try:
+        if fmt == "parquet":
+            _dictionary_encoded(data, dictionary_columns).to_parquet(
+                tmp_path, index=False, row_group_size=chunksize)
+            chunks = -(-len(data) // chunksize) or 1
+        else:
+            if executor is None:
+                executor = "thread" if fmt == "csv.gz" else "serial"
+            with open(tmp_path, "wb") as handle:
+                chunks = _write_csv(data, handle, chunksize,
+                                    compresslevel if fmt == "csv.gz" else None,
+                                    executor, max_workers, date_format)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    seconds = time.perf_counter() - start
+    size = os.path.getsize(path)
+    return {
+        "table": os.path.basename(path).split(".")[0],
+        "path": path,
+        "format": fmt,
+        "rows": len(data),
+        "chunks": chunks,
+        "bytes": size,
+        "seconds": seconds,
+        "bytes_per_sec": size / seconds if seconds else None,
+    }
+
+
+def format_export_stats(stats):
+    """
+    Format export statistics as a one-line summary.
+
+    Parameters:
+    stats (dict): Statistics returned by export_table.
+
+    Returns:
+    str: The formatted summary.
+    """
+    rate = stats["bytes_per_sec"]
+    return (f"{stats['table']}: {stats['rows']:,} rows written as {stats['format']} in "
+            f"{stats['seconds']:.2f}s ({stats['bytes'] / 2**20:.1f} MB, "
+            f"{(rate or 0) / 2**20:,.1f} MB/sec, {stats['chunks']} chunk(s))")
@@ -0,0 +1,485 @@
+# File: retailer_io.py
+
+# Schema-aware loading of the Global Electronics Retailer star schema.
+# The five source tables are described once in TABLE_SPECS so that every loader
+# reads them with compact dtypes instead of letting pandas infer object columns.
+# Columns without a declared dtype are shrunk by frame_optimizer.optimize_frame().
+# Parsed tables can be kept in a columnar Parquet cache next to the source CSVs,
+# and the whole schema can be loaded concurrently with load_star_schema().
+
+# Import necessary libraries
+import contextlib
+import hashlib
+import importlib.util
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from date_parsing import DateParser
+from frame_optimizer import format_memory_report, optimize_frame
+from money import parse_money
+
+
+# Per-table read specification.
+# - "dtype": explicit dtypes passed to the CSV parser (low-cardinality text as category)
+# - "dates": columns parsed to datetime64 after reading (by date_parsing.DateParser)
+# - "money": formatted amounts such as "$1,234.56 " parsed to float64 after reading
+# Columns missing from a given extract are simply ignored.
+TABLE_SPECS = {
+    "dim_customers": {
+        "dtype": {
+            "CustomerKey": "int32",
+            "Gender": "category",
+            "City": "category",
+            "State Code": "category",
+            "State": "category",
+            "Zip Code": "str",
+            "Country": "category",
+            "Continent": "category",
+        },
+        "dates": ["Birthday"],
+    },
+    "dim_products": {
+        "dtype": {
+            "ProductKey": "int32",
+            "Brand": "category",
+            "Color": "category",
+            "SubcategoryKey": "int16",
+            "Subcategory": "category",
+            "CategoryKey": "int16",
+            "Category": "category",
+        },
+        "dates": [],
+        "money": ["Unit Cost USD", "Unit Price USD"],
+    },
+    "dim_stores": {
+        "dtype": {
+            "StoreKey": "int16",
+            "Country": "category",
+            "State": "category",
+            "Square Meters": "float32",
+        },
+        "dates": ["Open Date"],
+    },
+    "dim_exchange_rates": {
+        "dtype": {
+            "Currency": "category",
+            "Exchange": "float64",
+        },
+        "dates": ["Date"],
+    },
+    "fact_sales": {
+        "dtype": {
+            "Order Number": "int32",
+            "Line Item": "int16",
+            "CustomerKey": "int32",
+            "StoreKey": "int16",
+            "ProductKey": "int32",
+            "Quantity": "int16",
+            "Currency Code": "category",
+        },
+        "dates": ["Order Date", "Delivery Date"],
+    },
+}
+
+
+def _read_options(name, file_path, encoding, usecols=None):
+    """
+    Build the read_csv keyword arguments for a table, restricted to the columns
+    actually present in the file.
+
+    Parameters:
+    name (str): The table name, a key of TABLE_SPECS.
+    file_path (str): The path to the CSV file.
+    encoding (str): The encoding of the CSV file.
+    usecols (list): Optional subset of columns to read.
+
+    Returns:
+    tuple: (read_csv keyword arguments, list of (column, parser) conversions)
+    """
+    if name not in TABLE_SPECS:
+        raise KeyError(f"Unknown table '{name}'. Expected one of {sorted(TABLE_SPECS)}")
+    spec = TABLE_SPECS[name]
+
+    header = pd.read_csv(file_path, encoding=encoding, nrows=0).columns
+    columns = [c for c in header if usecols is None or c in usecols]
+
+    options = {
+        "encoding": encoding,
+        "usecols": columns,
+        "dtype": {c: t for c, t in spec["dtype"].items() if c in columns},
+    }
+    # One DateParser per column, so distinct date strings are parsed once per file
+    conversions = [(c, DateParser()) for c in spec["dates"] if c in columns]
+    conversions += [(c, parse_money) for c in spec.get("money", []) if c in columns]
+    return options, conversions
+
+
+def _declared_columns(name):
+    """Columns of a table whose dtype is fixed by TABLE_SPECS."""
+    spec = TABLE_SPECS[name]
+    return list(spec["dtype"]) + spec["dates"] + spec.get("money", [])
+
+
+def _optimize(data, name, stats):
+    """Run optimize_frame on the undeclared columns and record the memory saved."""
+    data, report = optimize_frame(data, exclude=_declared_columns(name))
+    stats["optimize"] = report
+    return data
+
+
+def _convert_columns(chunk, conversions):
+    """Apply the date and money conversions to a freshly read chunk in place."""
+    for column, parser in conversions:
+        chunk[column] = parser(chunk[column])
+    return chunk
+
+
+def _concat_chunks(chunks):
+    """
+    Concatenate typed chunks without losing categorical dtypes.
+
+    pd.concat falls back to object when chunks carry different categories, so the
+    categorical columns are unioned first.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            columns[column] = pd.Series(
+                pd.api.types.union_categoricals([c[column] for c in chunks]), name=column
+            )
+        else:
+            columns[column] = pd.concat([c[column] for c in chunks], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def _new_stats(name, file_path):
+    return {"table": name, "path": str(file_path), "rows": 0, "chunks": 0,
+            "seconds": 0.0, "rows_per_sec": 0.0, "peak_memory_mb": None}
+
+
+@contextlib.contextmanager
+def _measure(stats, track_memory=False):
+    """
+    Time the enclosed block and record its rows/sec in stats, and its peak traced
+    memory with track_memory. tracemalloc hooks every allocation and slows the load
+    down, so it is only switched on for benchmarks and profiling runs.
+    """
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if track_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+        if stats["seconds"] > 0:
+            stats["rows_per_sec"] = stats["rows"] / stats["seconds"]
+        if track_memory:
+            stats["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def iter_table(name, file_path, encoding="ISO-8859-1", chunksize=500_000,
+               usecols=None, stats=None, track_memory=False, where=None):
+    """
+    Stream a star-schema table as typed DataFrame chunks.
+
+    Parameters:
+    name (str): The table name, a key of TABLE_SPECS.
+    file_path (str): The path to the CSV file.
+    encoding (str): The encoding of the CSV file. Default is 'ISO-8859-1'.
+    chunksize (int): Number of rows per chunk.
+    usecols (list): Optional subset of columns to read.
+    stats (dict): Optional dict filled with load statistics once the stream ends.
+    track_memory (bool): Record the peak traced memory while streaming (slower).
+    where (callable): Optional function of a converted chunk returning the boolean
+        mask of the rows to keep, e.g. lambda chunk: chunk["Order Date"] >= since;
+        rows left out are counted in stats['rows_skipped'] and never accumulated.
+
+    Yields:
+    pd.DataFrame: The next chunk of the table (possibly empty when filtered).
+    """
+    options, conversions = _read_options(name, file_path, encoding, usecols)
+    if stats is None:
+        stats = {}
+    stats.update(_new_stats(name, file_path))
+    if where is not None:
+        stats["rows_skipped"] = 0
+
+    with _measure(stats, track_memory):
+        with pd.read_csv(file_path, chunksize=chunksize, **options) as reader:
+            for chunk in reader:
+                chunk = _convert_columns(chunk, conversions)
+                if where is not None:
+                    read = len(chunk)
+                    chunk = chunk[where(chunk)]
+                    stats["rows_skipped"] += read - len(chunk)
+                stats["rows"] += len(chunk)
+                stats["chunks"] += 1
+                yield chunk
+        # Rows per date parsing path (explicit format, 'cached', 'mixed', 'missing')
+        stats["date_paths"] = {column: parser.stats for column, parser in conversions
+                               if isinstance(parser, DateParser)}
+
+
+def load_table(name, file_path, encoding="ISO-8859-1", chunksize=None,
+               usecols=None, track_memory=False, optimize=True, where=None):
+    """
+    Load a star-schema table with its declared dtypes and date columns.
+
+    Parameters:
+    name (str): The table name, a key of TABLE_SPECS.
+    file_path (str): The path to the CSV file.
+    encoding (str): The encoding of the CSV file. Default is 'ISO-8859-1'.
+    chunksize (int): Read in chunks of this many rows to bound parser memory.
+        Default None reads the file in one pass.
+    usecols (list): Optional subset of columns to read.
+    track_memory (bool): Record the peak traced memory during the load (slower).
+    optimize (bool): Shrink the columns without a declared dtype (see
+        frame_optimizer); the per-column report is kept in stats['optimize'].
+    where (callable): Optional row filter applied to each chunk (see iter_table).
+
+    Returns:
+    tuple: (pd.DataFrame, dict of load statistics)
+    """
+    stats = {}
+    if chunksize is None:
+        chunksize = 1 << 62  # single chunk holding the whole file
+    chunks = list(iter_table(name, file_path, encoding=encoding, chunksize=chunksize,
+                             usecols=usecols, stats=stats, track_memory=track_memory,
+                             where=where))
+    if chunks:
+        data = _concat_chunks(chunks)
+    else:
+        options, _ = _read_options(name, file_path, encoding, usecols)
+        data = pd.read_csv(file_path, nrows=0, **options)
+    if optimize:
+        data = _optimize(data, name, stats)
+    stats["memory_mb"] = data.memory_usage(deep=True).sum() / 2**20
+    return data, stats
+
+
+def format_load_stats(stats):
+    """
+    Format load statistics as a one-line summary.
+
+    Parameters:
+    stats (dict): Statistics returned by load_table or filled by iter_table.
+
+    Returns:
+    str: The formatted summary.
+    """
+    line = (f"{stats['table']}: {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+            f"({stats['rows_per_sec']:,.0f} rows/sec, {stats['chunks']} chunk(s))")
+    if stats.get("memory_mb") is not None:
+        line += f", frame {stats['memory_mb']:.1f} MB"
+    if stats.get("peak_memory_mb") is not None:
+        line += f", peak {stats['peak_memory_mb']:.1f} MB"
+    if stats.get("rows_skipped"):
+        line += f", {stats['rows_skipped']:,} rows skipped"
+    if stats.get("cache") is not None:
+        line += f", cache {stats['cache']}"
+    report = stats.get("optimize")
+    if report is not None and (report["dtype_before"] != report["dtype_after"]).any():
+        line += f"\n    optimized: {format_memory_report(report)}"
+    for column, paths in stats.get("date_paths", {}).items():
+        counts = ", ".join(f"{path} {rows:,}" for path, rows in paths.items())
+        line += f"\n    {column}: {counts}"
+    return line
+
+
+# Columnar cache
+# Each parsed table is written once to Parquet, keyed by the source path, its
+# modification time and size and the encoding it was decoded with, so later runs
+# skip CSV decoding and date parsing.
+# Bump CACHE_VERSION whenever TABLE_SPECS or the parsing logic changes.
+CACHE_VERSION = 3
+CACHE_DIRNAME = ".parquet_cache"
+
+# Columns needed by the customer RFM aggregation
+RFM_COLUMNS = ["CustomerKey", "Order Date", "Order Number", "Quantity"]
+
+
+def parquet_available():
+    """Return True when a Parquet engine (pyarrow or fastparquet) is installed."""
+    return any(importlib.util.find_spec(m) is not None for m in ("pyarrow", "fastparquet"))
+
+
+def cache_path(name, file_path, cache_dir=None, encoding="ISO-8859-1"):
+    """
+    Return the cache file for a source CSV in its current state.
+
+    Parameters:
+    name (str): The table name, a key of TABLE_SPECS.
+    file_path (str): The path to the source CSV file.
+    cache_dir (str): Directory holding the cache. Default is a '.parquet_cache'
+        folder next to the source file.
+    encoding (str): The encoding the CSV is decoded with; text decoded with
+        another encoding is cached separately.
+
+    Returns:
+    str: The path of the Parquet file for this version of the source.
+    """
+    source = os.path.abspath(file_path)
+    info = os.stat(source)
+    key = f"{source}|{info.st_mtime_ns}|{info.st_size}|{encoding.lower()}|{CACHE_VERSION}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(source), CACHE_DIRNAME)
+    return os.path.join(cache_dir, f"{name}-{digest}.parquet")
+
+
+def _write_cache(data, path, name):
+    """Write a table to the cache atomically and drop older versions of it."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    data.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    for entry in os.listdir(directory):
+        stale = os.path.join(directory, entry)
+        if entry.startswith(f"{name}-") and entry.endswith(".parquet") and stale != path:
+            os.remove(stale)
+
+
+def _cached_columns(path, columns):
+    """Restrict a column projection to the columns stored in a cache file."""
+    if columns is None:
+        return None
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return list(columns)
+    return [c for c in pq.read_schema(path).names if c in columns]
+
+
+def load_cached(name, file_path, encoding="ISO-8859-1", columns=None, cache_dir=None,
+                chunksize=None, track_memory=False, optimize=True):
+    """
+    Load a star-schema table through the Parquet cache.
+
+    On a miss the CSV is parsed with load_table and the full table is cached; on a
+    hit only the requested columns are read back from the columnar file. A miss
+    deliberately parses every column even when a projection is requested: one
+    cache file then serves every later projection (the pipeline, the benchmarks
+    and RFM_COLUMNS) instead of one parse and one file per column set.
+
+    Parameters:
+    name (str): The table name, a key of TABLE_SPECS.
+    file_path (str): The path to the source CSV file.
+    encoding (str): The encoding of the CSV file. Default is 'ISO-8859-1'.
+    columns (list): Optional column projection, e.g. RFM_COLUMNS.
+    cache_dir (str): Directory holding the cache (see cache_path).
+    chunksize (int): Rows per chunk when the CSV has to be parsed.
+    track_memory (bool): Record the peak traced memory during the load (slower).
+    optimize (bool): Shrink the columns without a declared dtype after loading;
+        the cache always holds the table as parsed.
+
+    Returns:
+    tuple: (pd.DataFrame, dict of load statistics with a 'cache' entry)
+    """
+    if not parquet_available():
+        data, stats = load_table(name, file_path, encoding=encoding, chunksize=chunksize,
+                                 usecols=columns, track_memory=track_memory,
+                                 optimize=optimize)
+        stats["cache"] = "disabled"
+        return data, stats
+
+    path = cache_path(name, file_path, cache_dir, encoding)
+    if not os.path.exists(path):
+        # The whole table is parsed and cached, whatever the projection (see above)
+        data, stats = load_table(name, file_path, encoding=encoding, chunksize=chunksize,
+                                 track_memory=track_memory, optimize=False)
+        _write_cache(data, path, name)
+        if columns is not None:
+            data = data[[c for c in data.columns if c in columns]]
+        stats["cache"] = "miss"
+    else:
+        stats = _new_stats(name, file_path)
+        with _measure(stats, track_memory):
+            data = pd.read_parquet(path, columns=_cached_columns(path, columns))
+            stats["rows"] = len(data)
+            stats["chunks"] = 1
+        stats["cache"] = "hit"
+    if optimize:
+        data = _optimize(data, name, stats)
+    stats["memory_mb"] = data.memory_usage(deep=True).sum() / 2**20
+    return data, stats
+
+
+# Concurrent loading of the whole star schema
+# The C parser releases the GIL while tokenizing, so a thread pool overlaps the
+# five reads and the wall-clock time is bounded by the largest table (fact_sales).
+StarSchema = namedtuple("StarSchema", list(TABLE_SPECS) + ["stats"])
+
+
+def _load_one(name, file_path, encoding, columns, chunksize, use_cache, optimize):
+    if use_cache:
+        return load_cached(name, file_path, encoding=encoding, columns=columns,
+                           chunksize=chunksize, track_memory=False, optimize=optimize)
+    return load_table(name, file_path, encoding=encoding, chunksize=chunksize,
+                      usecols=columns, track_memory=False, optimize=optimize)
+
+
+def load_star_schema(config):
+    """
+    Load the five star-schema tables concurrently.
+
+    Parameters:
+    config (dict): Load settings:
+        - "data_dir" (str): Directory holding '<table>.csv' for every table.
+        - "paths" (dict): Optional per-table path overrides.
+        - "tables" (list): Tables to load. Default is all five; the others are None.
+        - "encoding" (str): CSV encoding. Default is 'ISO-8859-1'.
+        - "columns" (dict): Optional per-table column projection.
+        - "chunksize" (dict): Optional per-table chunk size.
+        - "use_cache" (bool): Load through the Parquet cache. Default is True.
+        - "optimize" (bool): Shrink undeclared columns with optimize_frame. Default is True.
+        - "executor" (str): 'thread' (default) or 'process'.
+        - "max_workers" (int): Pool size. Default is one worker per table.
+        - "track_memory" (bool): Trace the peak memory of the whole load (slower).
+          Default is False.
+
+    Returns:
+    StarSchema: The tables by name plus 'stats', a dict of per-table load statistics
+        and a 'total' entry with the wall-clock time (and peak traced memory).
+    """
+    paths = {name: os.path.join(config.get("data_dir", ""), f"{name}.csv")
+             for name in TABLE_SPECS}
+    paths.update(config.get("paths", {}))
+    encoding = config.get("encoding", "ISO-8859-1")
+    columns = config.get("columns", {})
+    chunksize = config.get("chunksize", {})
+    use_cache = config.get("use_cache", True)
+    optimize = config.get("optimize", True)
+    names = config.get("tables", list(TABLE_SPECS))
+    pool = ProcessPoolExecutor if config.get("executor", "thread") == "process" else ThreadPoolExecutor
+
+    tables, stats = dict.fromkeys(TABLE_SPECS), {}
+    total = _new_stats("star_schema", config.get("data_dir", ""))
+    # Memory is traced once around the whole load; per-table peaks are meaningless
+    # while the tables are read at the same time.
+    with _measure(total, config.get("track_memory", False)):
+        with pool(max_workers=config.get("max_workers", max(1, len(names)))) as executor:
+            futures = {
+                name: executor.submit(_load_one, name, paths[name], encoding,
+                                      columns.get(name), chunksize.get(name), use_cache,
+                                      optimize)
+                for name in names
+            }
+            for name, future in futures.items():
+                tables[name], stats[name] = future.result()
+                total["rows"] += stats[name]["rows"]
+        total["chunks"] = sum(s["chunks"] for s in stats.values())
+    stats["total"] = total
+    return StarSchema(stats=stats, **tables)
@@ -0,0 +1,628 @@
+# File: retailer_rfm.py
+
+# Vectorized RFM (Recency, Frequency, Monetary) scoring for the Global Electronics
+# Retailer project. Metrics come from a single named groupby aggregation and the
+# segment labels from np.select, so no Python code runs per group or per row.
+# RFM metrics can also be maintained incrementally from persisted running state,
+# or aggregated out of core from a stream of sales chunks, and scored against
+# quartile cut points estimated by mergeable quantile sketches.
+
+# Import necessary libraries
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dimension_index import DimensionIndex
+from quantile_sketch import SKETCH_K, QuantileSketch
+
+
+# Segment thresholds on RFM_Score, checked from the top; rows below the last
+# threshold get the default label.
+CUSTOMER_SEGMENTS = [
+    (9, 'Champions'),
+    (6, 'Loyal Customers'),
+    (4, 'Potential Loyalists'),
+]
+CUSTOMER_DEFAULT_SEGMENT = 'At Risk'
+
+PRODUCT_SEGMENTS = [
+    (9, 'Best Sellers'),
+    (6, 'Steady Movers'),
+    (4, 'Potential Stars'),
+    (2, 'Low Performers'),
+]
+PRODUCT_DEFAULT_SEGMENT = 'Underdogs'
+
+RFM_METRICS = ['Recency', 'Frequency', 'Monetary']
+
+
+def rfm_snapshot(sales):
+    """
+    Return the reference date for Recency: the day after the latest order.
+
+    Parameters:
+    sales (pd.DataFrame): Sales facts with a datetime 'Order Date' column.
+
+    Returns:
+    pd.Timestamp: The snapshot date.
+    """
+    return sales['Order Date'].max() + pd.Timedelta(days=1)
+
+
+def rfm_metrics(sales, key, monetary, snapshot=None):
+    """
+    Aggregate Recency, Frequency and Monetary values per key.
+
+    Parameters:
+    sales (pd.DataFrame): Sales facts with 'Order Date' and 'Order Number' columns.
+    key (str): The column to group by, e.g. 'CustomerKey' or 'ProductKey'.
+    monetary (str): The column summed into Monetary, e.g. 'Quantity'.
+    snapshot (pd.Timestamp): Reference date for Recency. Default is rfm_snapshot(sales).
+
+    Returns:
+    pd.DataFrame: One row per key with 'Recency', 'Frequency' and 'Monetary'.
+    """
+    if snapshot is None:
+        snapshot = rfm_snapshot(sales)
+    metrics = sales.groupby(key).agg(
+        last_order=('Order Date', 'max'),
+        Frequency=('Order Number', 'count'),
+        Monetary=(monetary, 'sum'),
+    )
+    metrics.insert(0, 'Recency', (snapshot - metrics.pop('last_order')).dt.days)
+    return metrics.reset_index()
+
+
+def rfm_scores(frame, scorer=None):
+    """
+    Add quartile-based R, F and M scores and their sum to a frame of RFM metrics.
+
+    Recency is scored 4 (most recent) to 1; Frequency and Monetary are ranked first
+    so that ties do not produce duplicate bin edges, and scored 1 to 4.
+
+    Parameters:
+    frame (pd.DataFrame): A frame with 'Recency', 'Frequency' and 'Monetary' columns.
+    scorer (QuartileScorer): Score against the scorer's sketched cut points instead
+        of exact quartiles of the frame (see rfm_sketches).
+
+    Returns:
+    pd.DataFrame: The frame with 'R_Score', 'F_Score', 'M_Score' and 'RFM_Score' added.
+    """
+    if scorer is not None:
+        return scorer.score(frame)
+    frame['R_Score'] = pd.qcut(frame['Recency'], 4, labels=[4, 3, 2, 1]).astype(int)
+    frame['F_Score'] = pd.qcut(frame['Frequency'].rank(method='first'), 4,
+                               labels=[1, 2, 3, 4]).astype(int)
+    frame['M_Score'] = pd.qcut(frame['Monetary'].rank(method='first'), 4,
+                               labels=[1, 2, 3, 4]).astype(int)
+    frame['RFM_Score'] = frame['R_Score'] + frame['F_Score'] + frame['M_Score']
+    return frame
+
+
+# Sketch-based scoring
+# Exact scoring needs every metric value at once: qcut computes the quartiles of the
+# whole population and rank(method='first') sorts it. Instead, QuantileSketches of
+# Recency, Frequency and Monetary can be fed per chunk or per partition of the
+# metrics (in parallel) and merged; a QuartileScorer then scores rows chunk by chunk
+# against their cut points. With exact sketches (at most k keys) the scores are those
+# of rfm_scores; otherwise each cut point is off by at most rank_error rows.
+RFM_QUARTILES = [0.25, 0.5, 0.75]
+
+
+def _sketch_metrics(frame, k, seed):
+    return {metric: QuantileSketch(k, seed).update(frame[metric].to_numpy(dtype='float64'))
+            for metric in RFM_METRICS}
+
+
+def rfm_sketches(frames, k=SKETCH_K, workers=1, executor='thread', seed=0):
+    """
+    Sketch the Recency, Frequency and Monetary distributions of chunks of RFM metrics.
+
+    Parameters:
+    frames (iterable): Frames (chunks or partitions of the keys) with 'Recency',
+        'Frequency' and 'Monetary' columns; keys must not repeat across frames.
+    k (int): Sketch capacity; larger k is slower and more accurate.
+    workers (int): Frames sketched concurrently. Default is 1 (in this thread).
+    executor (str): 'thread' (default) or 'process' for workers > 1.
+    seed (int): Seed of the sketches' compactions.
+
+    Returns:
+    dict: Metric -> merged QuantileSketch.
+    """
+    frames = list(frames)
+    if workers > 1 and len(frames) > 1:
+        pool = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool(max_workers=workers) as sketchers:
+            partials = list(sketchers.map(_sketch_metrics, frames, [k] * len(frames),
+                                          [seed + i for i in range(len(frames))]))
+    else:
+        partials = [_sketch_metrics(frame, k, seed + i) for i, frame in enumerate(frames)]
+    sketches = {metric: QuantileSketch(k, seed) for metric in RFM_METRICS}
+    for partial in partials:
+        for metric in RFM_METRICS:
+            sketches[metric].merge(partial[metric])
+    return sketches
+
+
+class QuartileScorer:
+    """
+    R, F and M scores against quartile cut points taken from sketches.
+
+    Recency is binned on its (interpolated) quartiles, as qcut does. Frequency and
+    Monetary follow qcut of rank(method='first'): a row moves above a rank edge when
+    its value is larger than the value at that edge, and rows tied with that value
+    are split in row order, the first ones staying below. Chunks must therefore be
+    scored in row order; the tie counts carry over from one call to the next.
+
+    Parameters:
+    sketches (dict): Metric -> QuantileSketch, as returned by rfm_sketches.
+    """
+
+    def __init__(self, sketches):
+        n = sketches['Recency'].n
+        self.recency_cuts = sketches['Recency'].quantile(RFM_QUARTILES)
+        # Rank edges of qcut over the ranks 1..n; the row at 0-based position
+        # floor(edge) is the first one above the edge
+        first_above = np.floor(1 + np.asarray(RFM_QUARTILES) * (n - 1)).astype('int64')
+        self.rank_cuts = {}
+        for metric in ['Frequency', 'Monetary']:
+            sketch = sketches[metric]
+            values = np.where(first_above < n, sketch.value_at(first_above), np.inf)
+            # How many rows equal to the cut value still rank at or below the edge
+            self.rank_cuts[metric] = (values, first_above - sketch.rank(values))
+        self._ties = {metric: np.zeros(len(RFM_QUARTILES), dtype='int64')
+                      for metric in self.rank_cuts}
+
+    def _rank_score(self, metric, values):
+        cut_values, tie_limits = self.rank_cuts[metric]
+        score = np.ones(len(values), dtype='int64')
+        for j, (cut, limit) in enumerate(zip(cut_values, tie_limits)):
+            tied = values == cut
+            position = np.cumsum(tied) + self._ties[metric][j]
+            score += (values > cut) | (tied & (position > limit))
+            self._ties[metric][j] += tied.sum()
+        return score
+
+    def score(self, frame):
+        """
+        Add 'R_Score', 'F_Score', 'M_Score' and 'RFM_Score' to a frame of RFM metrics.
+
+        Parameters:
+        frame (pd.DataFrame): The next rows (in row order) with 'Recency', 'Frequency'
+            and 'Monetary' columns.
+
+        Returns:
+        pd.DataFrame: The frame with the score columns added.
+        """
+        recency = frame['Recency'].to_numpy(dtype='float64')
+        frame['R_Score'] = 4 - np.searchsorted(self.recency_cuts, recency, side='left')
+        frame['F_Score'] = self._rank_score('Frequency', frame['Frequency'].to_numpy(dtype='float64'))
+        frame['M_Score'] = self._rank_score('Monetary', frame['Monetary'].to_numpy(dtype='float64'))
+        frame['RFM_Score'] = frame['R_Score'] + frame['F_Score'] + frame['M_Score']
+        return frame
+
+
+def rfm_segment(scores, segments, default):
+    """
+    Map RFM scores to segment labels.
+
+    Parameters:
+    scores (pd.Series): The RFM_Score values.
+    segments (list): (minimum score, label) pairs in descending order of score.
+    default (str): The label for scores below every threshold.
+
+    Returns:
+    np.ndarray: The segment label for each score.
+    """
+    conditions = [scores >= threshold for threshold, _ in segments]
+    labels = [label for _, label in segments]
+    return np.select(conditions, labels, default=default)
+
+
+def _attach_metrics(dimension, metrics, key):
+    """Join RFM metrics onto a dimension, keeping only members with sales."""
+    dimension = DimensionIndex(metrics, key).enrich(dimension, RFM_METRICS)
+    return dimension.dropna(subset=RFM_METRICS)
+
+
+def score_customers(dim_customer, sales, snapshot=None, metrics=None):
+    """
+    Enrich the customer dimension with RFM metrics, scores and Customer_Category.
+
+    Parameters:
+    dim_customer (pd.DataFrame): The customer dimension.
+    sales (pd.DataFrame): Sales facts with 'CustomerKey', 'Order Date',
+        'Order Number' and 'Quantity'.
+    snapshot (pd.Timestamp): Reference date for Recency. Default is rfm_snapshot(sales).
+    metrics (pd.DataFrame): Precomputed customer RFM metrics (e.g. from refresh_rfm);
+        when given, sales and snapshot are not used.
+
+    Returns:
+    pd.DataFrame: Customers with sales, with RFM columns and their category.
+    """
+    if metrics is None:
+        metrics = rfm_metrics(sales, 'CustomerKey', 'Quantity', snapshot)
+    customers = rfm_scores(_attach_metrics(dim_customer, metrics, 'CustomerKey'))
+    customers['Customer_Category'] = rfm_segment(
+        customers['RFM_Score'], CUSTOMER_SEGMENTS, CUSTOMER_DEFAULT_SEGMENT)
+    return customers
+
+
+def score_products(dim_product, sales, snapshot=None, metrics=None):
+    """
+    Enrich the product dimension with RFM metrics, scores, RFM_Segment and
+    Product_Segment.
+
+    Parameters:
+    dim_product (pd.DataFrame): The product dimension.
+    sales (pd.DataFrame): Sales facts with 'ProductKey', 'Order Date',
+        'Order Number' and 'Total Revenue'.
+    snapshot (pd.Timestamp): Reference date for Recency. Default is rfm_snapshot(sales).
+    metrics (pd.DataFrame): Precomputed product RFM metrics (e.g. from refresh_rfm);
+        when given, sales and snapshot are not used.
+
+    Returns:
+    pd.DataFrame: Products with sales, with RFM columns and their segment.
+    """
+    if metrics is None:
+        metrics = rfm_metrics(sales, 'ProductKey', 'Total Revenue', snapshot)
+    products = rfm_scores(_attach_metrics(dim_product, metrics, 'ProductKey'))
+    # Scores are single digits, so the three-digit code is R*100 + F*10 + M
+    products['RFM_Segment'] = (products['R_Score'] * 100 + products['F_Score'] * 10
+                               + products['M_Score']).astype(str)
+    products['Product_Segment'] = rfm_segment(
+        products['RFM_Score'], PRODUCT_SEGMENTS, PRODUCT_DEFAULT_SEGMENT)
+    return products
+
+
+# Incremental RFM
+# The running state per key holds the last order date, the order line count and
+# the sums of the monetary columns. States of disjoint sets of sales combine with
+# max/sum, so a refresh only aggregates the sales newer than the stored watermark
+# (the latest Order Date already folded into the state). The order lines of the
+# watermark day are stored with it, so lines of that day arriving late are still
+# folded in once, and lines already folded are never counted twice. Readers can
+# therefore skip every row dated before rfm_watermark() (refresh_rfm_states).
+
+# Columns identifying one sales row
+ORDER_LINE = ['Order Number', 'Line Item']
+
+
+def rfm_state(sales, key, sums):
+    """
+    Aggregate the running RFM state of a set of sales.
+
+    Parameters:
+    sales (pd.DataFrame): Sales facts with 'Order Date' and 'Order Number' columns.
+    key (str): The column to group by, e.g. 'CustomerKey' or 'ProductKey'.
+    sums (list): Columns to keep running sums of, e.g. ['Quantity', 'Total Revenue'].
+
+    Returns:
+    pd.DataFrame: Indexed by key, with 'last_order', 'Frequency' and one column per sum.
+    """
+    aggregations = {
+        'last_order': ('Order Date', 'max'),
+        'Frequency': ('Order Number', 'count'),
+    }
+    aggregations.update({column: (column, 'sum') for column in sums})
+    return sales.groupby(key).agg(**aggregations)
+
+
+def combine_rfm_state(states):
+    """
+    Combine running states of disjoint sets of sales.
+
+    Parameters:
+    states (list): States returned by rfm_state (or previous combinations).
+
+    Returns:
+    pd.DataFrame: The combined state, indexed by key.
+    """
+    states = [state for state in states if state is not None]
+    if len(states) == 1:
+        return states[0]
+    grouped = pd.concat(states).groupby(level=0)
+    combined = grouped.sum(numeric_only=True)
+    combined.insert(0, 'last_order', grouped['last_order'].max())
+    return combined
+
+
+def metrics_from_state(state, monetary, snapshot):
+    """
+    Derive Recency, Frequency and Monetary from a running state.
+
+    Parameters:
+    state (pd.DataFrame): A state returned by rfm_state or combine_rfm_state.
+    monetary (str): The summed column used as Monetary.
+    snapshot (pd.Timestamp): Reference date for Recency.
+
+    Returns:
+    pd.DataFrame: One row per key, shaped like the output of rfm_metrics.
+    """
+    metrics = pd.DataFrame({
+        'Recency': (snapshot - state['last_order']).dt.days,
+        'Frequency': state['Frequency'],
+        'Monetary': state[monetary],
+    })
+    return metrics.reset_index()
+
+
+def _state_paths(state_dir, name):
+    return (os.path.join(state_dir, f'{name}.parquet'),
+            os.path.join(state_dir, f'{name}.json'))
+
+
+def load_rfm_state(state_dir, name):
+    """
+    Load a persisted running state, its watermark and the order lines of the watermark day.
+
+    Parameters:
+    state_dir (str): Directory holding the state files.
+    name (str): The state name, e.g. 'customer_rfm'.
+
+    Returns:
+    tuple: (state DataFrame, watermark Timestamp, pd.MultiIndex of the (Order Number,
+        Line Item) pairs folded in on the watermark day, or None if not recorded),
+        or (None, None, None) if not saved yet.
+    """
+    state_path, meta_path = _state_paths(state_dir, name)
+    if not (os.path.exists(state_path) and os.path.exists(meta_path)):
+        return None, None, None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    lines = meta.get('watermark_lines')
+    if lines is not None:
+        lines = pd.MultiIndex.from_tuples([tuple(line) for line in lines],
+                                          names=ORDER_LINE)
+    return pd.read_parquet(state_path), pd.Timestamp(meta['watermark']), lines
+
+
+def save_rfm_state(state_dir, name, state, watermark, lines):
+    """
+    Persist a running state and its watermark, replacing the previous version atomically.
+
+    Parameters:
+    state_dir (str): Directory holding the state files.
+    name (str): The state name, e.g. 'customer_rfm'.
+    state (pd.DataFrame): The running state.
+    watermark (pd.Timestamp): The latest Order Date folded into the state.
+    lines (pd.MultiIndex): The (Order Number, Line Item) pairs folded in on the
+        watermark day.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    state_path, meta_path = _state_paths(state_dir, name)
+    state.to_parquet(f'{state_path}.tmp')
+    with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'watermark': watermark.isoformat(), 'keys': len(state),
+                   'sums': _state_sums(state),
+                   'watermark_lines': [[int(order), int(line)] for order, line in lines]}, f)
+    os.replace(f'{state_path}.tmp', state_path)
+    os.replace(f'{meta_path}.tmp', meta_path)
+
+
+def _order_lines(sales):
+    return pd.MultiIndex.from_frame(sales[ORDER_LINE])
+
+
+def _state_sums(state):
+    """The running sums held by a state."""
+    return [column for column in state.columns if column not in ('last_order', 'Frequency')]
+
+
+def rfm_watermark(state_dir, names=None, aggregates=None):
+    """
+    Return the earliest watermark of the persisted states.
+
+    Sales dated before it are already folded into every state, so a refresh only
+    needs to read the rows from this day on.
+
+    Parameters:
+    state_dir (str): Directory holding the state files.
+    names (dict): Key column -> state name. Default is RFM_STATE_NAMES.
+    aggregates (dict): Key column -> summed columns. Default is STREAM_AGGREGATES.
+
+    Returns:
+    pd.Timestamp: The earliest watermark, or None if any state is not saved yet or
+        lacks one of the sums (it is then rebuilt from the full history).
+    """
+    names, aggregates = names or RFM_STATE_NAMES, aggregates or STREAM_AGGREGATES
+    watermarks = []
+    for key, sums in aggregates.items():
+        state_path, meta_path = _state_paths(state_dir, names[key])
+        if not (os.path.exists(state_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        # States saved before the sums were recorded in the meta
+        stored = meta.get('sums') or _state_sums(pd.read_parquet(state_path))
+        if not set(sums) <= set(stored):
+            return None
+        watermarks.append(pd.Timestamp(meta['watermark']))
+    return min(watermarks) if watermarks else None
+
+
+def _unseen(sales, watermark, lines):
+    """Mask of the sales not folded yet into a state with this watermark."""
+    if watermark is None:
+        return np.ones(len(sales), dtype=bool)
+    new = (sales['Order Date'] > watermark).to_numpy()
+    if lines is not None:
+        # Late lines of the watermark day
+        on_watermark = (sales['Order Date'] == watermark).to_numpy()
+        new = new | (on_watermark & ~_order_lines(sales).isin(lines))
+    return new
+
+
+def _refresh_states(state_dir, names, chunks, aggregates):
+    """
+    Fold the unseen rows of sales chunks into persisted states, one per key.
+
+    Rows are checked against the watermarks stored before the refresh, so the
+    chunks may come in any date order; the states are saved once at the end.
+
+    Parameters:
+    state_dir (str): Directory holding the state files.
+    names (dict): Key column -> state name.
+    chunks (iterable): Sales chunks.
+    aggregates (dict): Key column -> summed columns.
+
+    Returns:
+    tuple: (dict of key column -> state, dict of key column -> new rows folded in)
+    """
+    stored = {key: load_rfm_state(state_dir, names[key]) for key in aggregates}
+    for key, sums in aggregates.items():
+        # A state without one of the running sums is rebuilt from the sales given
+        if stored[key][0] is not None and not set(sums) <= set(stored[key][0].columns):
+            stored[key] = None, None, None
+    states = {key: stored[key][0] for key in aggregates}
+    new_rows = dict.fromkeys(aggregates, 0)
+    # Latest Order Date folded in per key during this refresh, and its order lines
+    latest, latest_lines = dict.fromkeys(aggregates), {key: [] for key in aggregates}
+    for chunk in chunks:
+        for key, sums in aggregates.items():
+            _, watermark, lines = stored[key]
+            delta = chunk[_unseen(chunk, watermark, lines)]
+            if not len(delta):
+                continue
+            states[key] = combine_rfm_state([states[key], rfm_state(delta, key, sums)])
+            new_rows[key] += len(delta)
+            day = delta['Order Date'].max()
+            if latest[key] is None or day > latest[key]:
+                latest[key], latest_lines[key] = day, []
+            if day == latest[key]:
+                latest_lines[key].append(delta.loc[delta['Order Date'] == day, ORDER_LINE])
+
+    for key in aggregates:
+        if states[key] is None:
+            raise ValueError(f"No RFM state for '{names[key]}' and no sales to build it from")
+        if latest[key] is None:
+            continue
+        _, watermark, lines = stored[key]
+        folded = _order_lines(pd.concat(latest_lines[key]))
+        if latest[key] == watermark and lines is not None:
+            folded = lines.append(folded)
+        save_rfm_state(state_dir, names[key], states[key], latest[key], folded)
+    return states, new_rows
+
+
+def refresh_rfm(state_dir, name, sales, key, monetary, sums=None):
+    """
+    Fold sales newer than the stored watermark into the running state and return
+    the refreshed RFM metrics.
+
+    Rows with an Order Date after the watermark are aggregated, as are rows of the
+    watermark day whose (Order Number, Line Item) was not folded in yet, so passing
+    the full history again is safe and late lines of the last refreshed day are not
+    lost. Rows dated before the watermark day are ignored.
+    Recency is measured from the day after the new watermark, as in rfm_snapshot.
+
+    Parameters:
+    state_dir (str): Directory holding the state files.
+    name (str): The state name, e.g. 'customer_rfm'.
+    sales (pd.DataFrame): New (or all) sales facts with 'Order Number' and 'Line Item'.
+    key (str): The column to group by, e.g. 'CustomerKey'.
+    monetary (str): The summed column used as Monetary.
+    sums (list): Columns to keep running sums of. Default is [monetary].
+
+    Returns:
+    tuple: (RFM metrics DataFrame, number of new sales rows folded in)
+    """
+    states, new_rows = _refresh_states(state_dir, {key: name}, [sales],
+                                       {key: sums or [monetary]})
+    state = states[key]
+    snapshot = state['last_order'].max() + pd.Timedelta(days=1)
+    return metrics_from_state(state, monetary, snapshot), new_rows[key]
+
+
+def refresh_rfm_states(state_dir, chunks, products, names=None, aggregates=None):
+    """
+    Fold sales chunks into the persisted customer, product and store states.
+
+    The incremental counterpart of stream_rfm: only rows not folded in yet are
+    aggregated (see refresh_rfm), so the chunks can be restricted to the sales from
+    rfm_watermark() on and the full history is never read into memory.
+
+    Parameters:
+    state_dir (str): Directory holding the state files.
+    chunks (iterable): Sales chunks (e.g. from retailer_io.iter_table) with
+        'Order Date', 'Order Number', 'Line Item', 'Quantity' and the key columns.
+    products (DimensionIndex): Product dimension index by ProductKey with a float
+        'Unit Price USD' column, used to compute each chunk's 'Total Revenue'.
+    names (dict): Key column -> state name. Default is RFM_STATE_NAMES.
+    aggregates (dict): Key column -> summed columns. Default is STREAM_AGGREGATES.
+
+    Returns:
+    tuple: (dict of key column -> running state, dict of key column -> new rows)
+    """
+    return _refresh_states(state_dir, names or RFM_STATE_NAMES,
+                           (_with_revenue(chunk, products) for chunk in chunks),
+                           aggregates or STREAM_AGGREGATES)
+
+
+# Out-of-core aggregation
+# Partial states are computed per chunk of sales and folded into running states,
+# so memory is bounded by the chunk size plus the number of distinct keys.
+STREAM_AGGREGATES = {
+    'CustomerKey': ['Quantity', 'Total Revenue'],
+    'ProductKey': ['Quantity', 'Total Revenue'],
+    'StoreKey': ['Total Revenue'],
+}
+
+
+# Names of the persisted incremental states per key column
+RFM_STATE_NAMES = {
+    'CustomerKey': 'customer_rfm',
+    'ProductKey': 'product_rfm',
+    'StoreKey': 'store_rfm',
+}
+
+
+def _with_revenue(chunk, products):
+    """Add 'Total Revenue' (Quantity * Unit Price USD) to a sales chunk."""
+    return chunk.assign(**{
+        'Total Revenue': chunk['Quantity'] * products.take('Unit Price USD',
+                                                           chunk['ProductKey'])
+    })
+
+
+def stream_rfm(chunks, products, aggregates=None):
+    """
+    Aggregate running RFM states per customer, product and store from sales chunks.
+
+    Parameters:
+    chunks (iterable): Sales chunks (e.g. from retailer_io.iter_table) with
+        'Order Date', 'Order Number', 'Quantity' and the key columns.
+    products (DimensionIndex): Product dimension index by ProductKey with a float
+        'Unit Price USD' column, used to compute each chunk's 'Total Revenue'.
+    aggregates (dict): Key column -> summed columns. Default is STREAM_AGGREGATES.
+
+    Returns:
+    dict: Key column -> running state (see rfm_state).
+    """
+    aggregates = aggregates or STREAM_AGGREGATES
+    states = dict.fromkeys(aggregates)
+    for chunk in chunks:
+        chunk = _with_revenue(chunk, products)
+        for key, sums in aggregates.items():
+            states[key] = combine_rfm_state([states[key], rfm_state(chunk, key, sums)])
+    return states
+
+
+def store_performance_from_state(state):
+    """
+    Derive total sales and order lines per store from a running state.
+
+    Parameters:
+    state (pd.DataFrame): A StoreKey state with 'Total Revenue' and 'Frequency'.
+
+    Returns:
+    pd.DataFrame: 'StoreKey', 'Total Sales' and 'Total Orders', best stores first.
+    """
+    performance = pd.DataFrame({
+        'Total Sales': state['Total Revenue'],
+        'Total Orders': state['Frequency'],
+    })
+    return performance.reset_index().sort_values(by='Total Sales', ascending=False)
@@ -0,0 +1,181 @@
+# File: stage_profiler.py
+
+# Lightweight per-stage profiling for the pipelines.
+# Wrap a step in `with stage("name", rows_in=frame) as s:` to record its wall time,
+# CPU time, rows in/out and the change in resident memory; call reset_profile() at
+# the start of each run so its report only holds that run's stages. Profiling is
+# switched on by the RETAILER_PROFILE environment variable ("1" for a summary table,
+# or a path ending in .json to also write the trace there). When it is off, stage()
+# hands back a shared no-op object, so the instrumentation costs one function call
+# per stage.
+
+# Import necessary libraries
+import json
+import numbers
+import os
+import time
+
+import pandas as pd
+
+
+PROFILE_ENV = "RETAILER_PROFILE"
+
+# Completed stages, in the order they finished
+TRACE = []
+
+_enabled = os.environ.get(PROFILE_ENV, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def enable(flag=True):
+    """
+    Switch profiling on or off, overriding the environment variable.
+
+    Parameters:
+    flag (bool): Whether stages are recorded.
+    """
+    global _enabled
+    _enabled = flag
+
+
+def profiling_enabled():
+    """Return whether stages are currently recorded."""
+    return _enabled
+
+
+def _rss_bytes():
+    """Current resident set size of the process, or None if it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _rows(value):
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+class Stage:
+    """
+    A profiled stage; use through stage().
+
+    Parameters:
+    name (str): The stage name.
+    rows_in (int or sized): Rows entering the stage, or a frame to count them from.
+    """
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = _rows(rows_in)
+        self.rows_out = None
+
+    def output(self, value):
+        """Record the stage output's row count and return the output unchanged."""
+        self.rows_out = _rows(value)
+        return value
+
+    def __enter__(self):
+        self._rss = _rss_bytes()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        rss = _rss_bytes()
+        TRACE.append({
+            "stage": self.name,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rss_delta_mb": (rss - self._rss) / 2**20 if rss is not None and self._rss is not None
+            else None,
+            "failed": exc_type is not None,
+        })
+        return False
+
+
+class _NullStage:
+    """Stand-in returned by stage() while profiling is off."""
+
+    def output(self, value):
+        return value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, rows_in=None):
+    """
+    Profile the enclosed block as one stage.
+
+    Parameters:
+    name (str): The stage name.
+    rows_in (int or sized): Rows entering the stage, or a frame to count them from.
+
+    Returns:
+    Stage: A context manager; call .output(result) inside it to record rows out.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return Stage(name, rows_in)
+
+
+def reset_profile():
+    """Forget the stages recorded so far, e.g. at the start of a new run."""
+    TRACE.clear()
+
+
+def profile_summary(trace=None):
+    """
+    Summarize the recorded stages.
+
+    Parameters:
+    trace (list): Stage records. Default is TRACE.
+
+    Returns:
+    pd.DataFrame: One row per stage with its share of the total wall time.
+    """
+    summary = pd.DataFrame(TRACE if trace is None else trace,
+                           columns=["stage", "wall_s", "cpu_s", "rows_in", "rows_out",
+                                    "rss_delta_mb", "failed"])
+    summary[["rows_in", "rows_out"]] = summary[["rows_in", "rows_out"]].astype("Int64")
+    total = summary["wall_s"].sum()
+    summary["wall_pct"] = 100 * summary["wall_s"] / total if total else 0.0
+    return summary
+
+
+def report_profile(path=None):
+    """
+    Print the stage summary and write the JSON trace when profiling is on.
+
+    Parameters:
+    path (str): Where to write the trace. Default is the RETAILER_PROFILE value
+        when it ends in '.json'; no file is written otherwise.
+    """
+    if not _enabled:
+        return
+    print(profile_summary().to_string(index=False, float_format="{:,.3f}".format))
+    if path is None and os.environ.get(PROFILE_ENV, "").endswith(".json"):
+        path = os.environ[PROFILE_ENV]
+    if path:
+        with open(path, "w") as handle:
+            json.dump({"stages": TRACE}, handle, indent=2)
@@ -0,0 +1,220 @@
+# File: text_index.py
+
+# Trigram index for case-insensitive substring and prefix search over a text column.
+# str.lower().str.contains(...) rescans every string on every query. TrigramIndex
+# is built once over a column (titles, authors, review texts):
+# - the strings are lowercased and factorized, so repeated values are indexed once
+# - every 3-character window of each distinct string is packed into one integer
+#   (21 bits per code point), and the distinct strings holding each trigram are
+#   stored as a sorted posting list
+# A substring query intersects the posting lists of its own trigrams, checks only
+# those candidate strings with `in`, and returns the row positions of the matches,
+# so results are exactly those of str.lower().str.contains(substring.lower()).
+# Queries shorter than a trigram scan the distinct strings. Prefix queries binary
+# search the sorted distinct strings. The index can be saved to and loaded from disk.
+
+# Import necessary libraries
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Distinct strings whose trigrams are extracted together (bounds the build's memory)
+BUILD_BATCH_SIZE = 100_000
+
+_CODE_BITS = 21
+
+
+def _trigram_keys(text):
+    """The code points of a string, and its 3-character windows packed into uint64 keys."""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype="<u4").astype("uint64")
+    keys = (codes[:-2] << (2 * _CODE_BITS)) | (codes[1:-1] << _CODE_BITS) | codes[2:]
+    return codes, keys
+
+
+class TrigramIndex:
+    """
+    Case-insensitive substring and prefix index over a text column.
+
+    Parameters:
+    texts (pd.Series or list): The strings to index; missing values never match.
+    batch_size (int): Distinct strings processed per build step.
+    """
+
+    def __init__(self, texts=None, batch_size=BUILD_BATCH_SIZE):
+        if texts is None:
+            return
+        # Factorized as a string dtype: object factorization stops at a NUL character
+        codes, uniques = pd.factorize(pd.Series(texts, dtype="object").astype("str"))
+        lowered, strings = pd.factorize(pd.Series([text.lower() for text in uniques],
+                                                  dtype="str"))
+        self.strings = np.asarray(strings, dtype=object)
+        self.row_codes = np.where(codes >= 0, lowered[codes], -1).astype("int32")
+        # Distinct strings in sorted order, for prefix queries
+        self.order = pd.Series(self.strings, dtype="str").argsort(kind="stable").to_numpy()
+        self._build_rows()
+
+        keys, docs = [], []
+        for start in range(0, len(self.strings), batch_size):
+            # NUL separates the strings (NULs inside them are indexed as \x01), so no
+            # trigram spans two strings
+            batch = [text.replace("\x00", "\x01")
+                     for text in self.strings[start:start + batch_size]]
+            codes, windows = _trigram_keys("\x00".join(batch) + "\x00")
+            separator = codes == 0
+            doc = np.cumsum(separator) - separator + start
+            inside = ~(separator[:-2] | separator[1:-1] | separator[2:])
+            batch_keys, batch_docs = windows[inside], doc[:-2][inside]
+            # One posting per (trigram, string)
+            order = np.lexsort((batch_docs, batch_keys))
+            batch_keys, batch_docs = batch_keys[order], batch_docs[order]
+            new = np.ones(len(batch_keys), dtype=bool)
+            new[1:] = (batch_keys[1:] != batch_keys[:-1]) | (batch_docs[1:] != batch_docs[:-1])
+            keys.append(batch_keys[new])
+            docs.append(batch_docs[new])
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype="uint64")
+        docs = np.concatenate(docs) if docs else np.empty(0, dtype="int64")
+        # Batches hold increasing strings, so a stable sort keeps each list sorted
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        self.postings = docs[order].astype("int32")
+        first = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]])) \
+            if len(keys) else np.empty(0, dtype="int64")
+        self.trigrams = keys[first]
+        self.offsets = np.append(first, len(keys)).astype("int64")
+
+    def _build_rows(self):
+        """Rows of each distinct string: a CSR layout over the row positions."""
+        self._ordered = self.strings[self.order]
+        # Rows of missing values (code -1) sort first and are never referenced
+        self._rows = np.argsort(self.row_codes, kind="stable")
+        self._row_counts = np.bincount(self.row_codes[self.row_codes >= 0],
+                                       minlength=len(self.strings))
+        self._row_starts = (np.cumsum(self._row_counts) - self._row_counts
+                            + int((self.row_codes < 0).sum()))
+
+    def __len__(self):
+        return len(self.row_codes)
+
+    def _posting(self, key):
+        slot = np.searchsorted(self.trigrams, key)
+        if slot == len(self.trigrams) or self.trigrams[slot] != key:
+            return None
+        return self.postings[self.offsets[slot]:self.offsets[slot + 1]]
+
+    def _positions(self, string_ids):
+        """Sorted row positions of the given distinct strings."""
+        string_ids = np.asarray(string_ids, dtype="int64")
+        counts = self._row_counts[string_ids]
+        starts = self._row_starts[string_ids]
+        gathered = np.repeat(starts - (np.cumsum(counts) - counts), counts) + \
+            np.arange(counts.sum())
+        return np.sort(self._rows[gathered])
+
+    def candidates(self, substring):
+        """
+        Return the distinct strings that hold every trigram of a substring.
+
+        Parameters:
+        substring (str): The text searched for (at least 3 characters once lowercased).
+
+        Returns:
+        np.ndarray: Sorted ids of the candidate distinct strings.
+        """
+        _, keys = _trigram_keys(substring.lower().replace("\x00", "\x01"))
+        lists = []
+        for key in np.unique(keys):
+            posting = self._posting(key)
+            if posting is None:
+                return np.empty(0, dtype="int32")
+            lists.append(posting)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for posting in lists[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return candidates
+
+    def contains(self, substring):
+        """
+        Find the rows containing a substring, ignoring case.
+
+        Parameters:
+        substring (str): The text searched for (not a regular expression).
+
+        Returns:
+        np.ndarray: Sorted int64 row positions, the same as np.flatnonzero(
+            texts.str.lower().str.contains(substring.lower(), regex=False, na=False)).
+        """
+        needle = substring.lower()
+        if len(needle) < 3:
+            ids = np.arange(len(self.strings))
+        else:
+            ids = self.candidates(substring)
+        matched = ids[np.fromiter((needle in text for text in self.strings[ids]),
+                                  dtype=bool, count=len(ids))]
+        return self._positions(matched)
+
+    def startswith(self, prefix):
+        """
+        Find the rows starting with a prefix, ignoring case.
+
+        Parameters:
+        prefix (str): The prefix searched for.
+
+        Returns:
+        np.ndarray: Sorted int64 row positions.
+        """
+        prefix = prefix.lower()
+        low = np.searchsorted(self._ordered, prefix, side="left")
+        # Every string starting with the prefix sorts before the prefix's successor
+        stem = prefix.rstrip("\U0010ffff")
+        if stem:
+            high = np.searchsorted(self._ordered, stem[:-1] + chr(ord(stem[-1]) + 1),
+                                   side="left")
+        else:
+            high = len(self._ordered)
+        return self._positions(self.order[low:high])
+
+    def save(self, path):
+        """
+        Save the index atomically as an .npz file.
+
+        Parameters:
+        path (str): The index file (.npz).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        encoded = [text.encode("utf-8") for text in self.strings]
+        lengths = np.fromiter(map(len, encoded), dtype="int64", count=len(encoded))
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, trigrams=self.trigrams, offsets=self.offsets,
+                 postings=self.postings, row_codes=self.row_codes, order=self.order,
+                 text=np.frombuffer(b"".join(encoded), dtype="uint8"),
+                 text_ends=np.cumsum(lengths))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index saved by save().
+
+        Parameters:
+        path (str): The index file (.npz).
+
+        Returns:
+        TrigramIndex: The index.
+        """
+        index = cls()
+        with np.load(path) as saved:
+            index.trigrams = saved["trigrams"]
+            index.offsets = saved["offsets"]
+            index.postings = saved["postings"]
+            index.row_codes = saved["row_codes"]
+            index.order = saved["order"]
+            text, ends = saved["text"].tobytes(), saved["text_ends"]
+        starts = np.concatenate([[0], ends[:-1]]) if len(ends) else ends
+        index.strings = np.array([text[start:end].decode("utf-8")
+                                  for start, end in zip(starts.tolist(), ends.tolist())],
+                                 dtype=object)
+        index._build_rows()
+        return index
@@ -0,0 +1,179 @@
+# File: top_k.py
+
+# Top-N rows per group without sorting the whole table.
+# sort_values(...).groupby(...).head(k) and groupby(...).rank() sort every row
+# just to keep a few per group. top_k_per_group() instead finds, for each group,
+# the value of its k-th place by selection on the integer group codes, keeps only
+# the rows that can still be in the top k, and ranks that small remainder:
+# - for small k, k vectorized passes over the rows, each taking the per-group
+#   best value below the previous one (np.minimum.at), so the cost is O(n * k)
+# - for larger k, rows are bucketed by group and only groups with more than k
+#   rows are cut with np.partition; when most groups are barely larger than k
+#   there is little to prune and all rows are ranked directly
+# Ties follow the SQL window functions: 'dense' is DENSE_RANK, 'min' is RANK and
+# 'first' is ROW_NUMBER with ties broken by row order.
+
+# Import necessary libraries
+import numpy as np
+import pandas as pd
+
+
+RANK_METHODS = ("dense", "min", "first")
+
+# Largest k selected with per-group passes; larger k use per-group partitioning
+PASS_LIMIT = 16
+
+# Most groups cut one by one with np.partition; beyond it the rows are sorted instead
+PARTITION_GROUPS = 2_000
+
+
+def _sort_keys(values, ascending):
+    """Numeric keys whose ascending order is the requested order, and the valid rows."""
+    if pd.api.types.is_datetime64_any_dtype(values.dtype) or \
+            pd.api.types.is_timedelta64_dtype(values.dtype):
+        if getattr(values.dt, "tz", None) is not None:
+            values = values.dt.tz_convert(None)
+        valid = values.notna().to_numpy()
+        keys = values.to_numpy().view("int64")
+    elif pd.api.types.is_integer_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+        valid = values.notna().to_numpy()
+        keys = values.to_numpy(dtype="int64", na_value=0)
+    else:
+        keys = values.to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~np.isnan(keys)
+    if not ascending:
+        # ~x reverses the order of int64 without overflowing at the minimum
+        keys = -keys if keys.dtype.kind == "f" else ~keys
+    return keys, valid
+
+
+def _pass_thresholds(codes, keys, n_groups, k):
+    """The k-th smallest distinct key of every group, by k masked group-min passes."""
+    top = np.iinfo("int64").max if keys.dtype.kind == "i" else np.inf
+    threshold = np.full(n_groups, top, dtype=keys.dtype)
+    previous = None
+    for _ in range(k):
+        candidates = keys if previous is None else np.where(keys > previous[codes], keys, top)
+        current = np.full(n_groups, top, dtype=keys.dtype)
+        np.minimum.at(current, codes, candidates)
+        # Groups with fewer than k distinct keys keep their last real threshold
+        threshold = np.where(current == top, threshold, current)
+        previous = current
+    return threshold
+
+
+def _partition_thresholds(codes, keys, n_groups, k, method):
+    """
+    The k-th place key of every group with more than k rows, by per-group selection;
+    None when too many groups need cutting for a Python loop over them to pay off.
+    """
+    top = np.iinfo("int64").max if keys.dtype.kind == "i" else np.inf
+    threshold = np.full(n_groups, top, dtype=keys.dtype)
+    sizes = np.bincount(codes, minlength=n_groups)
+    large = np.flatnonzero(sizes > k)
+    if len(large) > PARTITION_GROUPS:
+        return None
+    # Bucket the rows by group; numpy sorts 16-bit integers with a linear radix sort
+    order = np.argsort(codes.astype("uint16") if n_groups <= 2**16 else codes, kind="stable")
+    ends = np.cumsum(sizes)
+    for group in large:
+        block = keys[order[ends[group] - sizes[group]:ends[group]]]
+        kth = np.partition(block, k - 1)[k - 1]
+        if method == "dense":
+            # The k-th distinct key is at least the k-th key; ties push it further,
+            # so the selection is widened until it holds k distinct keys
+            cut = k
+            distinct = np.unique(block[block <= kth])
+            while len(distinct) < k and cut < len(block):
+                cut = min(2 * cut, len(block))
+                kth = np.partition(block, cut - 1)[cut - 1]
+                distinct = np.unique(block[block <= kth])
+            if len(distinct) < k:
+                continue
+            kth = distinct[k - 1]
+        threshold[group] = kth
+    return threshold
+
+
+def _group_order(codes, keys, n_groups):
+    """Stable order of the rows by group and key."""
+    if keys.dtype.kind == "i" and len(keys):
+        low, span = int(keys.min()), int(keys.max()) - int(keys.min()) + 1
+        if n_groups * span < 2**62:
+            # One sort of a combined integer key is about twice as fast as lexsort
+            return np.argsort(codes * span + (keys - low), kind="stable")
+    return np.lexsort((keys, codes))
+
+
+def top_k_per_group(frame, by, column, k, ascending=False, method="dense", rank_column=None):
+    """
+    Keep the top k rows of every group, as ranked by one column.
+
+    Equivalent to ranking the rows within each group (groupby(by)[column].rank(method,
+    ascending=ascending)) and keeping ranks <= k, but only the rows that can reach
+    the top k are ever sorted. Rows with a missing value or group key are skipped.
+
+    Parameters:
+    frame (pd.DataFrame): The rows to select from.
+    by (str or list): Group column(s); None ranks the whole frame as one group.
+    column (str): The numeric or datetime column ranked.
+    k (int): Number of places kept per group.
+    ascending (bool): Rank the smallest values first. Default is the largest first.
+    method (str): Tie handling, one of RANK_METHODS: 'dense' (DENSE_RANK; every row of
+        the k best distinct values), 'min' (RANK; ties share the best place, may
+        exceed k rows) or 'first' (ROW_NUMBER; exactly k rows, earlier rows first).
+    rank_column (str): Name of a column added with each row's rank.
+
+    Returns:
+    pd.DataFrame: The selected rows, ordered by group key and then by rank.
+    """
+    if method not in RANK_METHODS:
+        raise ValueError(f"Unknown rank method '{method}'. Expected one of {RANK_METHODS}")
+    if k < 1 or frame.empty:
+        selected = frame.iloc[:0]
+        return selected.assign(**{rank_column: pd.Series(dtype="int64")}) if rank_column \
+            else selected
+
+    keys, valid = _sort_keys(frame[column], ascending)
+    if by is None:
+        codes = np.zeros(len(frame), dtype="int64")
+    else:
+        # ngroup() leaves the rows of missing group keys unnumbered
+        codes = frame.groupby(by, sort=True, observed=True).ngroup().to_numpy(
+            dtype="int64", na_value=-1)
+        valid = valid & (codes >= 0)
+    rows = np.flatnonzero(valid)
+    codes, keys = codes[rows], keys[rows]
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+
+    # Keep only the rows at or above their group's k-th place
+    if k <= PASS_LIMIT:
+        threshold = _pass_thresholds(codes, keys, n_groups, k)
+    else:
+        threshold = _partition_thresholds(codes, keys, n_groups, k, method)
+    if threshold is not None:
+        keep = keys <= threshold[codes]
+        rows, codes, keys = rows[keep], codes[keep], keys[keep]
+
+    # Rank the remaining rows exactly (the sort is stable, so ties stay in row order)
+    order = _group_order(codes, keys, n_groups)
+    rows, codes, keys = rows[order], codes[order], keys[order]
+    position = np.arange(len(rows))
+    group_start = np.ones(len(rows), dtype=bool)
+    group_start[1:] = codes[1:] != codes[:-1]
+    new_value = group_start.copy()
+    new_value[1:] |= keys[1:] != keys[:-1]
+    first_row = np.maximum.accumulate(np.where(group_start, position, 0))
+    if method == "dense":
+        distinct = np.cumsum(new_value)
+        rank = distinct - distinct[first_row] + 1
+    elif method == "min":
+        rank = np.maximum.accumulate(np.where(new_value, position, 0)) - first_row + 1
+    else:
+        rank = position - first_row + 1
+    keep = rank <= k
+
+    selected = frame.iloc[rows[keep]]
+    if rank_column:
+        selected = selected.assign(**{rank_column: rank[keep].astype("int64")})
+    return selected